@@ -0,0 +1,409 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Reduced ordered binary decision diagrams (ROBDD) of type designators.
+#   A Boolean combination (SAnd, SOr, SNot) of leaf types (SAtomic, SEql,
+#   SSatisfies, ...) is represented as a Bdd whose nodes are labeled by leaf types.
+#   SMember is represented as the union of SEql of its elements.
+#   Nodes are hash-consed, thus two Bdds of the same Boolean function of the same
+#   leaves are the same object, and equivalence, intersection, union and complement
+#   are graph operations which do not need the rewrite rules of canonicalize.
+#   The leaves are not independent, e.g., SAtomic(int) and SEql(1), so
+#   inhabited, disjoint, subtypep, and equivalent are decided modulo the theory of
+#   the leaves, by examining the conjunction of leaves along each path to BddTrue.
+#   E.g.,
+#      to_bdd(SAnd(SAtomic(int), SNot(SEql(1)))) is to_bdd(SAnd(SNot(SEql(1)), SAtomic(int)))
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from genus.simple_type_d import SimpleTypeD
+
+
+class Bdd:
+    pass
+
+
+class BddTerminal(Bdd):
+    def __init__(self, value: bool):
+        self.value = value
+
+    def __str__(self):
+        return "⊤" if self.value else "⊥"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+BddTrue = BddTerminal(True)
+BddFalse = BddTerminal(False)
+
+
+class BddNode(Bdd):
+    # do not call directly, rather use createBdd which assures that nodes
+    #   are reduced and hash-consed.
+    def __init__(self, label: SimpleTypeD, positive: Bdd, negative: Bdd):
+        self.label = label
+        self.positive = positive
+        self.negative = negative
+
+    def __str__(self):
+        return f"Bdd({self.label}, {self.positive}, {self.negative})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+# the position of each leaf type in the variable order, in order of first use.
+label_order: Dict[SimpleTypeD, int] = {}
+# the unique node for each (label, positive, negative) triple
+bdd_nodes: Dict[Tuple[SimpleTypeD, Bdd, Bdd], BddNode] = {}
+# memoization of to_bdd, and of the binary operations
+bdd_cache: Dict[SimpleTypeD, Bdd] = {}
+bdd_op_cache: Dict[Tuple[str, Bdd, Bdd], Bdd] = {}
+bdd_op_cache_limit = 100000
+# when the tables above hold more than this number of entries, they are all
+#   emptied by the next call to bdd_reset_if_full, so that the types seen
+#   are not kept alive for the life of the process.
+bdd_table_limit = 100000
+
+
+# Empty all the tables if they are too large.  Afterwards, the variable order is
+#   new, so the Bdds computed before must not be combined with those computed
+#   after.  The bdd_type_... functions call this before computing any Bdd.
+def bdd_reset_if_full() -> None:
+    if len(bdd_nodes) + len(bdd_cache) + len(bdd_path_cache) > bdd_table_limit:
+        label_order.clear()
+        bdd_nodes.clear()
+        bdd_cache.clear()
+        bdd_op_cache.clear()
+        bdd_path_cache.clear()
+
+
+def order_of(label: SimpleTypeD) -> int:
+    if label not in label_order:
+        label_order[label] = len(label_order)
+    return label_order[label]
+
+
+def createBdd(label: SimpleTypeD, positive: Bdd, negative: Bdd) -> Bdd:
+    if positive is negative:
+        return positive
+    key = (label, positive, negative)
+    if key not in bdd_nodes:
+        order_of(label)
+        bdd_nodes[key] = BddNode(label, positive, negative)
+    return bdd_nodes[key]
+
+
+def bdd_not(b: Bdd) -> Bdd:
+    if b is BddTrue:
+        return BddFalse
+    elif b is BddFalse:
+        return BddTrue
+    key = ("not", b, b)
+    if key not in bdd_op_cache:
+        bdd_op_cache[key] = createBdd(b.label, bdd_not(b.positive), bdd_not(b.negative))
+    return bdd_op_cache[key]
+
+
+def bdd_apply(op: str, terminal: Callable[[Bdd, Bdd], Optional[Bdd]], b1: Bdd, b2: Bdd) -> Bdd:
+    # terminal(b1, b2) returns the result if it can be determined without
+    #   descending, e.g., because either argument is a terminal, and None otherwise.
+    t = terminal(b1, b2)
+    if t is not None:
+        return t
+    key = (op, b1, b2)
+    if key in bdd_op_cache:
+        return bdd_op_cache[key]
+    if len(bdd_op_cache) > bdd_op_cache_limit:
+        bdd_op_cache.clear()
+    o1 = order_of(b1.label)
+    o2 = order_of(b2.label)
+    if o1 == o2:
+        b = createBdd(b1.label,
+                      bdd_apply(op, terminal, b1.positive, b2.positive),
+                      bdd_apply(op, terminal, b1.negative, b2.negative))
+    elif o1 < o2:
+        b = createBdd(b1.label,
+                      bdd_apply(op, terminal, b1.positive, b2),
+                      bdd_apply(op, terminal, b1.negative, b2))
+    else:
+        b = createBdd(b2.label,
+                      bdd_apply(op, terminal, b1, b2.positive),
+                      bdd_apply(op, terminal, b1, b2.negative))
+    bdd_op_cache[key] = b
+    return b
+
+
+def and_terminal(b1: Bdd, b2: Bdd) -> Optional[Bdd]:
+    if b1 is BddFalse or b2 is BddFalse:
+        return BddFalse
+    elif b1 is BddTrue:
+        return b2
+    elif b2 is BddTrue or b1 is b2:
+        return b1
+    else:
+        return None
+
+
+def or_terminal(b1: Bdd, b2: Bdd) -> Optional[Bdd]:
+    if b1 is BddTrue or b2 is BddTrue:
+        return BddTrue
+    elif b1 is BddFalse:
+        return b2
+    elif b2 is BddFalse or b1 is b2:
+        return b1
+    else:
+        return None
+
+
+def bdd_and(b1: Bdd, b2: Bdd) -> Bdd:
+    return bdd_apply("and", and_terminal, b1, b2)
+
+
+def bdd_or(b1: Bdd, b2: Bdd) -> Bdd:
+    return bdd_apply("or", or_terminal, b1, b2)
+
+
+def bdd_and_not(b1: Bdd, b2: Bdd) -> Bdd:
+    return bdd_and(b1, bdd_not(b2))
+
+
+def bdd_xor(b1: Bdd, b2: Bdd) -> Bdd:
+    return bdd_or(bdd_and_not(b1, b2), bdd_and_not(b2, b1))
+
+
+def to_bdd(td: SimpleTypeD) -> Bdd:
+    from functools import reduce
+    from genus.s_top import STopImpl
+    from genus.s_empty import SEmptyImpl
+    from genus.s_and import SAnd
+    from genus.s_or import SOr
+    from genus.s_not import SNot
+    from genus.s_eql import SEql
+    from genus.s_member import SMemberImpl
+
+    if td in bdd_cache:
+        return bdd_cache[td]
+    elif isinstance(td, STopImpl):
+        b = BddTrue
+    elif isinstance(td, SEmptyImpl):
+        b = BddFalse
+    elif isinstance(td, SAnd):
+        b = reduce(bdd_and, [to_bdd(td1) for td1 in td.tds], BddTrue)
+    elif isinstance(td, SOr):
+        b = reduce(bdd_or, [to_bdd(td1) for td1 in td.tds], BddFalse)
+    elif isinstance(td, SNot):
+        b = bdd_not(to_bdd(td.s))
+    elif isinstance(td, SEql):
+        b = createBdd(td, BddTrue, BddFalse)
+    elif isinstance(td, SMemberImpl):
+        # SEql of a pair (type, value) designates the value
+        b = reduce(bdd_or, [to_bdd(SEql(pair)) for pair in td.argpairs], BddFalse)
+    else:
+        b = createBdd(td, BddTrue, BddFalse)
+    bdd_cache[td] = b
+    return b
+
+
+# Construct a type designator equivalent to the given Bdd, the result is not canonicalized.
+def from_bdd(b: Bdd) -> SimpleTypeD:
+    from genus.s_top import STop
+    from genus.s_empty import SEmpty
+    from genus.s_and import SAnd
+    from genus.s_or import createSOr
+    from genus.s_not import SNot
+    if b is BddTrue:
+        return STop
+    elif b is BddFalse:
+        return SEmpty
+
+    def term(label: SimpleTypeD, child: Bdd) -> Optional[SimpleTypeD]:
+        if child is BddFalse:
+            return None
+        elif child is BddTrue:
+            return label
+        else:
+            return SAnd(label, from_bdd(child))
+
+    return createSOr([td for td in [term(b.label, b.positive), term(SNot(b.label), b.negative)]
+                      if td is not None])
+
+
+# Decide whether the conjunction of the given literals is inhabited.
+#   Each literal is a pair (leaf, polarity).  Returns True, False, or None.
+bdd_path_cache: Dict[frozenset, Optional[bool]] = {}
+
+
+def path_inhabited(literals: List[Tuple[SimpleTypeD, bool]]) -> Optional[bool]:
+    from genus.s_and import createSAnd
+    from genus.s_not import SNot
+    from genus.s_eql import SEql
+    key = frozenset(literals)
+    if key not in bdd_path_cache:
+        values = [label.pair[1] for label, polarity in literals if polarity and isinstance(label, SEql)]
+        if values:
+            # the path designates at most the single value of an SEql,
+            #   so every other literal may be decided by typep.
+            bdd_path_cache[key] = value_satisfies(values[0], literals)
+        else:
+            # the total literals first, as they may guard a partial SSatisfies,
+            #   which is nevertheless unknown if it raises while reasoning.
+            ordered = sorted(literals, key=lambda literal: not literal[0].typep_total())
+            try:
+                bdd_path_cache[key] = createSAnd([label if polarity else SNot(label)
+                                                  for label, polarity in ordered]).inhabited()
+            except Exception:
+                bdd_path_cache[key] = None
+    return bdd_path_cache[key]
+
+
+# Decide whether the value v satisfies every literal.  The total literals are
+#   decided first, as a partial SSatisfies may be guarded by one of them, e.g.,
+#   by SAtomic(int), and may raise if the guard does not hold; a predicate is
+#   only called once every total literal holds, and is then unknown if it raises.
+def literal_typep(v: Any, label: SimpleTypeD) -> Optional[bool]:
+    if label.typep_total():
+        return bool(label.typep(v))
+    try:
+        return bool(label.typep(v))
+    except Exception:
+        return None
+
+
+def value_satisfies(v: Any, literals: List[Tuple[SimpleTypeD, bool]]) -> Optional[bool]:
+    if any(literal_typep(v, label) is not polarity
+           for label, polarity in literals if label.typep_total()):
+        return False
+    unknown = False
+    for label, polarity in literals:
+        if not label.typep_total():
+            satisfied = literal_typep(v, label)
+            if satisfied is None:
+                unknown = True
+            elif satisfied is not polarity:
+                return False
+    return None if unknown else True
+
+
+# Returns True if some path to BddTrue is inhabited, False if no path is inhabited,
+#   and None otherwise, in particular if more than bdd_path_limit paths to BddTrue
+#   would have to be examined.
+#   Once a path contains a positive SEql, it designates at most this single value,
+#   so only the child selected by typep of this value is followed below that point,
+#   except below a partial SSatisfies which raises on this value, whose both
+#   children are followed, leaving the decision to value_satisfies.
+bdd_path_limit = 1024
+
+
+def bdd_inhabited(b: Bdd) -> Optional[bool]:
+    from genus.s_eql import SEql
+    unknown = False
+    budget = bdd_path_limit
+
+    def walk(b1: Bdd, literals: List[Tuple[SimpleTypeD, bool]], value: List[Any]) -> bool:
+        # returns True if an inhabited path has been found, thus ending the search.
+        #   value is [] or [v] if the path designates at most the value v.
+        nonlocal unknown, budget
+        if b1 is BddFalse or budget <= 0:
+            return False
+        elif b1 is BddTrue:
+            budget -= 1
+            inh = path_inhabited(literals)
+            if inh is None:
+                unknown = True
+            return inh is True
+        elif value:
+            # every node of a Bdd has a path to BddTrue, as nodes with two BddFalse
+            #   children are reduced, so a single path is followed
+            polarity = literal_typep(value[0], b1.label)
+            if polarity is None:
+                return walk(b1.positive, literals + [(b1.label, True)], value) \
+                    or walk(b1.negative, literals + [(b1.label, False)], value)
+            return walk(b1.positive if polarity else b1.negative, literals + [(b1.label, polarity)], value)
+        else:
+            return walk(b1.positive,
+                        literals + [(b1.label, True)],
+                        [b1.label.pair[1]] if isinstance(b1.label, SEql) else []) \
+                or walk(b1.negative, literals + [(b1.label, False)], [])
+
+    if walk(b, [], []):
+        return True
+    elif unknown or budget <= 0:
+        return None
+    else:
+        return False
+
+
+# Returns the Bdd of td, or None if td contains a type which is not hashable,
+#   e.g., SEql([1]), as such a type cannot label a node.
+def to_bdd_or_none(td: SimpleTypeD) -> Optional[Bdd]:
+    try:
+        hash(td)
+    except TypeError:
+        return None
+    return to_bdd(td)
+
+
+def bdd_type_inhabited(td: SimpleTypeD) -> Optional[bool]:
+    bdd_reset_if_full()
+    b = to_bdd_or_none(td)
+    return None if b is None else bdd_inhabited(b)
+
+
+def bdd_type_disjoint(td1: SimpleTypeD, td2: SimpleTypeD) -> Optional[bool]:
+    bdd_reset_if_full()
+    b1 = to_bdd_or_none(td1)
+    b2 = to_bdd_or_none(td2)
+    if b1 is None or b2 is None:
+        return None
+    inh = bdd_inhabited(bdd_and(b1, b2))
+    return None if inh is None else not inh
+
+
+def bdd_type_subtypep(td1: SimpleTypeD, td2: SimpleTypeD) -> Optional[bool]:
+    bdd_reset_if_full()
+    b1 = to_bdd_or_none(td1)
+    b2 = to_bdd_or_none(td2)
+    if b1 is None or b2 is None:
+        return None
+    inh = bdd_inhabited(bdd_and_not(b1, b2))
+    return None if inh is None else not inh
+
+
+# Returns True if td1 and td2 have the same Bdd, without examining any path,
+#   thus without calling inhabited() on the leaves.
+def bdd_type_same(td1: SimpleTypeD, td2: SimpleTypeD) -> bool:
+    bdd_reset_if_full()
+    b1 = to_bdd_or_none(td1)
+    return b1 is not None and b1 is to_bdd_or_none(td2)
+
+
+def bdd_type_equivalent(td1: SimpleTypeD, td2: SimpleTypeD) -> Optional[bool]:
+    bdd_reset_if_full()
+    b1 = to_bdd_or_none(td1)
+    b2 = to_bdd_or_none(td2)
+    if b1 is None or b2 is None:
+        return None
+    elif b1 is b2:
+        return True
+    inh = bdd_inhabited(bdd_xor(b1, b2))
+    return None if inh is None else not inh
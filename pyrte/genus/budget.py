@@ -0,0 +1,111 @@
+# Copyright (©) 2021 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Construction budgets for graph builders.
+#   Building an automaton may blow up exponentially on adversarial patterns,
+#   e.g., nested Not and And.  A Budget limits the number of states, the number
+#   of transitions, and the wall-clock time which a builder may use.  Builders
+#   (trace_graph, and the loops which call it) call budget.check(...) cooperatively
+#   each time they discover a state, and BudgetExceeded is raised as soon as
+#   a limit is exceeded.  A budget may also be cancelled from another thread.
+#
+#   A budget may be given explicitly to a builder, or installed for the
+#   dynamic extent of a with statement, in which case every builder running
+#   in the same thread (or asyncio task) checks it.
+#   E.g.,
+#      with Budget(max_states=1000, timeout=2.0):
+#          dfa = pattern.to_dfa(True)
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, msg, limit, states, transitions, elapsed):
+        self.msg = msg
+        self.limit = limit  # one of "max_states", "max_transitions", "timeout", "cancelled"
+        self.states = states  # number of states discovered when the limit was exceeded
+        self.transitions = transitions  # number of transitions discovered when the limit was exceeded
+        self.elapsed = elapsed  # seconds since the budget was created
+        super().__init__(msg)
+
+
+class Budget:
+    def __init__(self,
+                 max_states: Optional[int] = None,
+                 max_transitions: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.max_states = max_states
+        self.max_transitions = max_transitions
+        self.start = time.monotonic()
+        self.deadline = None if timeout is None else self.start + timeout
+        self.cancelled = False
+        self.tokens = []
+
+    def __str__(self):
+        return f"Budget(max_states={self.max_states}, max_transitions={self.max_transitions}," \
+               f" deadline={self.deadline})"
+
+    def cancel(self) -> None:
+        # may be called from another thread, the builder notices at its next check
+        self.cancelled = True
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def check(self, states: int, transitions: int, builder: str = "builder") -> None:
+        def exceeded(limit, detail):
+            return BudgetExceeded(msg=f"{builder} exceeded {limit} ({detail}) after discovering"
+                                      f" {states} states and {transitions} transitions in {self.elapsed():.3f}s",
+                                  limit=limit,
+                                  states=states,
+                                  transitions=transitions,
+                                  elapsed=self.elapsed())
+
+        if self.cancelled:
+            raise exceeded("cancelled", "cancelled by caller")
+        elif self.max_states is not None and states > self.max_states:
+            raise exceeded("max_states", f"{states} > {self.max_states}")
+        elif self.max_transitions is not None and transitions > self.max_transitions:
+            raise exceeded("max_transitions", f"{transitions} > {self.max_transitions}")
+        elif self.deadline is not None and time.monotonic() > self.deadline:
+            raise exceeded("timeout", f"{self.elapsed():.3f}s")
+
+    def __enter__(self) -> 'Budget':
+        self.tokens.append(ambient_budget.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ambient_budget.reset(self.tokens.pop())
+        return False
+
+
+ambient_budget: ContextVar[Optional[Budget]] = ContextVar("ambient_budget", default=None)
+
+
+# return the given budget if not None, otherwise the budget installed by the
+#   innermost enclosing with statement, if any.
+def current_budget(budget: Optional[Budget] = None) -> Optional[Budget]:
+    if budget is not None:
+        return budget
+    else:
+        return ambient_budget.get()
@@ -23,6 +23,19 @@ from genus.simple_type_d import SimpleTypeD
 from typing import List, Tuple, Set, Union
 
 
+# Decompositions already computed, keyed by the frozenset of the (inhabited) input types.
+#   Each entry is a triple (decomposition, supertypes, disjoint_from), see mdtd.
+#   The decomposition of each prefix of the canonically ordered input is also
+#   remembered, so that the decomposition of a set of types, and the relations
+#   among them, may be computed incrementally from those of a subset.
+#   The cache is emptied when it grows beyond mdtd_cache_limit entries, and
+#   when a class is defined below one of the classes of the given types,
+#   see genus.utils.class_hierarchy_version.
+mdtd_cache = {}
+mdtd_cache_limit = 10000
+mdtd_cache_version = 0
+
+
 # Compute the Maximal Disjoint Type Decomposition in the form of a list of tuples
 #    Each tuple is of the form (td, List[factor], List[disjoint])
 #    The td indicates one type in the mdtd.
@@ -32,46 +45,140 @@ from typing import List, Tuple, Set, Union
 #      whether each of the given types is disjoint or not with each type in its
 #      decomposition.  However, in some cases we do not know whether the type is actually
 #      inhabited.
+#    The given types are treated as a set, and are processed in canonical order,
+#      and the decomposition is returned in canonical order, so the result does not
+#      depend on the order (nor on the hash values) of the given types.
 def mdtd(tds: Union[List[SimpleTypeD], Set[SimpleTypeD]]) -> List[Tuple[SimpleTypeD,
                                                                         List[SimpleTypeD],
                                                                         List[SimpleTypeD]]]:
-    from genus.s_not import SNot
+    from genus.utils import class_index_frozen
+    with class_index_frozen():
+        return mdtd_down(tds)
+
+
+def mdtd_down(tds: Union[List[SimpleTypeD], Set[SimpleTypeD]]) -> List[Tuple[SimpleTypeD,
+                                                                             List[SimpleTypeD],
+                                                                             List[SimpleTypeD]]]:
+    global mdtd_cache_version
+    from functools import cmp_to_key
     from genus.s_top import STop
-    from genus.utils import flat_map, generate_lazy_val
+    from genus.utils import cmp_objects, class_hierarchy_version, verify_class_index
     # This algorithm doesn't exactly compute the maximal disjoint type decomposition
     # of its input rather it computes the mdtd of tds unioned with STop, which is
     # what is actually needed at the client side.
-    tds = [td for td in tds if td.inhabited() is not False]
-    decomposition = [(STop, [], [])]
-    for td in tds:
-        n = SNot(td)
-        nc = generate_lazy_val(lambda: n.canonicalize())
-
-        def f(triple) -> List[Tuple[SimpleTypeD, List[SimpleTypeD], List[SimpleTypeD]]]:
-            from genus.s_and import SAnd
-            td1, factors, disjoints = triple
-            a = generate_lazy_val(lambda: SAnd(td, td1).canonicalize())
-            b = generate_lazy_val(lambda: SAnd(nc(), td1).canonicalize())
-            # each time td is intersected with td1, either explicitly or implicitly
-            #   td is added to factors in the accumulated value.
-            # each time SNot(td) is intersected, td is added to disjoints.
-            #   the disjoints and factors list makes it much easier for the
-            #   Singleton derivative function to determine whether the
-            #   type in question is a subtype or a disjoint type, simply
-            #   by looking it up in the factors or disjoint list.
-            if td.disjoint(td1) is True:
-                return [(td1, factors, disjoints + [td])]
-            elif nc().disjoint(td1) is True:
-                return [(td1, factors + [td], disjoints)]
-            # dont check a().inhabited in the case that td.disjoint(td1) is False
-            elif td.disjoint(td1) is None and a().inhabited() is False:
-                return [(td1, factors, disjoints + [td])]
-            # dont check b().inhabited in the case that nc.disjoint(td1) is False
-            elif nc().disjoint(td1) is None and b().inhabited() is False:
-                return [(td1, factors + [td], disjoints)]
-            else:
-                return [(a(), factors + [td], disjoints),
-                        (b(), factors, disjoints + [td])]
-
-        decomposition = flat_map(f, decomposition)
-    return decomposition
+    tds = sorted(set(td for td in tds if td.inhabited() is not False),
+                 key=cmp_to_key(cmp_objects))
+    key = frozenset(tds)
+
+    # the lists of the cached decomposition are copied, so the caller may modify them
+    def canonical_order(decomposition):
+        return [(td, list(factors), list(disjoints))
+                for td, factors, disjoints in sorted(decomposition,
+                                                     key=cmp_to_key(lambda a, b: cmp_objects(a[0], b[0])))]
+
+    verify_class_index(atomic_classes(tds))
+    if mdtd_cache_version != class_hierarchy_version() or len(mdtd_cache) > mdtd_cache_limit:
+        mdtd_cache.clear()
+        mdtd_cache_version = class_hierarchy_version()
+    if key in mdtd_cache:
+        return canonical_order(mdtd_cache[key][0])
+
+    # find the longest prefix whose decomposition is already known
+    start = max(len(tds) - 1, 0)
+    while start > 0 and frozenset(tds[0:start]) not in mdtd_cache:
+        start = start - 1
+    if start > 0:
+        decomposition, known_supertypes, known_disjoint_from = mdtd_cache[frozenset(tds[0:start])]
+    else:
+        decomposition, known_supertypes, known_disjoint_from = [(STop, [], [])], {}, {}
+
+    # supertypes[td] is the set of given types known to be supertypes of td,
+    # disjoint_from[td] is the set of given types known to be disjoint from td.
+    #   The relations among the types of the prefix are already known, so only
+    #   the pairs involving a type beyond the prefix are examined.
+    supertypes = {}
+    disjoint_from = {}
+    for i, td in enumerate(tds):
+        others = tds[start:] if i < start else tds
+        supertypes[td] = set(known_supertypes.get(td, ())) | \
+            set(td2 for td2 in others if td2 is not td and td.subtypep(td2) is True)
+        disjoint_from[td] = set(known_disjoint_from.get(td, ())) | \
+            set(td2 for td2 in others if td2 is not td and td.disjoint(td2) is True)
+
+    for i in range(start, len(tds)):
+        decomposition = refine_decomposition(decomposition, tds[i], supertypes, disjoint_from)
+        # the relations are shared by the entries of the prefixes; they may
+        #   mention types beyond the prefix, which is harmless as each relation
+        #   holds whatever the other given types are.
+        mdtd_cache[frozenset(tds[0:i + 1])] = (decomposition, supertypes, disjoint_from)
+
+    return canonical_order(decomposition)
+
+
+# the classes of the SAtomic leaves of the given types
+def atomic_classes(tds: List[SimpleTypeD]) -> Set[type]:
+    from genus.s_atomic import SAtomic
+    from genus.s_combination import SCombination
+    from genus.s_not import SNot
+    classes = set()
+    stack = list(tds)
+    while stack:
+        td = stack.pop()
+        if isinstance(td, SAtomic):
+            classes.add(td.wrapped_class)
+        elif isinstance(td, SCombination):
+            stack.extend(td.tds)
+        elif isinstance(td, SNot):
+            stack.append(td.s)
+    return classes
+
+
+# Split each component of the given decomposition according to whether it is
+#   a subset of td, disjoint from td, or neither.  The given relations among
+#   the input types (see mdtd) are used to avoid intersecting td with a component
+#   when the factors and disjoints of the component already determine
+#   the answer.
+def refine_decomposition(decomposition: List[Tuple[SimpleTypeD, List[SimpleTypeD], List[SimpleTypeD]]],
+                         td: SimpleTypeD,
+                         supertypes,
+                         disjoint_from) -> List[Tuple[SimpleTypeD, List[SimpleTypeD], List[SimpleTypeD]]]:
+    from genus.s_not import SNot
+    from genus.utils import flat_map, generate_lazy_val
+    n = SNot(td)
+    nc = generate_lazy_val(lambda: n.canonicalize())
+
+    def f(triple) -> List[Tuple[SimpleTypeD, List[SimpleTypeD], List[SimpleTypeD]]]:
+        from genus.s_and import SAnd
+        td1, factors, disjoints = triple
+        a = generate_lazy_val(lambda: SAnd(td, td1).canonicalize())
+        b = generate_lazy_val(lambda: SAnd(nc(), td1).canonicalize())
+        # each time td is intersected with td1, either explicitly or implicitly
+        #   td is added to factors in the accumulated value.
+        # each time SNot(td) is intersected, td is added to disjoints.
+        #   the disjoints and factors list makes it much easier for the
+        #   Singleton derivative function to determine whether the
+        #   type in question is a subtype or a disjoint type, simply
+        #   by looking it up in the factors or disjoint list.
+        # td1 is a subset of each of its factors, and is disjoint from each of its disjoints.
+        if any(td in disjoint_from[f1] for f1 in factors) \
+                or any(d1 in supertypes[td] for d1 in disjoints):
+            # td1 <= f1 which is disjoint from td, or td <= d1 which is disjoint from td1
+            return [(td1, factors, disjoints + [td])]
+        elif any(td in supertypes[f1] for f1 in factors):
+            # td1 <= f1 <= td
+            return [(td1, factors + [td], disjoints)]
+        elif td.disjoint(td1) is True:
+            return [(td1, factors, disjoints + [td])]
+        elif nc().disjoint(td1) is True:
+            return [(td1, factors + [td], disjoints)]
+        # dont check a().inhabited in the case that td.disjoint(td1) is False
+        elif td.disjoint(td1) is None and a().inhabited() is False:
+            return [(td1, factors, disjoints + [td])]
+        # dont check b().inhabited in the case that nc.disjoint(td1) is False
+        elif nc().disjoint(td1) is None and b().inhabited() is False:
+            return [(td1, factors + [td], disjoints)]
+        else:
+            return [(a(), factors + [td], disjoints),
+                    (b(), factors, disjoints + [td])]
+
+    return flat_map(f, decomposition)
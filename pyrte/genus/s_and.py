@@ -25,7 +25,7 @@ from genus.s_or import SOr
 from genus.s_empty import SEmpty, SEmptyImpl
 from genus.s_top import STop, STopImpl
 from genus.simple_type_d import SimpleTypeD
-from genus.utils import find_first, generate_lazy_val, uniquify
+from genus.utils import find_first, generate_lazy_val, uniquify, ordered_intersection
 from typing import List, TypeVar, Callable, Iterable, Optional, Any, TypeGuard
 
 
@@ -40,6 +40,7 @@ T = TypeVar('T')  # Declare type variable
 class SAnd(SCombination):
     """An intersection type, which is the intersection of zero or more types.
     param tds list, zero or more type designators"""
+    __slots__ = ()
 
     def __str__(self) -> str:
         return "SAnd(" + ", ".join([str(td) for td in self.tds]) + ")"
@@ -64,7 +65,15 @@ class SAnd(SCombination):
         return uniquify(a + b)
 
     def combinator(self, a: Iterable[T], b: Iterable[T]) -> List[T]:
-        return [x for x in a if x in b]
+        return ordered_intersection(a, b)
+
+    def member_combinator(self, members: List['SMemberImpl']) -> SimpleTypeD:
+        from genus.s_member import member_intersection
+        return member_intersection(members)
+
+    def member_dual_combinator(self, members: List['SMemberImpl']) -> SimpleTypeD:
+        from genus.s_member import member_union
+        return member_union(members)
 
     def combo_filter(self, pred: Callable[[T], bool], xs: Iterable[T]) -> List[T]:
         return [x for x in xs if pred(x)]  # cannot use filter from Python std library because of type incompatibility
@@ -73,8 +82,8 @@ class SAnd(SCombination):
         from genus.s_or import createSOr
         return createSOr(tds)
 
-    def typep(self, a: Any) -> bool:
-        return all(td.typep(a) for td in self.tds)
+    def decisive_value(self) -> bool:
+        return False
 
     def inhabited_down(self) -> Optional[bool]:
         from genus.genus_types import NormalForm
@@ -83,6 +92,7 @@ class SAnd(SCombination):
         from genus.s_member import memberimplp
         dnf = generate_lazy_val(lambda: self.canonicalize(NormalForm.DNF))
         cnf = generate_lazy_val(lambda: self.canonicalize(NormalForm.CNF))
+        clauses_inhabited = generate_lazy_val(self.clauses_inhabited)
 
         if any(t.inhabited() is False for t in self.tds):
             return False
@@ -96,6 +106,8 @@ class SAnd(SCombination):
                     for a in range(len(self.tds))
                     for b in range(a + 1, len(self.tds)))
             return not s
+        elif clauses_inhabited() is not None:
+            return clauses_inhabited()
         elif dnf() != self and dnf().inhabited() is not None:
             return dnf().inhabited()
         elif cnf() != self and cnf().inhabited() is not None:
@@ -110,6 +122,18 @@ class SAnd(SCombination):
         else:
             return super().inhabited_down()
 
+    # self is the union of the clauses of its DNF, see nf_clauses.  So self is
+    #   inhabited as soon as one clause is inhabited, and is empty if every clause
+    #   is empty.  The clauses are examined one at a time, stopping at the first
+    #   inhabited one.  Returns None if no clause among the first nf_inhabited_clause_limit
+    #   is inhabited, and either there are more clauses or the inhabitation of
+    #   some clause cannot be determined.
+    def clauses_inhabited(self) -> Optional[bool]:
+        from genus.s_combination import nf_inhabited_clause_limit
+        if not any(self.dual_combination(td) for td in self.tds):
+            return None
+        return self.search_nf_clauses(lambda clause: clause.inhabited(), nf_inhabited_clause_limit)
+
     def disjoint_down(self, t: SimpleTypeD) -> Optional[bool]:
         assert isinstance(t, SimpleTypeD)
 
@@ -127,6 +151,17 @@ class SAnd(SCombination):
               all(t.subtypep(td) is True for td in self.tds)):
             return False
         else:
+            from genus.s_combination import nf_disjoint_clause_limit
+            if any(self.dual_combination(td) for td in self.tds):
+                # self is the union of its DNF clauses, so it is disjoint from t
+                #   exactly when every clause is, i.e., when no clause intersects t.
+                def intersects(clause: SimpleTypeD) -> Optional[bool]:
+                    dis = clause.disjoint(t)
+                    return None if dis is None else not dis
+
+                found = self.search_nf_clauses(intersects, nf_disjoint_clause_limit)
+                if found is not None:
+                    return not found
             return super().disjoint_down(t)
 
     def subtypep_down(self, t: SimpleTypeD) -> Optional[bool]:
@@ -154,13 +189,13 @@ class SAnd(SCombination):
 
         # SAnd(SMember(42, 43, 44), A, B, C)
         # == > SMember(42, 44)
-        from genus.s_member import memberimplp, createSMember
+        from genus.s_member import memberimplp, member_filter
 
         member = find_first(memberimplp, self.tds, None)
         if member is None:
             return self
         else:
-            return createSMember([x[1] for x in member.argpairs if self.typep(x[1])])
+            return member_filter(member, self.typep)
 
     def conversionD3(self) -> SimpleTypeD:
         # discover disjoint pair
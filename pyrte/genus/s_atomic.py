@@ -26,13 +26,14 @@ from genus.s_member import SMemberImpl
 from genus.s_or import SOr
 from genus.s_top import STopImpl
 from genus.simple_type_d import SimpleTypeD, TerminalType
-from genus.utils import get_all_subclasses
+from genus.utils import is_subclass, have_common_subclass
 from genus.genus_types import NormalForm
 from typing import Literal, Any, Optional, TypeGuard
 
 
 class SAtomic(SimpleTypeD, TerminalType):
     """The atoms of our type system: a simple type built from a native python type."""
+    __slots__ = ("wrapped_class",)
     __instances = {}
 
     # reminder: the types are:
@@ -47,6 +48,10 @@ class SAtomic(SimpleTypeD, TerminalType):
             SAtomic.__instances[wrapped_class] = super(SAtomic, cls).__new__(cls, *a, **kw)
         return SAtomic.__instances[wrapped_class]
 
+    # pickle must call __new__ with the wrapped class, to find the unique instance
+    def __getnewargs__(self):
+        return (self.wrapped_class,)
+
     def __init__(self, wrapped_class):
         import inspect
         super(SAtomic, self).__init__()
@@ -86,23 +91,13 @@ class SAtomic(SimpleTypeD, TerminalType):
                 return True
             elif tp == ct:
                 return False
-            elif issubclass(tp, ct) or issubclass(ct, tp):
+            elif is_subclass(tp, ct) or is_subclass(ct, tp):
                 # is either a subclass of the other
                 return False
             else:
-                # if they have a common subclass, they are not disjoint
-
-                # return not any(c for c in get_all_subclasses(ct)
-                # 	               if c in tp_subclasses)
-
-                # 2 n log n searches should be faster than one n^2 search
-                # by iterating over both lists of subclasses and asking whether the
-                #  other is a superclass of it?
-                # return not (any(issubclass(c, tp) for c in get_all_subclasses(ct))
-                #            or any(issubclass(c, ct) for c in get_all_subclasses(tp)))
-
-                # 1 n log n should find the same boolean value
-                return not any(issubclass(c, tp) for c in get_all_subclasses(ct))
+                # if they have a common subclass, they are not disjoint,
+                #   see the class hierarchy index in genus.utils
+                return not have_common_subclass(ct, tp)
 
         else:
             return super().disjoint_down(t)
@@ -125,7 +120,7 @@ class SAtomic(SimpleTypeD, TerminalType):
             elif self.inhabited() is None and s.inhabited() is True:
                 return None
             elif self.inhabited() is True and s.inhabited() is True:
-                return issubclass(self.wrapped_class, s.wrapped_class)
+                return is_subclass(self.wrapped_class, s.wrapped_class)
             else:
                 raise NotImplementedError
         elif isinstance(s, SMemberImpl):
@@ -21,7 +21,7 @@
 
 import functools
 from abc import abstractmethod
-from typing import List, Callable, TypeVar, Literal, Optional, Iterable, cast, TypeGuard
+from typing import Any, List, Callable, TypeVar, Literal, Optional, Iterable, Iterator, cast, TypeGuard
 from genus.utils import compare_sequence
 from genus.utils import find_simplifier, find_first
 from genus.utils import flat_map
@@ -31,10 +31,23 @@ from genus.genus_types import NormalForm
 
 T = TypeVar('T')  # Declare type variable
 
+# maximum number of clauses of a normal form computed by compute_nf.
+#   The DNF of SAnd(SOr(a1,b1),...,SOr(an,bn)) has 2^n clauses, so beyond
+#   this limit the combination is left as it is.
+nf_clause_limit = 1024
+# maximum number of clauses examined one at a time, see search_nf_clauses,
+#   by inhabited() and by disjoint(), which is called much more often,
+#   e.g., once per pair of types by mdtd.  Beyond these limits the answer
+#   is None (don't know) unless a clause examined decides the question.
+nf_inhabited_clause_limit = 64
+nf_disjoint_clause_limit = 16
+
 
 class SCombination(SimpleTypeD):
     """SCombination is abstract because it has at least one abstractmethod and inherits from an abstract class"""
 
+    __slots__ = ("tds", "typep_plan", "hash_value")
+
     def __init__(self, *tds):
         self.tds = list(tds)
         assert all(isinstance(td, SimpleTypeD) for td in self.tds), \
@@ -43,6 +56,10 @@ class SCombination(SimpleTypeD):
             f"\n types = {[type(td) for td in self.tds]}" + \
             f"\n supers = {[type(td).mro() for td in self.tds]}"
         super().__init__()
+        # evaluation order of the operands in typep, see genus.typep_order
+        self.typep_plan = None
+        # the operands are never modified, so the hash is computed once, when first needed
+        self.hash_value = None
 
     @abstractmethod
     def create(self, tds: List[SimpleTypeD]) -> SimpleTypeD:
@@ -52,9 +69,14 @@ class SCombination(SimpleTypeD):
         return type(self) is type(that) \
                and self.tds == that.tds
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(tuple(self.tds))
 
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
+
     @abstractmethod
     def unit(self) -> SimpleTypeD:
         raise NotImplementedError
@@ -68,6 +90,45 @@ class SCombination(SimpleTypeD):
         # apparently this name may change, so keep track of it
         raise NotImplementedError
 
+    # the typep value of an operand which decides the typep value of
+    #   the combination, False for SAnd and True for SOr
+    @abstractmethod
+    def decisive_value(self) -> bool:
+        raise NotImplementedError
+
+    def typep_order(self) -> 'TypepOrder':
+        from genus.typep_order import TypepOrder
+        if self.typep_plan is None:
+            self.typep_plan = TypepOrder(self.tds)
+        return self.typep_plan
+
+    def typep(self, a: Any) -> bool:
+        return self.typep_memo(a, None)
+
+    # evaluate the operands, cheap and decisive ones first, stopping at the
+    #   first operand whose value decides the value of the combination.
+    def typep_memo(self, a: Any, memo: Optional[dict]) -> bool:
+        from genus import typep_order
+        decisive = self.decisive_value()
+        plan = self.typep_order()
+        if not typep_order.typep_adaptive:
+            for td in plan.ordered:
+                if bool(td.typep_memo(a, memo)) is decisive:
+                    return decisive
+            return not decisive
+        for position, td in enumerate(plan.ordered):
+            if bool(td.typep_memo(a, memo)) is decisive:
+                plan.record(position)
+                return decisive
+        plan.record(len(plan.ordered))
+        return not decisive
+
+    def typep_cost(self) -> float:
+        return sum(td.typep_cost() for td in self.tds)
+
+    def typep_total(self) -> bool:
+        return all(td.typep_total() for td in self.tds)
+
     def same_combination(self, td: SimpleTypeD) -> bool:
         return type(self) == type(td)
 
@@ -83,6 +144,13 @@ class SCombination(SimpleTypeD):
     def dual_combinator(self, a: Iterable[T], b: Iterable[T]) -> List[T]:
         raise NotImplementedError
 
+    # combinator and dual_combinator of SMember types, see genus.s_member.member_union
+    def member_combinator(self, members: List['SMemberImpl']) -> SimpleTypeD:
+        raise NotImplementedError
+
+    def member_dual_combinator(self, members: List['SMemberImpl']) -> SimpleTypeD:
+        raise NotImplementedError
+
     def create_dual(self, tds: Iterable[SimpleTypeD]) -> SimpleTypeD:
         raise NotImplementedError
 
@@ -262,7 +330,7 @@ class SCombination(SimpleTypeD):
 
     def conversion13(self) -> SimpleTypeD:
         from genus.s_not import SNot, notp
-        from genus.s_member import memberimplp, createSMember
+        from genus.s_member import memberimplp
 
         # multiple !member
         # SOr(x,!{-1, 1},!{1, 2, 3, 4})
@@ -273,15 +341,9 @@ class SCombination(SimpleTypeD):
         if len(not_members) <= 1:
             return self
         else:
-            import functools
-            # find all the items in all the SNot(SMember(...)) elements
-            #    this is a list of lists
-            items = [n.s.argpairs for n in not_members]
-            # flatten the list of lists into a single list, either by
+            # combine all the SNot(SMember(...)) elements, either by
             #   union or intersection depending on SOr or SAnd
-            combined = functools.reduce(lambda x, y: self.dual_combinator(x, y),
-                                        items)
-            new_not_member = SNot(createSMember([a for _, a in combined]))
+            new_not_member = SNot(self.member_dual_combinator([n.s for n in not_members]))
 
             def f(td):
                 if td in not_members:
@@ -298,16 +360,13 @@ class SCombination(SimpleTypeD):
         # multiple member
         # (or (member 1 2 3) (member 2 3 4 5)) --> (member 1 2 3 4 5)
         # (and (member 1 2 3) (member 2 3 4 5)) --> (member 2 3)
-        from genus.s_member import memberimplp, createSMember
+        from genus.s_member import memberimplp
 
         members = [td for td in self.tds if memberimplp(td)]
         if len(members) <= 1:
             return self
         else:
-            items = [m.argpairs for m in members]
-            combined = functools.reduce(lambda x, y: self.combinator(x, y),
-                                        items)
-            new_member = createSMember([a for _, a in combined])
+            new_member = self.member_combinator(members)
 
             def f(td):
                 if td in members:
@@ -319,7 +378,7 @@ class SCombination(SimpleTypeD):
 
     def conversion15(self) -> SimpleTypeD:
         from genus.s_not import SNot, notp
-        from genus.s_member import memberimplp, createSMember
+        from genus.s_member import memberimplp, member_difference
         from genus.s_and import andp
         from genus.s_or import orp
 
@@ -334,9 +393,6 @@ class SCombination(SimpleTypeD):
         # In the SOr  case we can remove the SMember(...) and filter the SNot(SMember(...))
         #      to notMemberArgs andNot memberArgs.
 
-        def diff(xs, ys):
-            return [x for x in xs if x not in ys]
-
         member = find_first(memberimplp, self.tds, None)
         not_member = find_first(lambda x: notp(x) and memberimplp(x.s), self.tds, None)
         if member is None:
@@ -350,13 +406,13 @@ class SCombination(SimpleTypeD):
                 if andp(self) and td == not_member:
                     return []
                 elif andp(self) and td == member:
-                    return [createSMember([a for _, a in diff(member.argpairs, not_member.s.argpairs)])]
+                    return [member_difference(member, not_member.s)]
 
                 # in the SOr case we remove the member and filter the not-member args
                 elif orp(self) and td == member:
                     return []
                 elif orp(self) and td == not_member:
-                    return [SNot(createSMember([a for _, a in diff(not_member.s.argpairs, member.argpairs)]))]
+                    return [SNot(member_difference(not_member.s, member))]
 
                 else:
                     return [td]
@@ -496,11 +552,55 @@ class SCombination(SimpleTypeD):
         td: Optional[SCombination] = find_first(self.dual_combination, self.tds, None)
         if td is None:
             return self
+        elif self.nf_clause_count() > nf_clause_limit:
+            return self
         else:
             return self.create_dual([self.create([y if x is td else x
                                                   for x in self.tds])
                                      for y in td.tds])
 
+    # number of clauses of the normal form obtained by distributing self over
+    #   all of its dual sub-combinations.  E.g., the DNF of
+    #   SAnd(x1, SOr(y1,y2,y3), SOr(z1,z2)) has 3*2 = 6 clauses.
+    def nf_clause_count(self) -> int:
+        count = 1
+        for td in self.tds:
+            if self.dual_combination(td):
+                count *= len(td.tds)
+        return count
+
+    # generate the clauses of the normal form of self one at a time, without
+    #   constructing the normal form.  E.g., the clauses of
+    #   SAnd(x1, SOr(y1,y2), SOr(z1,z2)) are
+    #   SAnd(x1,y1,z1), SAnd(x1,y1,z2), SAnd(x1,y2,z1), SAnd(x1,y2,z2).
+    #   There may be exponentially many clauses, see search_nf_clauses.
+    def nf_clauses(self) -> Iterator[SimpleTypeD]:
+        from itertools import product
+        positions = [i for i, td in enumerate(self.tds) if self.dual_combination(td)]
+
+        def clause(choice):
+            tds = list(self.tds)
+            for i, y in zip(positions, choice):
+                tds[i] = y
+            return self.create(tds)
+
+        return (clause(choice) for choice in product(*[self.tds[i].tds for i in positions]))
+
+    # examine the clauses of the normal form of self one at a time, at most limit of them.
+    #   Returns True as soon as test(clause) is True, False if test(clause) is False
+    #   for every clause, and None otherwise, in particular if the limit is reached.
+    def search_nf_clauses(self, test: Callable[[SimpleTypeD], Optional[bool]], limit: int) -> Optional[bool]:
+        from itertools import islice
+        dont_know = False
+        # no clause beyond the limit is constructed
+        for clause in islice(self.nf_clauses(), limit):
+            found = test(clause)
+            if found is True:
+                return True
+            elif found is None:
+                dont_know = True
+        return None if dont_know or self.nf_clause_count() > limit else False
+
     def replace_down(self, search: SimpleTypeD, replace: SimpleTypeD) -> SimpleTypeD:
         return self.create([td.replace(search, replace) for td in self.tds])
 
@@ -26,6 +26,7 @@ from typing import Literal, Any, TypeGuard
 
 class SEmptyImpl(SimpleTypeD, TerminalType):
     """The empty type, subtype of all types."""
+    __slots__ = ()
     __instance = None
 
     # overriding the __new__ method enables us to implement a singleton
@@ -42,6 +43,9 @@ class SEmptyImpl(SimpleTypeD, TerminalType):
     def typep(self, _any: Any) -> Literal[False]:
         return False
 
+    def typep_cost(self) -> float:
+        return 0.0
+
     def inhabited(self) -> Literal[False]:
         return False
 
@@ -29,6 +29,8 @@ class SEql(SMemberImpl, TerminalType):
 	"""The equal type, a type that is equal to a given object.
 	It has holds an "a" which is the object defining the type
 	"""
+	__slots__ = ("pair",)
+
 	def __init__(self, a: Any) -> None:
 		super(SEql, self).__init__(a)
 		self.pair = self.argpairs[0]
@@ -44,7 +46,9 @@ class SEql(SMemberImpl, TerminalType):
 		return hash(self.pair)
 
 	def typep(self, b: Any) -> bool:
-		return self.pair == (SAtomic(type(b)), b)
+		# same as self.pair == (SAtomic(type(b)), b), without interning SAtomic(type(b))
+		td, a = self.pair
+		return td.wrapped_class is type(b) and (a is b or a == b)
 
 	def inhabited_down(self) -> Literal[True]:
 		return True
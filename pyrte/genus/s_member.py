@@ -22,16 +22,25 @@
 
 from genus.simple_type_d import SimpleTypeD, TerminalType
 from genus.s_empty import SEmptyImpl
-from typing import Literal, Union, TypeGuard
+from typing import Any, Callable, List, Literal, Union, TypeGuard
 
 
 class SMemberImpl(SimpleTypeD):
     """docstring for SMemberImpl"""
+    __slots__ = ("argpairs", "argset", "unhashables", "sorted_argpairs", "hash_value")
 
     def __init__(self, *arglist):
         from genus.s_atomic import SAtomic
         super(SMemberImpl, self).__init__()
         self.argpairs = [(SAtomic(type(x)), x) if type(x) != tuple else (SAtomic(type(x[1])), x[1]) for x in arglist]
+        # argset contains (class, value) for each hashable value, so that typep
+        #   is a constant time lookup, the unhashable values, e.g., lists, are
+        #   kept in unhashables and searched linearly.
+        self.argset, self.unhashables = index_argpairs(self.argpairs)
+        # the argpairs in canonical order, computed once by canonical_argpairs
+        self.sorted_argpairs = None
+        # computed once, when first needed
+        self.hash_value = None
 
     def __str__(self):
         return "SMember(" + ", ".join([str(x) for x in self.argpairs]) + ")"
@@ -40,28 +49,62 @@ class SMemberImpl(SimpleTypeD):
         return type(self) is type(that) and \
                self.argpairs == that.argpairs
 
+    # equal argpairs have equal argsets, and argset is hashable even if
+    #   some of the values are not
+    def compute_hash(self):
+        return hash(self.argset)
+
     def __hash__(self):
-        return hash(tuple(self.argpairs))
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
 
     def typep(self, a):
-        from genus.s_atomic import SAtomic
-        return (SAtomic(type(a)), a) in self.argpairs
+        try:
+            return (type(a), a) in self.argset
+        except TypeError:
+            # a is not hashable
+            return any(type(a) is type(x) and (a is x or a == x) for x in self.unhashables)
+
+    def typep_cost(self) -> float:
+        # a hash lookup, plus a linear search of the unhashable values
+        return 1.0 + len(self.unhashables)
 
     def inhabited_down(self):
         return [] != self.argpairs
 
     def disjoint_down(self, t2):
         assert isinstance(t2, SimpleTypeD)
-        return not any(t2.typep(a) for (t, a) in self.argpairs)
+        if memberimplp(t2):
+            return self.argset.isdisjoint(t2.argset) \
+                and not any(t2.typep(a) for a in self.unhashables)
+        else:
+            return not any(t2.typep(a) for (t, a) in self.argpairs)
 
     def subtypep_down(self, t2):
-        return all(t2.typep(a) for (t, a) in self.argpairs)
+        if memberimplp(t2):
+            return self.argset <= t2.argset \
+                and all(t2.typep(a) for a in self.unhashables)
+        else:
+            return all(t2.typep(a) for (t, a) in self.argpairs)
 
-    def canonicalize_once(self, _nf=None):
+    def canonical_argpairs(self):
         from genus.utils import uniquify
         # Sort by type then by value so the equality of to list can show by index
         # In this implementation we have chosen this order.
-        return createSMember([a for _, a in sorted(uniquify(self.argpairs), key=lambda s: (type(s[1]).__name__, s[1]))])
+        if self.sorted_argpairs is None:
+            self.sorted_argpairs = sorted(uniquify(self.argpairs), key=lambda s: (type(s[1]).__name__, s[1]))
+        return self.sorted_argpairs
+
+    def canonicalize_once(self, _nf=None):
+        argpairs = self.canonical_argpairs()
+        if argpairs == self.argpairs:
+            return self
+        td = createSMember([a for _, a in argpairs])
+        if memberimplp(td):
+            # already in canonical order, no need to sort again
+            td.sorted_argpairs = td.argpairs
+        return td
 
     def cmp_to_same_class_obj(self, t: 'SMemberImpl') -> Literal[-1, 0, 1]:
         if type(self) != type(t):
@@ -89,8 +132,20 @@ class SMemberImpl(SimpleTypeD):
             return comp(0)
 
 
+# compute the argset and the list of unhashable values of the given argpairs, see SMemberImpl
+def index_argpairs(argpairs):
+    argset = set()
+    unhashables = []
+    for _, x in argpairs:
+        try:
+            argset.add((type(x), x))
+        except TypeError:
+            unhashables.append(x)
+    return frozenset(argset), unhashables
+
+
 class SMember(SMemberImpl, TerminalType):
-    pass
+    __slots__ = ()
 
 
 def createSMember(items) -> Union[SEmptyImpl, SMemberImpl]:
@@ -120,6 +175,40 @@ def createSMember(items) -> Union[SEmptyImpl, SMemberImpl]:
         return SMember(*items)
 
 
+# Set algebra of SMember types, in time linear in the number of values (if they
+#   are hashable).  The values are compared as by typep, i.e., (class, value).
+#   The values of the result are in the order of their first occurrence,
+#   and the result is SEmpty, an SEql, or an SMember, as by createSMember.
+def member_union(members: List[SMemberImpl]) -> SimpleTypeD:
+    seen = set()
+    unhashables = []
+    values = []
+    for m in members:
+        for _, a in m.argpairs:
+            try:
+                if (type(a), a) in seen:
+                    continue
+                seen.add((type(a), a))
+            except TypeError:
+                if any(type(a) is type(x) and (a is x or a == x) for x in unhashables):
+                    continue
+                unhashables.append(a)
+            values.append(a)
+    return createSMember(values)
+
+
+def member_intersection(members: List[SMemberImpl]) -> SimpleTypeD:
+    return member_filter(members[0], lambda a: all(m.typep(a) for m in members[1:]))
+
+
+def member_difference(m1: SMemberImpl, m2: SMemberImpl) -> SimpleTypeD:
+    return member_filter(m1, lambda a: not m2.typep(a))
+
+
+def member_filter(member: SMemberImpl, pred: Callable[[Any], bool]) -> SimpleTypeD:
+    return createSMember([a for _, a in member.argpairs if pred(a)])
+
+
 def memberimplp(this) -> TypeGuard[SMemberImpl]:
     return isinstance(this, SMemberImpl)
 
@@ -29,10 +29,14 @@ class SNot(SimpleTypeD):
     """A negation of a type.
     param s the type we want to get the complement"""
 
+    __slots__ = ("s", "hash_value")
+
     def __init__(self, s):
         super(SNot, self).__init__()
         assert isinstance(s, SimpleTypeD)
         self.s = s
+        # computed once, when first needed
+        self.hash_value = None
 
     def __str__(self) -> str:
         return "SNot(" + str(self.s) + ")"
@@ -41,12 +45,26 @@ class SNot(SimpleTypeD):
         return type(self) is type(that) and \
                self.s == that.s
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(self.s)
 
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
+
     def typep(self, a: Any) -> bool:
         return not self.s.typep(a)
 
+    def typep_memo(self, a: Any, memo: Optional[dict]) -> bool:
+        return not self.s.typep_memo(a, memo)
+
+    def typep_cost(self) -> float:
+        return self.s.typep_cost()
+
+    def typep_total(self) -> bool:
+        return self.s.typep_total()
+
     def inhabited_down(self) -> Optional[bool]:
         from genus.s_top import topp
         from genus.s_empty import emptyp
@@ -24,7 +24,7 @@ from genus.s_combination import SCombination
 from genus.s_empty import SEmpty
 from genus.s_top import STop
 from genus.utils import find_first
-from genus.utils import uniquify
+from genus.utils import uniquify, ordered_intersection
 from genus.simple_type_d import SimpleTypeD
 from typing import List, TypeVar, Callable, Optional, Iterable, Collection, TypeGuard
 
@@ -35,6 +35,7 @@ T = TypeVar('T')      # Declare type variable
 class SOr(SCombination):
     """Union type designator.  The operands are themselves type designators.
     param tds list, zero or more type designators"""
+    __slots__ = ()
 
     def __str__(self):
         return "SOr(" + ", ".join([str(td) for td in self.tds]) + ")"
@@ -56,13 +57,21 @@ class SOr(SCombination):
         return andp(td)
 
     def dual_combinator(self, a: Iterable[T], b: Collection[T]) -> List[T]:
-        return [x for x in a if x in b]
+        return ordered_intersection(a, b)
 
     def combinator(self, a: Iterable[T], b: Iterable[T]) -> List[T]:
         assert isinstance(a, list), f"expecting list, got {type(a)} a={a}"
         assert isinstance(b, list), f"expecting list, got {type(b)} b={b}"
         return uniquify(a + b)
 
+    def member_combinator(self, members: List['SMemberImpl']) -> SimpleTypeD:
+        from genus.s_member import member_union
+        return member_union(members)
+
+    def member_dual_combinator(self, members: List['SMemberImpl']) -> SimpleTypeD:
+        from genus.s_member import member_intersection
+        return member_intersection(members)
+
     def combo_filter(self, pred: Callable[[T], bool], xs: Iterable[T]) -> List[T]:
         return [x for x in xs if not pred(x)]
 
@@ -70,8 +79,8 @@ class SOr(SCombination):
         from genus.s_and import createSAnd
         return createSAnd(tds)
 
-    def typep(self, a) -> bool:
-        return any(td.typep(a) for td in self.tds)
+    def decisive_value(self) -> bool:
+        return True
 
     def inhabited_down(self) -> Optional[bool]:
         if any(td.inhabited() is True for td in self.tds):
@@ -104,7 +113,7 @@ class SOr(SCombination):
 
     def conversionD1(self) -> SimpleTypeD:
         from genus.s_not import SNot, notp
-        from genus.s_member import memberimplp, createSMember
+        from genus.s_member import memberimplp, member_filter
         # Dual of SAnd.conversionA1
 
         # SOr(SNot(SMember(42, 43, 44, "a","b")), String)
@@ -114,7 +123,7 @@ class SOr(SCombination):
         if not_member is None:
             return self
         else:
-            return SNot(createSMember([x for _, x in not_member.s.argpairs if not self.typep(x)]))
+            return SNot(member_filter(not_member.s, lambda x: not self.typep(x)))
 
     def conversionD3(self) -> SimpleTypeD:
         from genus.s_not import notp
@@ -19,17 +19,33 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import time
+
 from genus.simple_type_d import SimpleTypeD, TerminalType
-from typing import Literal, Any
+from typing import Literal, Any, Optional
+
+# typep_cost of an SSatisfies whose cost is neither given nor yet measured
+satisfies_default_cost = 10.0
+
+# if no cost is given, the first satisfies_cost_samples calls to typep are timed,
+#   and the cost is the mean time per call in units of typep_unit_seconds,
+#   the approximate time of one isinstance test.
+satisfies_cost_samples = 16
+typep_unit_seconds = 1e-7
 
 
 class SSatisfies(SimpleTypeD, TerminalType):
     """The super type, super type of all types."""
+    __slots__ = ("f", "printable", "cost", "typep_calls", "typep_seconds")
 
-    def __init__(self, f, printable):
+    # cost, if given, is the typep_cost of the predicate, in units of one isinstance test
+    def __init__(self, f, printable, cost: Optional[float] = None):
         assert callable(f)
         self.f = f
         self.printable = printable
+        self.cost = cost
+        self.typep_calls = 0
+        self.typep_seconds = 0.0
         super().__init__()
 
     def __eq__(self, that: Any) -> bool:
@@ -41,7 +57,32 @@ class SSatisfies(SimpleTypeD, TerminalType):
         return hash((self.f, self.printable))
 
     def typep(self, a: Any) -> bool:
-        return self.f(a)
+        if self.cost is not None or self.typep_calls >= satisfies_cost_samples:
+            return self.f(a)
+        start = time.perf_counter()
+        result = self.f(a)
+        self.typep_seconds += time.perf_counter() - start
+        self.typep_calls += 1
+        return result
+
+    def typep_memo(self, a: Any, memo: Optional[dict]) -> bool:
+        if memo is None:
+            return self.typep(a)
+        elif self not in memo:
+            memo[self] = self.typep(a)
+        return memo[self]
+
+    def typep_cost(self) -> float:
+        if self.cost is not None:
+            return self.cost
+        elif self.typep_calls == 0:
+            return satisfies_default_cost
+        else:
+            return self.typep_seconds / self.typep_calls / typep_unit_seconds
+
+    def typep_total(self) -> bool:
+        # the predicate may raise an exception on objects it does not expect
+        return False
 
     def __str__(self) -> str:
         return str(self.printable) + "?"
@@ -26,6 +26,7 @@ from typing import Any, Optional, Literal, TypeGuard
 
 class STopImpl(SimpleTypeD, TerminalType):
     """The super type, super type of all types."""
+    __slots__ = ()
     __instance = None
 
     # overriding the __new__ method enables us to implement a singleton
@@ -42,6 +43,9 @@ class STopImpl(SimpleTypeD, TerminalType):
     def typep(self, _any: Any) -> Literal[True]:
         return True
 
+    def typep_cost(self) -> float:
+        return 0.0
+
     def inhabited(self) -> Literal[True]:
         return True
 
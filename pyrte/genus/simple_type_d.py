@@ -36,23 +36,79 @@ from typing import NoReturn
 # is it useful, though ? all classes are types by default in python
 class TerminalType(metaclass=ABCMeta):
     """This class is just here to emulate the TerminalType trait in Scala"""
-    pass
+    __slots__ = ()
+
+
+# value of the slot inhabited_value until inhabited_down has been called
+not_computed = object()
+
+# slots holding caches which are recomputed on demand, rather than pickled
+cache_slots = ("subtypep_table", "disjoint_table", "canonicalized_table", "nf_table", "inhabited_value")
 
 
 class SimpleTypeD:
     """SimpleTypeD is the super class of all the
     representations of type in Genus"""
 
+    # The caches are allocated on first use, because most types, e.g., the
+    #   intermediate results of canonicalization, are never queried.
+    __slots__ = cache_slots
+
     def __init__(self):
-        self.subtypep_cache = {}
-        self.disjoint_cache = {}
-        self.canonicalized_hash = {}
-        self.lazy_inhabited = generate_lazy_val(lambda: self.inhabited_down())
-        self.nf_cache = {}
+        self.subtypep_table = None
+        self.disjoint_table = None
+        self.canonicalized_table = None
+        self.nf_table = None
+        self.inhabited_value = not_computed
 
     def __repr__(self):
         return self.__str__()
 
+    @property
+    def subtypep_cache(self) -> dict:
+        if self.subtypep_table is None:
+            self.subtypep_table = {}
+        return self.subtypep_table
+
+    @property
+    def disjoint_cache(self) -> dict:
+        if self.disjoint_table is None:
+            self.disjoint_table = {}
+        return self.disjoint_table
+
+    @property
+    def canonicalized_hash(self) -> dict:
+        if self.canonicalized_table is None:
+            self.canonicalized_table = {}
+        return self.canonicalized_table
+
+    @property
+    def nf_cache(self) -> dict:
+        if self.nf_table is None:
+            self.nf_table = {}
+        return self.nf_table
+
+    # Support for pickle, e.g., to send a type to another process.
+    #   The caches are not pickled, they are recomputed on demand,
+    #   nor is the hash_value of the classes which cache their hash,
+    #   as the hash of a class or a function differs from process to process.
+    def __getstate__(self):
+        from genus.utils import slot_names
+        state = dict((name, getattr(self, name)) for name in slot_names(type(self))
+                     if name not in cache_slots and name != "hash_value" and hasattr(self, name))
+        state.update(getattr(self, "__dict__", {}))
+        return state
+
+    def __setstate__(self, state):
+        if not hasattr(self, "nf_table"):
+            # unless this is an already initialized singleton, e.g., SAtomic(int)
+            SimpleTypeD.__init__(self)
+        for name, value in state.items():
+            setattr(self, name, value)
+        if hasattr(type(self), "compute_hash"):
+            # recomputed when first needed
+            self.hash_value = None
+
     @abstractmethod
     def typep(self, a) -> Literal[True, False]:
         """Returns whether a given object belongs to this designated type.
@@ -60,6 +116,24 @@ class SimpleTypeD:
             @param `a` the object we want to check the type
             @return a Boolean which is true if `a` is of this type"""
 
+    # Same as typep, but the values of the SSatisfies predicates are
+    #   remembered in the dict memo, or not remembered if memo is None,
+    #   see genus.typep_memo.
+    def typep_memo(self, a, memo: Optional[dict]) -> bool:
+        return self.typep(a)
+
+    # Estimated cost of one call to typep, in units of one isinstance test.
+    #   Used to order the evaluation of the operands of SAnd and SOr,
+    #   see genus.typep_order.
+    def typep_cost(self) -> float:
+        return 1.0
+
+    # Whether typep never raises an exception, whatever the object.  Only
+    #   SSatisfies may be partial, and operands of SAnd and SOr which are not
+    #   total are never evaluated before the operands which precede them.
+    def typep_total(self) -> bool:
+        return True
+
     def disjoint(self, td) -> Literal[True, False, None]:
         assert isinstance(td, SimpleTypeD)
         if td in self.disjoint_cache:
@@ -97,7 +171,9 @@ class SimpleTypeD:
         return None
 
     def inhabited(self) -> Literal[True, False, None]:
-        return self.lazy_inhabited()
+        if self.inhabited_value is not_computed:
+            self.inhabited_value = self.inhabited_down()
+        return self.inhabited_value
 
     def disjoint_down(self, t) -> Literal[True, False, None]:
         assert isinstance(t, SimpleTypeD)
@@ -192,7 +268,7 @@ class SimpleTypeD:
                 return type(a) == type(b) and a == b
 
             res = fixed_point(self, processor, good_enough)
-            self.canonicalized_hash |= {nf: res}
+            self.canonicalized_hash[nf] = res
             # tell the perhaps new object it is already canonicalized
             self.canonicalized_hash[nf].canonicalized_hash[nf] = self.canonicalized_hash[nf]
 
@@ -224,6 +300,10 @@ class SimpleTypeD:
         return self
 
     def typeEquivalent(self, t):
+        from genus.bdd import bdd_type_same, bdd_type_equivalent
+        # types with the same Bdd are equivalent, no need to canonicalize
+        if bdd_type_same(self, t):
+            return True
         can1 = generate_lazy_val(lambda: self.canonicalize())
         can2 = generate_lazy_val(lambda: t.canonicalize())
 
@@ -243,4 +323,5 @@ class SimpleTypeD:
             return False
         elif sp1 is True and sp2 is True:
             return True
-        return None
+        # otherwise decide by examining the paths of the Bdd of the symmetric difference
+        return bdd_type_equivalent(self, t)
@@ -0,0 +1,54 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Memoization of leaf type tests per element.
+#   td.typep_memo(element, memo) computes td.typep(element), but remembers in the
+#   dict memo the value of each SSatisfies predicate it calls, so that a predicate
+#   is called at most once per element, however many labels contain it.
+#   A fresh dict is used for each element, unless an ElementMemo is given, in which
+#   case the dict of an element is shared by every sequence containing that
+#   same (is) element.
+
+from typing import Any, Dict, Tuple
+
+# an ElementMemo forgets every element when it holds more than this many
+element_memo_limit = 10000
+
+
+class ElementMemo:
+    # The memo tables are keyed by id(element).  The elements are referenced by
+    #   the ElementMemo, so their ids cannot be reused by other objects.
+    #   An ElementMemo must only be used with immutable elements, as the
+    #   remembered values are never recomputed.
+    def __init__(self):
+        self.tables: Dict[int, Tuple[Any, Dict]] = {}
+
+    def table(self, element: Any) -> Dict:
+        entry = self.tables.get(id(element))
+        if entry is None:
+            if len(self.tables) >= element_memo_limit:
+                self.tables.clear()
+            entry = (element, {})
+            self.tables[id(element)] = entry
+        return entry[1]
+
+    def clear(self):
+        self.tables.clear()
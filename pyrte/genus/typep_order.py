@@ -0,0 +1,117 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Evaluation order of the operands of SAnd and SOr in typep.
+#   SAnd.typep stops at the first operand which does not contain the object,
+#   and SOr.typep stops at the first operand which does.  If the operands are
+#   independent, the expected cost of typep is minimal when the operands are
+#   evaluated in increasing order of cost/p, where cost is the typep_cost() of
+#   the operand, and p is the probability that the operand stops the evaluation.
+#   Initially p is unknown, and the operands are evaluated in increasing order
+#   of cost, ties being broken by the canonical order.  If typep_adaptive is
+#   True, then every typep_reorder_interval calls, the order is recomputed from
+#   counters of how often each operand was evaluated, and how often it stopped
+#   the evaluation.
+#
+#   An SSatisfies predicate may be partial, e.g., SSatisfies(lambda x: x % 4 == 0)
+#   fails on strings, and relies on preceding operands such as SAtomic(int) to
+#   guard it.  Therefore an operand which is not typep_total() is never moved
+#   before an operand which precedes it in tds; only total operands move forward.
+
+from typing import List
+
+# number of calls to typep between two recomputations of the evaluation order
+typep_reorder_interval = 256
+
+# if True, the counters are updated on every call to typep, and the order is
+#   recomputed from them.  This pays off when the same combination is tested
+#   on many objects, and the operands differ in selectivity on these objects,
+#   e.g., SOr(SAtomic(str), SAtomic(int)) tested on mostly ints.  But it adds
+#   the cost of the counters to every call, it makes the order depend on the
+#   history of the calls, and the counters are not protected against concurrent
+#   updates from several threads (the result of typep is correct regardless).
+#   If False, the default, the operands are evaluated in increasing order of
+#   static cost, and no counter is updated.
+typep_adaptive = False
+
+
+class TypepOrder:
+    def __init__(self, tds: List['SimpleTypeD']):
+        self.tds = tds
+        n = len(tds)
+        # for each operand (by position in tds), the number of times it was evaluated,
+        #   and the number of times it stopped the evaluation
+        self.evaluated = [0] * n
+        self.decided = [0] * n
+        # number of calls since the last reorder, and the number of those calls
+        #   which stopped at each position of the current order.  The last
+        #   entry counts the calls in which no operand stopped the evaluation.
+        self.calls = 0
+        self.stops = [0] * (n + 1)
+        self.order = list(range(n))
+        self.total = [td.typep_total() for td in tds]
+        self.ordered = tds
+        self.reorder()
+
+    def score(self, i: int) -> float:
+        # Laplace estimate of the probability that operand i stops the evaluation
+        p = (self.decided[i] + 1) / (self.evaluated[i] + 2)
+        return self.tds[i].typep_cost() / p
+
+    def reorder(self):
+        # the operand at position k of the current order was evaluated on
+        #   every call which did not stop at a position before k.
+        remaining = self.calls
+        for k, i in enumerate(self.order):
+            self.evaluated[i] += remaining
+            self.decided[i] += self.stops[k]
+            remaining -= self.stops[k]
+        self.calls = 0
+        self.stops = [0] * (len(self.tds) + 1)
+        if typep_adaptive:
+            self.order = self.guarded_sort(self.score)
+        else:
+            self.order = self.guarded_sort(lambda i: self.tds[i].typep_cost())
+        self.ordered = [self.tds[i] for i in self.order]
+
+    # sort the positions of tds by increasing key, except that a partial operand
+    #   is only placed once every operand preceding it in tds has been placed.
+    def guarded_sort(self, key) -> List[int]:
+        n = len(self.tds)
+        keys = [key(i) for i in range(n)]
+        placed = [False] * n
+        order = []
+        while len(order) < n:
+            first = placed.index(False)
+            i = min((i for i in range(first, n)
+                     if not placed[i] and (i == first or self.total[i])),
+                    key=lambda i: keys[i])
+            placed[i] = True
+            order.append(i)
+        return order
+
+    # record that a call to typep stopped at the given position of self.ordered,
+    #   position == len(self.ordered) if no operand stopped the evaluation.
+    def record(self, position: int):
+        self.stops[position] += 1
+        self.calls += 1
+        if self.calls >= typep_reorder_interval:
+            self.reorder()
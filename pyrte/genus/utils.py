@@ -20,10 +20,11 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 from collections import OrderedDict
+from contextlib import contextmanager
 from collections.abc import Iterable
 from functools import reduce  # import needed for python3; builtin in python2
 from collections import defaultdict
-from typing import TypeVar, Callable, List, Literal, Union, Dict, Tuple, Optional
+from typing import TypeVar, Callable, List, Literal, Union, Dict, Tuple, Optional, Any, Iterable
 
 T = TypeVar('T')  # Declare type variable
 S = TypeVar('S')  # Declare type variable
@@ -47,6 +48,15 @@ def generate_lazy_val(func: Callable[[], T]) -> Callable[[], T]:
     return lazy_holder
 
 
+# the names of the slots of the given class and of its super classes,
+#   i.e., the attributes of its instances when they have no __dict__
+def slot_names(cls: type) -> List[str]:
+    return [name
+            for c in cls.__mro__
+            for name in c.__dict__.get("__slots__", ())
+            if name not in ("__dict__", "__weakref__")]
+
+
 def fixed_point(v: T,
                 f: Callable[[T], T],
                 good_enough: Callable[[T, T], bool],
@@ -102,6 +112,24 @@ def uniquify(seq: List[T]) -> List[T]:
     return list(reversed(list(OrderedDict.fromkeys(reversed(seq)))))
 
 
+# return [x for x in xs if x in ys], in linear time if the elements of ys are hashable
+def ordered_intersection(xs: Iterable[T], ys: Iterable[T]) -> List[T]:
+    try:
+        ys = set(ys)
+    except TypeError:
+        ys = list(ys)
+    return [x for x in xs if x in ys]
+
+
+# return [x for x in xs if x not in ys], in linear time if the elements of ys are hashable
+def ordered_difference(xs: Iterable[T], ys: Iterable[T]) -> List[T]:
+    try:
+        ys = set(ys)
+    except TypeError:
+        ys = list(ys)
+    return [x for x in xs if x not in ys]
+
+
 def flat_map(f: Callable[[T], List[T]],
              xs: Iterable[T]) -> List[T]:
     return [y for z in xs for y in f(z)]
@@ -211,46 +239,180 @@ def get_all_subclasses(cls):
     return all_subclasses
 
 
+# Class hierarchy index, used by SAtomic to decide subtypep and disjoint.
+#   The MRO of a class does not change once the class is defined, so it is
+#   cached forever.  The set of subclasses of a class grows whenever a new
+#   subclass is defined anywhere below it; so each cached set of subclasses
+#   is stored with a signature, the identities of the direct subclasses of
+#   the classes in the set, which changes when a subclass is defined.
+#   Verifying the signature walks the set, so it is done at most once per
+#   generation of the index while the index is frozen, see class_index_frozen;
+#   outside of a frozen scope, it is done at every query.
+#   If class_index_check is False, the signature is never verified, and the
+#   application must call invalidate_class_index() after defining new classes.
+#   Classes with a metaclass other than type, e.g., ABCMeta, may have virtual
+#   subclasses, e.g., via register, so they are handled with issubclass.
+class_index_check = True
+class_index_generation = 0
+# incremented whenever a set of subclasses in the index is found to have changed
+class_index_changes = 0
+class_index_frozen_depth = 0
+mro_index = {}  # Dict[type, FrozenSet[type]]
+subclass_index = {}  # Dict[type, List[generation, signature, FrozenSet[type]]]
+common_subclass_index = {}  # Dict[Tuple[type, type], Tuple[FrozenSet[type], FrozenSet[type], bool]]
+
+
+def invalidate_class_index() -> None:
+    global class_index_generation, class_index_changes
+    class_index_generation += 1
+    class_index_changes += 1
+    subclass_index.clear()
+    common_subclass_index.clear()
+
+
+# Within this context, e.g., during the construction of a Dfa, no class is
+#   expected to be defined, so each set of subclasses is verified at most once.
+#   Entering the outermost context starts a new generation, so that the classes
+#   defined since the previous context are taken into account.
+@contextmanager
+def class_index_frozen():
+    global class_index_generation, class_index_frozen_depth
+    if 0 == class_index_frozen_depth:
+        class_index_generation += 1
+    class_index_frozen_depth += 1
+    try:
+        yield
+    finally:
+        class_index_frozen_depth -= 1
+
+
+def subclass_signature(classes) -> Tuple[int, ...]:
+    return tuple(id(c2) for c in classes for c2 in type.__subclasses__(c))
+
+
+def class_mro(cls: type):
+    if cls not in mro_index:
+        mro_index[cls] = frozenset(cls.__mro__)
+    return mro_index[cls]
+
+
+# return the set of all the subclasses of cls, including cls itself.
+def class_subclasses(cls: type):
+    global class_index_changes
+    if cls in subclass_index:
+        entry = subclass_index[cls]
+        generation, signature, subclasses = entry
+        if not class_index_check or (class_index_frozen_depth > 0 and generation == class_index_generation):
+            return subclasses
+        elif signature == subclass_signature(subclasses):
+            entry[0] = class_index_generation
+            return subclasses
+        else:
+            class_index_changes += 1
+    subclasses = {cls}
+    stack = [cls]
+    while stack:
+        for c in type.__subclasses__(stack.pop()):
+            if c not in subclasses:
+                subclasses.add(c)
+                stack.append(c)
+    subclasses = frozenset(subclasses)
+    subclass_index[cls] = [class_index_generation, subclass_signature(subclasses), subclasses]
+    return subclasses
+
+
+# A number which changes when a class has been defined below one of the
+#   classes in the index, as detected by class_subclasses, so that results
+#   computed from the index, e.g., by mdtd, may be cached until it changes.
+def class_hierarchy_version() -> int:
+    return class_index_changes
+
+
+# Verify the sets of subclasses of the given classes which are in the index,
+#   updating class_hierarchy_version() if any of them has changed.
+def verify_class_index(classes) -> None:
+    for c in classes:
+        if c in subclass_index:
+            class_subclasses(c)
+
+
+def is_subclass(c1: type, c2: type) -> bool:
+    if type(c2) is not type:
+        return issubclass(c1, c2)
+    else:
+        return c2 in class_mro(c1)
+
+
+# Is there a class which is a subclass of both c1 and c2?
+def have_common_subclass(c1: type, c2: type) -> bool:
+    if type(c1) is not type or type(c2) is not type:
+        return any(issubclass(c, c2) for c in class_subclasses(c1))
+    subclasses1 = class_subclasses(c1)
+    subclasses2 = class_subclasses(c2)
+    key = (c1, c2)
+    if key in common_subclass_index:
+        s1, s2, common = common_subclass_index[key]
+        if s1 is subclasses1 and s2 is subclasses2:
+            return common
+    common = not subclasses1.isdisjoint(subclasses2)
+    common_subclass_index[key] = (subclasses1, subclasses2, common)
+    common_subclass_index[(c2, c1)] = (subclasses2, subclasses1, common)
+    return common
+
+
 def trace_graph(v0: V,
-                edges: Callable[[V], List[Tuple[L, V]]]) -> Tuple[List[V],
-                                                                  List[List[Tuple[L, int]]]]:
+                edges: Callable[[V], List[Tuple[L, V]]],
+                budget: Optional['Budget'] = None,
+                progress: Optional[Callable[[int, int, int], Any]] = None,
+                map_edges: Optional[Callable[[Callable[[V], List[Tuple[L, V]]], List[V]],
+                                             List[List[Tuple[L, V]]]]] = None
+                ) -> Tuple[List[V],
+                           List[List[Tuple[L, int]]]]:
     # v0 type V
     # edges V => List[(L,V)]
     # if V is te type of vertex
     # and L is the type of label
-
-    current_state_id = 0  # int
-    next_available_state = 1  # int
-    es = edges(v0)  # List[(L,V)]
+    # The vertices are numbered in the order they are discovered, v0 being 0,
+    #   and are expanded in that same order, so int_to_v is the worklist:
+    #   int_to_v[len(m):] are the vertices discovered but not yet expanded.
+    #   Both int_to_v and m are only ever appended to.
+    # budget, if given, or else the ambient budget (see genus.budget), is checked
+    #   each time a vertex is expanded, raising BudgetExceeded if it is exhausted.
+    # progress, if given, is called as progress(expanded, discovered, transitions)
+    #   after each vertex (or frontier, see map_edges) is expanded.
+    # map_edges, if given, is called as map_edges(edges, vs) on the entire frontier
+    #   of discovered but not yet expanded vertices, and must return the list
+    #   [edges(v) for v in vs], in the same order, e.g., computed in parallel.
+    #   The edges are merged in order, so the numbering of the vertices is the
+    #   same as without map_edges.
+    from genus.budget import current_budget
+    budget = current_budget(budget)
     int_to_v = [v0]  # List[V]
     v_to_int = {v0: 0}  # Map[V -> int]
-    m = [[]]  # List[List[int]]
-    esi = 0  # index into es[...]
-    while True:
-        if esi == len(es):
-            nxt = current_state_id + 1
-            if nxt < next_available_state:
-                v2 = int_to_v[nxt]
-                current_state_id = nxt
-                es = edges(v2)
-                esi = 0
-                m.append([])
-                continue
-            else:
-                return int_to_v, m
+    m = []  # List[List[(L,int)]]
+    transition_count = 0
+
+    while len(m) < len(int_to_v):
+        if budget is not None:
+            budget.check(len(int_to_v), transition_count, "trace_graph")
+        if map_edges is None:
+            batch = [edges(int_to_v[len(m)])]
         else:
-            label, v1 = es[esi]
-            if v1 not in v_to_int:
-                v_to_int[v1] = next_available_state
-                next_available_state = next_available_state + 1
-                int_to_v = int_to_v + [v1]
-                continue
-            else:
-                # non-destructively update the list held at m[current_state_id]
-                #   by adding a new pair at the end (label,v_to_int[v1])
-                m[current_state_id] = m[current_state_id] + [(label, v_to_int[v1])]
-                esi = esi + 1
-                continue
+            batch = map_edges(edges, int_to_v[len(m):])
+        for es in batch:
+            row = []
+            for label, v1 in es:
+                i = v_to_int.get(v1)
+                if i is None:
+                    i = len(int_to_v)
+                    v_to_int[v1] = i
+                    int_to_v.append(v1)
+                row.append((label, i))
+            m.append(row)
+            transition_count = transition_count + len(row)
+        if progress is not None:
+            progress(len(m), len(int_to_v), transition_count)
+    return int_to_v, m
 
 
 def stringify(vec: List[T],
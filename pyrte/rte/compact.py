@@ -0,0 +1,160 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Compact representation of a Dfa.
+#   A Dfa holds a State object per state, each with its own dict of transitions,
+#   and a closure for its ite.  For Dfas with many states, memory is dominated
+#   by this per-object overhead.  A CompactDfa stores the same Dfa in a few arrays:
+#     labels     -- the distinct transition labels, each stored once
+#     offsets    -- the transitions of state q are at positions
+#                   offsets[q] to offsets[q + 1] - 1 of label_ids and targets
+#     label_ids  -- for each transition, the position of its label in labels
+#     targets    -- for each transition, the index of its destination state
+#     accepting  -- a bitset of the accepting states
+#   (the compressed sparse row, CSR, layout).  The states attribute is a lazy
+#   sequence of StateView objects, which are created on demand, and present the
+#   interface of State, so that to_dot, minimize, trim, etc. work unchanged.
+
+from array import array
+from typing import Any, Dict, List
+
+from rte.xymbolyco import Dfa, State
+
+
+class StateView(State):
+    # a State of a CompactDfa, constructed on demand.
+    #   Two views of the same state of the same CompactDfa are equal.
+    __slots__ = ("dfa",)
+
+    def __init__(self, dfa: 'CompactDfa', index: int):
+        self.dfa = dfa
+        self.index = index
+
+    @property
+    def initial(self) -> bool:
+        return 0 == self.index
+
+    @property
+    def accepting(self) -> bool:
+        return self.dfa.is_accepting(self.index)
+
+    @property
+    def pattern(self) -> None:
+        return None
+
+    @property
+    def transitions(self) -> Dict['SimpleTypeD', int]:
+        return self.dfa.transitions_of(self.index)
+
+    def ite(self):
+        return self.dfa.state_ite(self.index)
+
+    def __eq__(self, that: Any) -> bool:
+        return type(self) is type(that) and self.dfa is that.dfa and self.index == that.index
+
+    def __hash__(self):
+        return hash((id(self.dfa), self.index))
+
+    def __repr__(self):
+        return f"StateView({self.index})"
+
+
+class CompactStates:
+    # the lazy sequence of StateView of a CompactDfa
+    __slots__ = ("dfa",)
+
+    def __init__(self, dfa: 'CompactDfa'):
+        self.dfa = dfa
+
+    def __len__(self) -> int:
+        return self.dfa.state_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"state index {index} out of range")
+        return StateView(self.dfa, index)
+
+    def __iter__(self):
+        return (StateView(self.dfa, i) for i in range(len(self)))
+
+
+class CompactDfa(Dfa):
+    __slots__ = ("labels", "offsets", "label_ids", "targets", "accepting", "state_count", "ites")
+
+    def __init__(self, dfa: Dfa):
+        # interned labels: label -> position in self.labels
+        positions: Dict['SimpleTypeD', int] = {}
+        self.labels: List['SimpleTypeD'] = []
+        self.offsets = array('i', [0])
+        self.label_ids = array('i')
+        self.targets = array('i')
+        self.state_count = len(dfa.states)
+        self.accepting = bytearray((self.state_count + 7) // 8)
+        for i, q in enumerate(dfa.states):
+            assert i == q.index, f"expecting state {i} at position {i}, got {q.index}"
+            for td, dst in q.transitions.items():
+                if td not in positions:
+                    positions[td] = len(self.labels)
+                    self.labels.append(td)
+                self.label_ids.append(positions[td])
+                self.targets.append(dst)
+            self.offsets.append(len(self.targets))
+            if q.accepting:
+                self.accepting[i >> 3] |= 1 << (i & 7)
+        self.pattern = dfa.pattern
+        self.exit_map = dict(dfa.exit_map)
+        self.combine_labels = dfa.combine_labels
+        # ite of each state, computed when the state is first simulated
+        self.ites = {}
+
+    @property
+    def states(self) -> CompactStates:
+        return CompactStates(self)
+
+    def is_accepting(self, index: int) -> bool:
+        return bool(self.accepting[index >> 3] >> (index & 7) & 1)
+
+    def transitions_of(self, index: int) -> Dict['SimpleTypeD', int]:
+        return dict((self.labels[self.label_ids[t]], self.targets[t])
+                    for t in range(self.offsets[index], self.offsets[index + 1]))
+
+    def state_ite(self, index: int):
+        from genus.ite import transitions_to_ite
+        if index not in self.ites:
+            self.ites[index] = transitions_to_ite(list(self.transitions_of(index).items()))
+        return self.ites[index]
+
+    # return an equivalent Dfa made of State objects
+    def expand(self) -> Dfa:
+        return Dfa(pattern=self.pattern,
+                   states=[State(index=q.index,
+                                 initial=q.initial,
+                                 accepting=q.accepting,
+                                 pattern=None,
+                                 transitions=q.transitions,
+                                 validate="cheap")
+                           for q in self.states],
+                   exit_map=dict(self.exit_map),
+                   combine_labels=self.combine_labels)
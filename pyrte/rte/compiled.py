@@ -0,0 +1,99 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Compilation of a Dfa into a dense integer transition table.
+#   Each State of a Dfa has its own transition labels and its own ite, so the
+#   same type tests are repeated from state to state.  dfa.compile() computes,
+#   once, the mdtd of all the transition labels of the Dfa, i.e., a global
+#   alphabet of disjoint classes such that each label is a union of classes.
+#   A single ite maps an element to the id of its class, and the Dfa becomes
+#   a table of int, indexed by (state, class id).  Simulation is one
+#   classification plus one table lookup per element.
+
+from array import array
+from typing import Any, List, Optional
+
+
+def dfa_alphabet(dfa: 'Dfa') -> List[tuple]:
+    # the global alphabet of the Dfa: the mdtd of the labels of all its transitions.
+    #   Returns a list of triples (class, factors, disjoints), see mdtd.
+    from genus.mdtd import mdtd
+    return mdtd(set(td for q in dfa.states for td in q.transitions))
+
+
+class CompiledDfa:
+    def __init__(self, dfa: 'Dfa'):
+        from genus.ite import transitions_to_ite
+        alphabet = dfa_alphabet(dfa)
+        # self.alphabet[k] is the type designator of class k
+        self.alphabet = [td for td, _, _ in alphabet]
+        # an extra class id, len(self.alphabet), is given to elements belonging
+        #   to no class, its column of the table contains only -1.
+        self.width = len(self.alphabet) + 1
+        self.classifier = transitions_to_ite([(td, k) for k, td in enumerate(self.alphabet)],
+                                             len(self.alphabet))
+        # self.table[q * self.width + k] is the state reached from state q
+        #   on an element of class k, or -1 if there is no such transition.
+        self.table = array('i', [-1]) * (len(dfa.states) * self.width)
+        for q in dfa.states:
+            for k, (_, factors, _) in enumerate(alphabet):
+                for td in factors:
+                    if td in q.transitions:
+                        self.table[q.index * self.width + k] = q.transitions[td]
+                        break
+        self.accepting = frozenset(q.index for q in dfa.states if q.accepting)
+        self.exit_map = dict(dfa.exit_map)
+        self.state_count = len(dfa.states)
+
+    # the id of the class containing the element, see Dfa.simulate for memo
+    def classify(self, element: Any, memo: Optional[dict] = None) -> int:
+        from genus.ite import eval_ite
+        return eval_ite(self.classifier, element, {} if memo is None else memo)
+
+    def delta(self, state_id: int, class_id: int) -> int:
+        return self.table[state_id * self.width + class_id]
+
+    def simulate(self, sequence: List[Any], memo: Optional['ElementMemo'] = None) -> Any:
+        from genus.ite import eval_ite
+        table = self.table
+        width = self.width
+        classifier = self.classifier
+        state_id = 0
+        for element in sequence:
+            k = eval_ite(classifier, element, {} if memo is None else memo.table(element))
+            state_id = table[state_id * width + k]
+            if state_id < 0:
+                return None
+        if state_id in self.accepting:
+            return self.exit_map[state_id]
+        else:
+            return None
+
+    # write the compiled Dfa to a file, see rte.dfa_file
+    def save(self, path: str) -> None:
+        from rte.dfa_file import save_dfa
+        save_dfa(self, path)
+
+    # the table as a NumPy array of shape (states, classes + 1), sharing
+    #   the memory of self.table.  Requires NumPy.
+    def table_array(self) -> 'ndarray':
+        import numpy as np
+        return np.frombuffer(self.table, dtype=np.intc).reshape(self.state_count, self.width)
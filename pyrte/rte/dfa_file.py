@@ -0,0 +1,441 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Binary file format of a compiled Dfa, see Dfa.save and Dfa.load.
+#   The file is a header followed by four sections, each starting at a
+#   multiple of 8 bytes:
+#     table     -- the transition table of the CompiledDfa, see rte.compiled,
+#                  state_count * width little endian 32 bit ints.
+#     accepting -- a bitset of (state_count + 7) // 8 bytes, bit (q & 7) of
+#                  byte (q >> 3) is set iff state q is accepting.
+#     labels    -- the alphabet and the classifier ite, see LabelEncoder.
+#     exits     -- the exit_map, see LabelEncoder.
+#   The labels and the exits are written as JSON, in an explicit encoding of
+#   the type designators, the ites, and of a few types of values (None, bool,
+#   int, float, complex, str, bytes, tuple, list, frozenset, and dict), rather
+#   than with pickle, so loading a file never executes code from the file.
+#   An SAtomic is written as the module and the name of its class, and is only
+#   resolved in a module which is already imported when the file is loaded.
+#   An SSatisfies is written as the name under which its predicate was
+#   registered with register_predicate, and resolved by that name when the file
+#   is loaded, so the predicate need not be picklable, e.g., it may be a lambda.
+#
+#   load_dfa maps the file into memory: the table and the bitset are neither read
+#   nor copied, the operating system shares one copy among all the processes
+#   which map the same file, and the exit_map is decoded when first used.
+#   Thus the time to load a Dfa depends on the size of its alphabet, but not
+#   on the number of its states.
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+from rte.compiled import CompiledDfa
+
+magic = b"PYRTEDFA"
+format_version = 2
+
+# magic, format_version, width, state_count, table, accepting, labels and exits
+#   offsets, labels and exits lengths.
+header = struct.Struct("<8sIIQQQQQQQ")
+
+# registered predicates of SSatisfies, name -> predicate, and predicate -> name
+predicates: Dict[str, Callable[[Any], bool]] = {}
+predicate_names: Dict[Callable[[Any], bool], str] = {}
+
+
+class DfaFileError(Exception):
+    def __init__(self, msg, path):
+        self.msg = msg
+        self.path = path  # the file, or None if the Dfa is not read from or written to a file
+        super().__init__(msg)
+
+
+def register_predicate(name: str, f: Callable[[Any], bool]) -> None:
+    # a Dfa with transitions labeled by SSatisfies(f, ...) may only be saved
+    #   if f is registered, and loaded in a process where f is registered
+    #   under the same name.
+    if name in predicates and predicates[name] is not f:
+        del predicate_names[predicates[name]]
+    predicates[name] = f
+    predicate_names[f] = name
+
+
+# The table is stored little endian; on other machines it is copied and swapped.
+native_table = sys.byteorder == "little" and array('i').itemsize == 4
+
+
+def align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+# values of these types are written as JSON constants
+constant_types = (type(None), bool, int, float, str)
+
+
+class LabelEncoder:
+    # Encode values, type designators, and ites as a list of nodes, each node
+    #   being a JSON list whose first element is a tag, and whose other elements
+    #   refer to earlier nodes by their index, so that shared sub-structures,
+    #   e.g., of an ite, are written once.
+    def __init__(self):
+        self.nodes: List[list] = []
+        self.indices: Dict[int, int] = {}  # id(obj) -> index of its node
+        self.objects: List[Any] = []  # the encoded objects, so that their ids are not reused
+
+    def add(self, obj: Any, node: list) -> int:
+        self.indices[id(obj)] = len(self.nodes)
+        self.objects.append(obj)
+        self.nodes.append(node)
+        return len(self.nodes) - 1
+
+    def value(self, v: Any) -> int:
+        if id(v) in self.indices:
+            return self.indices[id(v)]
+        elif type(v) in constant_types:
+            return self.add(v, ["const", v])
+        elif type(v) is complex:
+            return self.add(v, ["complex", v.real, v.imag])
+        elif type(v) is bytes:
+            return self.add(v, ["bytes", v.hex()])
+        elif type(v) in (tuple, list, frozenset):
+            return self.add(v, [type(v).__name__, [self.value(x) for x in v]])
+        elif type(v) is dict:
+            return self.add(v, ["dict", [[self.value(k), self.value(x)] for k, x in v.items()]])
+        else:
+            raise DfaFileError(f"cannot save {v} of type {type(v)}", None)
+
+    def cls(self, c: type) -> int:
+        if id(c) in self.indices:
+            return self.indices[id(c)]
+        elif resolve_class(c.__module__, c.__qualname__) is not c:
+            raise DfaFileError(f"cannot save class {c}, it is not accessible by its name", None)
+        return self.add(c, ["class", c.__module__, c.__qualname__])
+
+    def td(self, td: 'SimpleTypeD') -> int:
+        from genus.s_top import STopImpl
+        from genus.s_empty import SEmptyImpl
+        from genus.s_and import SAnd
+        from genus.s_or import SOr
+        from genus.s_not import SNot
+        from genus.s_atomic import SAtomic
+        from genus.s_eql import SEql
+        from genus.s_member import SMember
+        from genus.s_satisfies import SSatisfies
+        if id(td) in self.indices:
+            return self.indices[id(td)]
+        elif isinstance(td, STopImpl):
+            return self.add(td, ["top"])
+        elif isinstance(td, SEmptyImpl):
+            return self.add(td, ["empty"])
+        elif type(td) in (SAnd, SOr):
+            return self.add(td, ["and" if type(td) is SAnd else "or", [self.td(td1) for td1 in td.tds]])
+        elif type(td) is SNot:
+            return self.add(td, ["not", self.td(td.s)])
+        elif type(td) is SAtomic:
+            return self.add(td, ["atomic", self.cls(td.wrapped_class)])
+        elif type(td) is SEql:
+            return self.add(td, ["eql", self.value(td.pair[1])])
+        elif type(td) is SMember:
+            return self.add(td, ["member", [self.value(x) for _, x in td.argpairs]])
+        elif type(td) is SSatisfies:
+            if td.f not in predicate_names:
+                raise DfaFileError(f"predicate {td.f} of {td} is not registered, see register_predicate", None)
+            return self.add(td, ["satisfies", predicate_names[td.f], td.printable, td.cost])
+        else:
+            raise DfaFileError(f"cannot save type designator {td} of type {type(td)}", None)
+
+    def ite(self, ite: tuple) -> int:
+        if id(ite) in self.indices:
+            return self.indices[id(ite)]
+        elif 1 == len(ite):
+            return self.add(ite, ["leaf", self.value(ite[0])])
+        else:
+            td, positive, negative = ite
+            return self.add(ite, ["ite", self.td(td), self.ite(positive), self.ite(negative)])
+
+
+# the class of the given name in the given module, if the module is already
+#   imported, otherwise None.  No module is imported.
+def resolve_class(module: str, qualname: str) -> Optional[type]:
+    obj = sys.modules.get(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name, None)
+    return obj if isinstance(obj, type) else None
+
+
+# Decode the nodes written by LabelEncoder, returning the list of decoded objects.
+#   Raises DfaFileError if the nodes are malformed.
+def decode_nodes(nodes: list) -> List[Any]:
+    from genus.s_top import STop
+    from genus.s_empty import SEmpty
+    from genus.s_and import SAnd
+    from genus.s_or import SOr
+    from genus.s_not import SNot
+    from genus.s_atomic import SAtomic
+    from genus.s_eql import SEql
+    from genus.s_member import SMember
+    from genus.s_satisfies import SSatisfies
+    decoded: List[Any] = []
+
+    def ref(i: Any) -> Any:
+        if type(i) is not int or not 0 <= i < len(decoded):
+            raise DfaFileError(f"bad reference {i} in node {len(decoded)}", None)
+        return decoded[i]
+
+    def pair(v: Any) -> tuple:
+        # SEql and SMember interpret a tuple as a pair (SAtomic, value)
+        return SAtomic(type(v)), v
+
+    for node in nodes:
+        if type(node) is not list or not node:
+            raise DfaFileError(f"bad node {node}", None)
+        tag, args = node[0], node[1:]
+        try:
+            if tag == "const" and type(args[0]) in constant_types:
+                obj = args[0]
+            elif tag == "complex":
+                obj = complex(float(args[0]), float(args[1]))
+            elif tag == "bytes":
+                obj = bytes.fromhex(args[0])
+            elif tag in ("tuple", "list", "frozenset"):
+                obj = {"tuple": tuple, "list": list, "frozenset": frozenset}[tag](ref(i) for i in args[0])
+            elif tag == "dict":
+                obj = dict((ref(k), ref(v)) for k, v in args[0])
+            elif tag == "class":
+                obj = resolve_class(args[0], args[1])
+                if obj is None:
+                    raise DfaFileError(f"class {args[1]} not found in module {args[0]}", None)
+            elif tag == "top":
+                obj = STop
+            elif tag == "empty":
+                obj = SEmpty
+            elif tag == "and":
+                obj = SAnd(*[ref(i) for i in args[0]])
+            elif tag == "or":
+                obj = SOr(*[ref(i) for i in args[0]])
+            elif tag == "not":
+                obj = SNot(ref(args[0]))
+            elif tag == "atomic":
+                obj = SAtomic(ref(args[0]))
+            elif tag == "eql":
+                obj = SEql(pair(ref(args[0])))
+            elif tag == "member":
+                obj = SMember(*[pair(ref(i)) for i in args[0]])
+            elif tag == "satisfies":
+                name, printable, cost = args
+                if name not in predicates:
+                    raise DfaFileError(f"predicate {name} of {printable} is not registered, see register_predicate",
+                                       None)
+                obj = SSatisfies(predicates[name], printable, cost)
+            elif tag == "leaf":
+                obj = (ref(args[0]),)
+            elif tag == "ite":
+                obj = (ref(args[0]), ref(args[1]), ref(args[2]))
+            else:
+                raise DfaFileError(f"bad node {node}", None)
+        except DfaFileError:
+            raise
+        except (IndexError, KeyError, TypeError, ValueError, AssertionError) as e:
+            raise DfaFileError(f"bad node {node}: {e}", None) from None
+        decoded.append(obj)
+    return decoded
+
+
+def encode_labels(compiled: CompiledDfa) -> bytes:
+    encoder = LabelEncoder()
+    alphabet = [encoder.td(td) for td in compiled.alphabet]
+    classifier = encoder.ite(compiled.classifier)
+    return json.dumps({"nodes": encoder.nodes, "alphabet": alphabet, "classifier": classifier}).encode()
+
+
+def encode_exits(exit_map: Dict[int, Any]) -> bytes:
+    encoder = LabelEncoder()
+    exits = [[q, encoder.value(v)] for q, v in exit_map.items()]
+    return json.dumps({"nodes": encoder.nodes, "exits": exits}).encode()
+
+
+def load_json(data) -> dict:
+    try:
+        obj = json.loads(bytes(data))
+    except ValueError as e:
+        raise DfaFileError(f"bad Dfa file section: {e}", None) from None
+    if type(obj) is not dict or type(obj.get("nodes")) is not list:
+        raise DfaFileError("bad Dfa file section", None)
+    return obj
+
+
+def decode_labels(data) -> (list, tuple):
+    obj = load_json(data)
+    decoded = decode_nodes(obj["nodes"])
+    try:
+        return [decoded[i] for i in obj["alphabet"]], decoded[obj["classifier"]]
+    except (IndexError, KeyError, TypeError) as e:
+        raise DfaFileError(f"bad labels: {e}", None) from None
+
+
+def decode_exits(data) -> Dict[int, Any]:
+    obj = load_json(data)
+    decoded = decode_nodes(obj["nodes"])
+    try:
+        return dict((int(q), decoded[i]) for q, i in obj["exits"])
+    except (IndexError, KeyError, TypeError, ValueError) as e:
+        raise DfaFileError(f"bad exits: {e}", None) from None
+
+
+# the contents of the file of the given CompiledDfa
+def encode_dfa(compiled: CompiledDfa) -> bytearray:
+    table = array('i', compiled.table)
+    if sys.byteorder != "little":
+        table.byteswap()
+    accepting = bytearray((compiled.state_count + 7) // 8)
+    for q in compiled.accepting:
+        accepting[q >> 3] |= 1 << (q & 7)
+    labels = encode_labels(compiled)
+    exits = encode_exits(compiled.exit_map)
+
+    table_offset = align(header.size)
+    accepting_offset = align(table_offset + len(table) * 4)
+    labels_offset = align(accepting_offset + len(accepting))
+    exits_offset = align(labels_offset + len(labels))
+    data = bytearray(exits_offset + len(exits))
+    header.pack_into(data, 0, magic, format_version, compiled.width, compiled.state_count,
+                     table_offset, accepting_offset, labels_offset, len(labels), exits_offset, len(exits))
+    data[table_offset:table_offset + len(table) * 4] = table.tobytes()
+    data[accepting_offset:accepting_offset + len(accepting)] = accepting
+    data[labels_offset:labels_offset + len(labels)] = labels
+    data[exits_offset:exits_offset + len(exits)] = exits
+    return data
+
+
+def save_dfa(compiled: CompiledDfa, path: str) -> None:
+    try:
+        data = encode_dfa(compiled)
+    except DfaFileError as e:
+        raise DfaFileError(e.msg, path) from None
+    with open(path, "wb") as stream:
+        stream.write(data)
+
+
+class AcceptingBits:
+    # the set of accepting states of a MappedDfa, read from the bitset
+    def __init__(self, bits, state_count: int):
+        self.bits = bits
+        self.state_count = state_count
+
+    def __contains__(self, index: int) -> bool:
+        return 0 <= index < self.state_count and bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def __iter__(self):
+        return (q for q in range(self.state_count) if q in self)
+
+
+class MappedDfa(CompiledDfa):
+    # A CompiledDfa read from the contents of a file, see encode_dfa.
+    #   buffer is any object supporting the buffer protocol, e.g., an mmap
+    #   or bytes, the table and the accepting states are views of it.
+    #   closer, if given, is called by close().
+    def __init__(self, buffer, path: Optional[str] = None, closer: Optional[Callable[[], None]] = None):
+        self.path = path
+        self.closer = closer
+        self.buffer = memoryview(buffer)
+        if len(self.buffer) < header.size:
+            raise DfaFileError(f"not a Dfa file, only {len(self.buffer)} bytes", path)
+        (file_magic, version, self.width, self.state_count, table_offset, accepting_offset,
+         labels_offset, labels_length, exits_offset, exits_length) = header.unpack_from(self.buffer, 0)
+        if file_magic != magic:
+            raise DfaFileError(f"not a Dfa file, bad magic number {file_magic}", path)
+        if version != format_version:
+            raise DfaFileError(f"unsupported Dfa file version {version}, expecting {format_version}", path)
+        if len(self.buffer) < exits_offset + exits_length:
+            raise DfaFileError(f"truncated Dfa file, {len(self.buffer)} bytes, expecting {exits_offset + exits_length}",
+                               path)
+        table = self.buffer[table_offset:table_offset + self.state_count * self.width * 4]
+        if native_table:
+            self.table = table.cast('i')
+        else:
+            self.table = array('i', table.tobytes())
+            self.table.byteswap()
+        self.accepting = AcceptingBits(self.buffer[accepting_offset:accepting_offset + (self.state_count + 7) // 8],
+                                       self.state_count)
+        try:
+            self.alphabet, self.classifier = decode_labels(self.buffer[labels_offset:labels_offset + labels_length])
+        except DfaFileError as e:
+            raise DfaFileError(e.msg, path) from None
+        self.exits = self.buffer[exits_offset:exits_offset + exits_length]
+        self.exit_values = None
+
+    @property
+    def exit_map(self) -> Dict[int, Any]:
+        if self.exit_values is None:
+            try:
+                self.exit_values = decode_exits(self.exits)
+            except DfaFileError as e:
+                raise DfaFileError(e.msg, self.path) from None
+        return self.exit_values
+
+    # return an equivalent Dfa made of State objects
+    def expand(self) -> 'Dfa':
+        from genus.s_or import createSOr
+        from rte.xymbolyco import createDfa
+        triples = []
+        for q in range(self.state_count):
+            classes: Dict[int, list] = {}
+            for k, td in enumerate(self.alphabet):
+                dst = self.delta(q, k)
+                if dst >= 0:
+                    classes.setdefault(dst, []).append(td)
+            triples.extend((q, createSOr(tds), dst) for dst, tds in classes.items())
+        return createDfa(pattern=None,
+                         ini=0,
+                         transition_triples=triples,
+                         accepting_states=list(self.accepting),
+                         exit_map=dict(self.exit_map),
+                         validate="cheap")
+
+    # release the views of the buffer, then the buffer itself, e.g., unmap the file.
+    #   The MappedDfa may no longer be used.
+    def close(self) -> None:
+        if isinstance(self.table, memoryview):
+            self.table.release()
+        self.accepting.bits.release()
+        self.exits.release()
+        self.buffer.release()
+        if self.closer is not None:
+            self.closer()
+            self.closer = None
+
+
+# Load the Dfa saved in the file with save_dfa.  If mmap is True, the file is mapped
+#   into memory, otherwise it is read.
+def load_dfa(path: str, mmap: bool = True) -> MappedDfa:
+    import mmap as mm
+    with open(path, "rb") as stream:
+        if not mmap:
+            return MappedDfa(stream.read(), path)
+        try:
+            mapped = mm.mmap(stream.fileno(), 0, access=mm.ACCESS_READ)
+        except ValueError as e:
+            # e.g., an empty file
+            raise DfaFileError(f"cannot map Dfa file: {e}", path) from None
+    return MappedDfa(mapped, path, mapped.close)
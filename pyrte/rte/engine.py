@@ -0,0 +1,190 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+# Selection of the algorithm used to construct a Dfa from an Rte.
+#   Two engines are available, the Brzozowski derivative construction (rte_to_dfa)
+#   and the Thompson construction (constructThompsonDfa).  rte.to_dfa(engine="auto")
+#   chooses between them by looking at a few cheap structural features of the Rte.
+#   "auto" is opt-in, the default engine remains "brzozowski".
+#   Every construction is timed, and the timings are recorded in build_times
+#   so that the thresholds below can be calibrated against a corpus of patterns,
+#   see benchmark_engines.
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from genus.utils import class_index_frozen
+from rte.r_rte import Rte
+
+
+def brzozowski_engine(pattern: Rte, exit_value: Any, processes: Optional[int] = None) -> 'Dfa':
+    from rte.xymbolyco import rte_to_dfa
+    return rte_to_dfa(pattern, exit_value, processes=processes)
+
+
+def thompson_engine(pattern: Rte, exit_value: Any, processes: Optional[int] = None) -> 'Dfa':
+    # the Thompson construction is sequential, processes is ignored
+    from rte.thompson import constructThompsonDfa
+    return constructThompsonDfa(pattern, exit_value)
+
+
+# map of engine name to a function (pattern, exit_value) -> Dfa.
+#   An application may register additional engines here.
+#   build_dfa only passes the keyword argument processes if it is given.
+engines: Dict[str, Callable[[Rte, Any], 'Dfa']] = {"brzozowski": brzozowski_engine,
+                                                  "thompson": thompson_engine}
+
+# thresholds used by select_engine.  The Thompson construction is only chosen
+#   for patterns without And and Not, because each And and Not requires a
+#   determinization and a product automaton in the Thompson construction.
+#   These values are not yet calibrated, see benchmark_engines.
+thompson_min_size = 40
+thompson_min_star_height = 3
+thompson_min_first_types = 8
+
+# for each engine name, a bounded history of (features, seconds) pairs,
+#   one pair for each Dfa constructed by build_dfa.
+build_times_history = 1000
+build_times: Dict[str, Deque[Tuple[Dict[str, int], float]]] = {}
+
+
+def rte_children(rt: Rte) -> List[Rte]:
+    from rte.r_combination import Combination
+    from rte.r_cat import catp
+    from rte.r_star import starp
+    from rte.r_not import notp
+    if isinstance(rt, Combination) or catp(rt):
+        return rt.operands
+    elif starp(rt) or notp(rt):
+        return [rt.operand]
+    else:
+        return []
+
+
+# compute the structural features of an Rte which select_engine uses.
+#   size          -- number of nodes in the Rte
+#   and_count     -- number of And nodes
+#   not_count     -- number of Not nodes
+#   star_height   -- maximum nesting depth of Star nodes
+#   first_types   -- number of distinct first types
+def rte_features(pattern: Rte) -> Dict[str, int]:
+    from rte.r_and import andp
+    from rte.r_not import notp
+    from rte.r_star import starp
+
+    size = 0
+    and_count = 0
+    not_count = 0
+    star_height = 0
+    # iterative walk, because patterns may be deeper than the recursion limit
+    stack = [(pattern, 0)]
+    while stack:
+        rt, height = stack.pop()
+        size += 1
+        if andp(rt):
+            and_count += 1
+        elif notp(rt):
+            not_count += 1
+        elif starp(rt):
+            height += 1
+            star_height = max(star_height, height)
+        stack.extend((child, height) for child in rte_children(rt))
+    return {"size": size,
+            "and_count": and_count,
+            "not_count": not_count,
+            "star_height": star_height,
+            "first_types": len(pattern.first_types())}
+
+
+# processes, if greater than 1, selects "brzozowski", as the Thompson
+#   construction is sequential.
+def select_engine(features: Dict[str, int], processes: Optional[int] = None) -> str:
+    if processes is not None and processes > 1:
+        return "brzozowski"
+    elif features["and_count"] > 0 or features["not_count"] > 0:
+        return "brzozowski"
+    elif features["size"] >= thompson_min_size \
+            or features["star_height"] >= thompson_min_star_height \
+            or features["first_types"] >= thompson_min_first_types:
+        return "thompson"
+    else:
+        return "brzozowski"
+
+
+def record_build_time(engine: str, features: Dict[str, int], seconds: float) -> None:
+    if engine not in build_times:
+        build_times[engine] = deque(maxlen=build_times_history)
+    build_times[engine].append((features, seconds))
+
+
+# Construct a Dfa from the given pattern using the named engine.
+#   engine="auto" selects an engine according to the features of the pattern.
+#   ValueError is raised if processes greater than 1 is given with the
+#   sequential "thompson" engine, rather than silently ignoring it.
+#   If a budget is given, it is installed for the duration of the construction,
+#   so that every graph builder used by the engine checks it.
+#   processes, if given, is the number of processes the engine may use.
+def build_dfa(pattern: Rte, exit_value: Any = True, engine: str = "brzozowski",
+              budget: Optional['Budget'] = None,
+              processes: Optional[int] = None) -> 'Dfa':
+    features = rte_features(pattern)
+    if engine == "auto":
+        engine = select_engine(features, processes)
+    if engine not in engines:
+        raise ValueError(f"unknown Dfa engine {engine}, expecting auto or one of {list(engines)}")
+    if engine == "thompson" and processes is not None and processes > 1:
+        raise ValueError(f"the thompson engine is sequential, it cannot use processes={processes}")
+    options = {} if processes is None else {"processes": processes}
+    start = time.perf_counter()
+    # no class is defined during the construction, see genus.utils.class_index_frozen
+    with class_index_frozen():
+        if budget is None:
+            dfa = engines[engine](pattern, exit_value, **options)
+        else:
+            with budget:
+                dfa = engines[engine](pattern, exit_value, **options)
+    record_build_time(engine, features, time.perf_counter() - start)
+    return dfa
+
+
+# Construct the Dfa of each given pattern with each of the given engines
+#   (default all registered engines), and return a list of dicts, one per pattern,
+#   of the form {"pattern": ..., "features": ..., "selected": ..., "seconds": {engine: seconds}}.
+#   This data can be used to calibrate the thresholds used by select_engine.
+def benchmark_engines(patterns: List[Rte],
+                      engine_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    if engine_names is None:
+        engine_names = list(engines)
+    report = []
+    for pattern in patterns:
+        features = rte_features(pattern)
+        seconds = {}
+        for engine in engine_names:
+            start = time.perf_counter()
+            build_dfa(pattern, True, engine)
+            seconds[engine] = time.perf_counter() - start
+        report.append({"pattern": pattern,
+                       "features": features,
+                       "selected": select_engine(features),
+                       "seconds": seconds})
+    return report
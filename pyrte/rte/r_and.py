@@ -29,6 +29,7 @@ verbose = False
 class And(Combination):
     from rte.r_rte import Rte
     from genus.simple_type_d import SimpleTypeD
+    __slots__ = ()
 
     def __str__(self):
         return "And(" + ", ".join([str(td) for td in self.operands]) + ")"
@@ -62,11 +63,13 @@ class And(Combination):
 
     def set_operation(self, a: List[Any], b: List[Any]) -> List[Any]:
         # intersection
-        return [x for x in a if x in b]
+        from genus.utils import ordered_intersection
+        return ordered_intersection(a, b)
 
     def set_dual_operation(self, a: List[Any], b: List[Any]) -> List[Any]:
         # union
-        return a + [x for x in b if x not in a]
+        from genus.utils import ordered_difference
+        return a + ordered_difference(b, a)
 
     def annihilator(self, a: SimpleTypeD, b: SimpleTypeD) -> Optional[bool]:
         return a.subtypep(b)
@@ -28,12 +28,15 @@ verbose = False
 
 class Cat(Rte):
     from genus.simple_type_d import SimpleTypeD
+    __slots__ = ("operands", "hash_value")
 
     def __init__(self, *operands):
         self.operands = list(operands)
         assert all(isinstance(operand, Rte) for operand in operands), \
             f"Cat(...) expects Rtes as arguments, got {[type(o) for o in operands]}"
         super().__init__()
+        # the operands are never modified, so the hash is computed once, when first needed
+        self.hash_value = None
 
     def __str__(self):
         return "Cat(" + ", ".join([str(td) for td in self.operands]) + ")"
@@ -42,9 +45,14 @@ class Cat(Rte):
         return type(self) is type(that) and \
                self.operands == that.operands
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(tuple(self.operands))
 
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
+
     def cmp_to_same_class_obj(self, t) -> Literal[-1, 0, 1]:
         from genus.utils import compare_sequence
         return compare_sequence(self.operands, t.operands)
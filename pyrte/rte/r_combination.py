@@ -26,19 +26,28 @@ from typing import Literal, Set, Callable, Optional
 
 
 class Combination(Rte):
+    __slots__ = ("operands", "hash_value")
+
     def __init__(self, *operands):
         self.operands = list(operands)
         assert all(isinstance(operand, Rte) for operand in operands), \
             f"And and Or expect Rtes as arguments, got {[type(o) for o in operands]}"
         super().__init__()
+        # the operands are never modified, so the hash is computed once, when first needed
+        self.hash_value = None
 
     def __eq__(self, that):
         return type(self) is type(that) and \
                self.operands == that.operands
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(tuple(self.operands))
 
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
+
     def create(self, operands):
         raise Exception(f"create not implemented for {type(self)}")
 
@@ -289,7 +298,7 @@ class Combination(Rte):
         #  {...} deleting elements, x, for which SOr(X,SNot(Y)).typep(x) is true
         # --> Or({...},Singleton(X),Not(Singleton(Y)))
         from genus.utils import find_first, remove_element, flat_map, search_replace
-        from genus.s_member import memberimplp, createSMember
+        from genus.s_member import memberimplp, member_filter
         from genus.s_not import SNot
         from rte.r_singleton import singletonp, Singleton
         from rte.r_not import notp
@@ -314,7 +323,7 @@ class Combination(Rte):
         if not looser:
             return self
         td = self.createTypeD(looser)
-        rt = Singleton(createSMember([a for _, a in member.argpairs if self.orInvert(td.typep(a))]))
+        rt = Singleton(member_filter(member, lambda a: self.orInvert(td.typep(a))))
         return self.create(search_replace(self.operands, singleton, rt))
 
     def conversionC21(self) -> Rte:
@@ -25,6 +25,7 @@ from typing import Set, Literal, Callable, Tuple, List, Optional
 
 
 class EmptySetImpl (Rte):
+    __slots__ = ()
     __instance = None
     from genus.simple_type_d import SimpleTypeD
 
@@ -28,6 +28,7 @@ class EpsilonImpl (Rte):
     from rte.r_emptyset import EmptySetImpl
     from genus.simple_type_d import SimpleTypeD
 
+    __slots__ = ()
     __instance = None
 
     def __new__(cls, *a, **kw):
@@ -26,12 +26,15 @@ from typing import Literal, Set, Callable, Optional, Tuple, List, TypeGuard
 
 class Not(Rte):
     from genus.simple_type_d import SimpleTypeD
+    __slots__ = ("operand", "hash_value")
 
     def __init__(self, operand):
         super(Not, self).__init__()
         assert isinstance(operand, Rte), \
             f"expecting object of type Rte got {type(operand)}: {operand}"
         self.operand = operand
+        # computed once, when first needed
+        self.hash_value = None
 
     def __str__(self):
         return "Not(" + str(self.operand) + ")"
@@ -40,9 +43,14 @@ class Not(Rte):
         return type(self) is type(that) and \
                self.operand == that.operand
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(self.operand)
 
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
+
     def cmp_to_same_class_obj(self, t) -> Literal[-1, 0, 1]:
         from genus.utils import cmp_objects
         return cmp_objects(self.operand, t.operand)
@@ -30,6 +30,7 @@ verbose = False
 
 class Or(Combination):
     from rte.r_and import And
+    __slots__ = ()
 
     def __str__(self):
         return "Or(" + ", ".join([str(td) for td in self.operands]) + ")"
@@ -63,11 +64,13 @@ class Or(Combination):
 
     def set_dual_operation(self, a: List[Any], b: List[Any]) -> List[Any]:
         # intersection
-        return [x for x in a if x in b]
+        from genus.utils import ordered_intersection
+        return ordered_intersection(a, b)
 
     def set_operation(self, a: List[Any], b: List[Any]) -> List[Any]:
         # union
-        return a + [x for x in b if x not in a]
+        from genus.utils import ordered_difference
+        return a + ordered_difference(b, a)
 
     def annihilator(self, a, b) -> Optional[bool]:
         return a.supertypep(b)
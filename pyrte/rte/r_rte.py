@@ -47,10 +47,26 @@ class CannotComputeDerivatives(Exception):
 class Rte:
     from genus.simple_type_d import SimpleTypeD
     #  from rte.xymbolyco import Dfa
+    __slots__ = ()
 
     def __repr__(self):
         return self.__str__()
 
+    # Support for pickle, e.g., to send an Rte to another process.
+    #   The hash_value of the classes which cache their hash is not pickled,
+    #   as the hash of a class or a function differs from process to process.
+    def __getstate__(self):
+        from genus.utils import slot_names
+        return dict((name, getattr(self, name)) for name in slot_names(type(self))
+                    if name != "hash_value" and hasattr(self, name))
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        if hasattr(type(self), "compute_hash"):
+            # recomputed when first needed
+            self.hash_value = None
+
     def first_types(self) -> Set[SimpleTypeD]:
         return set()  # empty set
 
@@ -110,52 +126,48 @@ class Rte:
     #    [(STop, 2)],
     #    [(STop, 2)]])
 
-    def derivatives(self) -> Tuple[List['Rte'],
-                                   List[List[Tuple[SimpleTypeD, int]]]]:
+    # If a budget is given (see genus.budget), or if one is installed by an
+    #   enclosing with statement, then BudgetExceeded is raised when the number
+    #   of states, transitions, or elapsed time exceeds the budget.
+    # If processes > 1, the edges of the states in each frontier of the graph are
+    #   computed on a pool of that many processes.  The states are numbered
+    #   in the same order as in the sequential computation.  If the Rte cannot
+    #   be pickled, e.g., because it contains an SSatisfies of a lambda, the
+    #   computation is sequential.
+    def derivatives(self,
+                    budget: Optional['Budget'] = None,
+                    processes: Optional[int] = None) -> Tuple[List['Rte'],
+                                                              List[List[Tuple[SimpleTypeD, int]]]]:
+        from functools import partial
         from genus.utils import trace_graph
-        from genus.mdtd import mdtd
-        from genus.simple_type_d import SimpleTypeD
-
-        def edges(rt: Rte) -> List[Tuple[SimpleTypeD, Rte]]:
-            assert isinstance(rt, Rte)
-            fts = rt.first_types()
-            wrts = mdtd(fts)
-
-            def d(wrt: Optional[SimpleTypeD],
-                  factors: List[SimpleTypeD],
-                  disjoints: List[SimpleTypeD]) -> Rte:
-                try:
-                    return rt.derivative(wrt, factors, disjoints).canonicalize()
-                except CannotComputeDerivative as e:
-                    if rt == rt.canonicalize():
-                        msg = "\n".join([f"When generating derivatives from {self}",
-                                         f"  when computing edges of {rt}",
-                                         f"  which canonicalizes to {rt.canonicalize()}",
-                                         f"  computing derivative of {e.rte}",
-                                         f"  wrt={e.wrt}",
-                                         f"  factors={factors}",
-                                         f"  disjoints={disjoints}",
-                                         f"  derivatives() reported: {e.msg}"])
-                        raise CannotComputeDerivatives(msg=msg,
-                                                       rte=rt,
-                                                       wrt=wrt,
-                                                       factors=factors,
-                                                       disjoints=disjoints,
-                                                       first_types=fts,
-                                                       mdtd=wrts) from None
-                    else:
-                        print(f"failed to compute derivative of {rt} wrt={wrt}," +
-                              f"\n  computing derivative of {rt.canonicalize()} instead")
-                        return rt.canonicalize().derivative(wrt, factors, disjoints).canonicalize()
-
-            return [(td, d(td, factors, disjoints))
-                    for [td, factors, disjoints] in wrts]
-
-        return trace_graph(self, edges)
-
-    def to_dfa(self, exit_value: Any = True):
-        from rte.xymbolyco import rte_to_dfa
-        return rte_to_dfa(self, exit_value)
+
+        edges = partial(derivative_edges, self)
+        if processes is None or processes < 2 or not picklablep(self):
+            return trace_graph(self, edges, budget)
+
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            def map_edges(f, rts):
+                if len(rts) < parallel_min_frontier:
+                    return [f(rt) for rt in rts]
+                else:
+                    return list(executor.map(f, rts, chunksize=max(1, len(rts) // (4 * processes))))
+
+            return trace_graph(self, edges, budget, map_edges=map_edges)
+
+    # engine is "auto", "brzozowski", "thompson", or the name of any engine
+    #   registered in rte.engine.engines.  "auto" selects the engine according
+    #   to the structure of the Rte, see rte.engine.select_engine; it is opt-in,
+    #   the default being "brzozowski".
+    #   budget, if given, limits the construction, see genus.budget
+    #   processes, if given, is the number of processes the engine may use, see derivatives
+    def to_dfa(self,
+               exit_value: Any = True,
+               engine: str = "brzozowski",
+               budget: Optional['Budget'] = None,
+               processes: Optional[int] = None):
+        from rte.engine import build_dfa
+        return build_dfa(self, exit_value, engine, budget, processes)
 
     def simulate(self, exit_value: Any, sequence: List[Any]) -> Any:
         return self.to_dfa(exit_value).simulate(sequence)
@@ -189,6 +201,11 @@ class Rte:
         rte1 = self
         return rte1.to_dfa(True).equivalent(rte2.to_dfa(True))
 
+    # whether every sequence matched by rte2 is matched by self,
+    #   True, False, or None if it cannot be proven, see Dfa.includes
+    def subsumes(self, rte2):
+        return self.to_dfa(True).includes(rte2.to_dfa(True))
+
     def search(self, test: Callable[['Rte'], bool]) -> Optional['Rte']:
         # search the Rte for any node satisfying the given predicate, test
         # return that node (of type Rte) else return None
@@ -202,6 +219,62 @@ class Rte:
         raise TypeError(f"generateThompson not implemented for {self} of type {type(self)}")
 
 
+# frontiers smaller than this are expanded in the calling process
+#   by Rte.derivatives(processes=...), as the round trip to the pool costs more
+#   than it saves.
+parallel_min_frontier = 4
+
+
+def picklablep(obj: Any) -> bool:
+    import pickle
+    try:
+        pickle.dumps(obj)
+        return True
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+
+
+# Compute the edges from the state rt in the derivative graph of root,
+#   see Rte.derivatives.  This is a top level function, rather than a closure,
+#   so that it can be sent to another process.
+def derivative_edges(root: Rte, rt: Rte) -> List[Tuple['SimpleTypeD', Rte]]:
+    from genus.mdtd import mdtd
+    from genus.simple_type_d import SimpleTypeD
+    assert isinstance(rt, Rte)
+    fts = rt.first_types()
+    wrts = mdtd(fts)
+
+    def d(wrt: Optional[SimpleTypeD],
+          factors: List[SimpleTypeD],
+          disjoints: List[SimpleTypeD]) -> Rte:
+        try:
+            return rt.derivative(wrt, factors, disjoints).canonicalize()
+        except CannotComputeDerivative as e:
+            if rt == rt.canonicalize():
+                msg = "\n".join([f"When generating derivatives from {root}",
+                                 f"  when computing edges of {rt}",
+                                 f"  which canonicalizes to {rt.canonicalize()}",
+                                 f"  computing derivative of {e.rte}",
+                                 f"  wrt={e.wrt}",
+                                 f"  factors={factors}",
+                                 f"  disjoints={disjoints}",
+                                 f"  derivatives() reported: {e.msg}"])
+                raise CannotComputeDerivatives(msg=msg,
+                                               rte=rt,
+                                               wrt=wrt,
+                                               factors=factors,
+                                               disjoints=disjoints,
+                                               first_types=fts,
+                                               mdtd=wrts) from None
+            else:
+                print(f"failed to compute derivative of {rt} wrt={wrt}," +
+                      f"\n  computing derivative of {rt.canonicalize()} instead")
+                return rt.canonicalize().derivative(wrt, factors, disjoints).canonicalize()
+
+    return [(td, d(td, factors, disjoints))
+            for [td, factors, disjoints] in wrts]
+
+
 def random_rte(depth):
     import random
 
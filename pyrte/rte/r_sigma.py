@@ -26,6 +26,7 @@ from typing import Literal, Set, Callable, Tuple, List, Optional
 
 
 class SigmaImpl (Rte):
+    __slots__ = ()
     __instance = None
 
     def __new__(cls, *a, **kw):
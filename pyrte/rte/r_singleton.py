@@ -26,10 +26,14 @@ from typing import Literal, Set, Optional, List, Callable, Tuple, TypeGuard
 
 
 class Singleton(Rte):
+    __slots__ = ("operand", "hash_value")
+
     def __init__(self, operand):
         super(Singleton, self).__init__()
         assert isinstance(operand, SimpleTypeD)
         self.operand = operand
+        # computed once, when first needed
+        self.hash_value = None
 
     def __str__(self):
         return "Singleton(" + str(self.operand) + ")"
@@ -38,9 +42,14 @@ class Singleton(Rte):
         return type(self) is type(that) and \
                self.operand == that.operand
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(self.operand)
 
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
+
     def cmp_to_same_class_obj(self, t) -> Literal[-1, 0, 1]:
         from genus.utils import cmp_objects
         return cmp_objects(self.operand, t.operand)
@@ -28,6 +28,7 @@ from rte.r_sigma import Sigma
 from typing import Literal, Set, Optional, List, Callable, Tuple, TypeGuard
 
 class Star(Rte):
+    __slots__ = ("operand", "hash_value")
     __instances = {}
 
     def __new__(cls, operand, *a, **kw):
@@ -40,11 +41,17 @@ class Star(Rte):
         else:
             return super(Star, cls).__new__(cls, *a, **kw)
 
+    # pickle must call __new__ with the operand, to find the unique instance if any
+    def __getnewargs__(self):
+        return (self.operand,)
+
     def __init__(self, operand):
         super(Star, self).__init__()
         assert isinstance(operand, Rte), \
             f"expecting Rte: got {operand} of type {type(operand)}"
         self.operand = operand
+        # computed once, when first needed
+        self.hash_value = None
 
     def __str__(self):
         return "Star(" + str(self.operand) + ")"
@@ -53,9 +60,14 @@ class Star(Rte):
         return type(self) is type(that) and \
                self.operand == that.operand
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(self.operand)
 
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.compute_hash()
+        return self.hash_value
+
     def cmp_to_same_class_obj(self, t) -> Literal[-1, 0, 1]:
         from genus.utils import cmp_objects
         return cmp_objects(self.operand, t.operand)
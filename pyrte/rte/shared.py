@@ -0,0 +1,112 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Sharing compiled Dfas among processes through multiprocessing.shared_memory.
+#   publish_dfa copies the file format of the Dfa (see rte.dfa_file) once into
+#   a named shared memory block, and attach_dfa, called in any process with
+#   that name, returns a SharedDfa whose transition table is a view of the
+#   block, so every process simulates against the same physical copy.
+#   A SharedDfa pickles as its name, so it may be passed as an argument to the
+#   workers of a multiprocessing pool; each process attaches once to each name.
+#
+#   The process which published the Dfa owns the block: the block exists until
+#   it calls unlink(), after which the processes already attached may continue to
+#   use it until they close() it.
+
+import os
+from typing import Dict, Optional, Union
+
+from rte.dfa_file import MappedDfa, encode_dfa
+
+# the SharedDfas attached in this process, name -> SharedDfa
+attached: Dict[str, 'SharedDfa'] = {}
+
+
+class SharedDfa(MappedDfa):
+    def __init__(self, shm: 'SharedMemory', owner: bool):
+        self.shm = shm
+        self.name = shm.name
+        self.owner = owner  # whether this process published the Dfa
+        super().__init__(shm.buf, None, shm.close)
+
+    # pickle sends the name, the receiving process attaches to the block
+    def __reduce__(self):
+        return attach_dfa, (self.name,)
+
+    def close(self) -> None:
+        if attached.get(self.name) is self:
+            del attached[self.name]
+        super().close()
+
+    # destroy the shared memory block, only the owner should call unlink
+    def unlink(self) -> None:
+        if os.name == "posix":
+            # the block is registered again, as a process which attached to it
+            #   with the same resource tracker, e.g., a worker of a pool, has
+            #   unregistered it, see attach_dfa, and unlink unregisters it.
+            from multiprocessing import resource_tracker
+            resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+
+
+# dfa is a Dfa or a CompiledDfa.  name, if given, is the name of the block,
+#   otherwise a unique name is generated.
+def publish_dfa(dfa: Union['Dfa', 'CompiledDfa'], name: Optional[str] = None) -> SharedDfa:
+    from multiprocessing.shared_memory import SharedMemory
+    from rte.compiled import CompiledDfa
+    data = encode_dfa(dfa if isinstance(dfa, CompiledDfa) else dfa.compile())
+    shm = SharedMemory(name=name, create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    return remember(SharedDfa(shm, True))
+
+
+# release the views of the blocks attached in this process before the blocks
+#   themselves are collected, which fails while views exist.
+def close_attached() -> None:
+    for shared in list(attached.values()):
+        shared.close()
+
+
+def remember(shared: SharedDfa) -> SharedDfa:
+    import atexit
+    if not attached:
+        atexit.unregister(close_attached)
+        atexit.register(close_attached)
+    attached[shared.name] = shared
+    return shared
+
+
+def attach_dfa(name: str) -> SharedDfa:
+    from multiprocessing.shared_memory import SharedMemory
+    if name not in attached:
+        try:
+            # only the owner should unlink the block when this process exits
+            shm = SharedMemory(name=name, track=False)
+        except TypeError:
+            # before python 3.13, every SharedMemory is registered with the resource
+            #   tracker of this process, which would unlink the block, or warn of
+            #   a leak, when this process exits, so it is unregistered.
+            shm = SharedMemory(name=name)
+            if os.name == "posix":
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+        remember(SharedDfa(shm, False))
+    return attached[name]
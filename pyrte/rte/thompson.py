@@ -389,26 +389,30 @@ def constructThompsonDfa(pattern: Rte, ret: Any = True) -> 'Dfa':
                      transition_triples=determinized,
                      accepting_states=outs,
                      exit_map=fmap,
-                     )
+                     validate="cheap")
 
 
 def simulateRte(sequence: List[Any],
                 exitValue: E,
-                rte: Rte) -> Optional[E]:
+                rte: Rte,
+                memo: Optional['ElementMemo'] = None) -> Optional[E]:
     ini, outs, transitions = constructEpsilonFreeTransitions(rte)
     return simulateTransitions(sequence, exitValue,
-                               ini, outs, transitions)
+                               ini, outs, transitions, memo)
 
 
 # this function can be used for debugging,
 # use the FA described by the transitions which might be deterministic or otherwise,
 #   but without epsilon transitions, to test whether the FA recognizes the input sequence.
 #   return the given exit_value if yes, and return None otherwise.
+#   Each SSatisfies predicate is called at most once per element, however many
+#   transition labels contain it, see Dfa.simulate for the meaning of memo.
 def simulateTransitions(sequence: List[Any],
                         exitValue: E,
                         ini: int,
                         outs: List[int],
-                        transitions: List[Tuple[int, SimpleTypeD, int]]) -> Optional[E]:
+                        transitions: List[Tuple[int, SimpleTypeD, int]],
+                        memo: Optional['ElementMemo'] = None) -> Optional[E]:
     groups = group_by(lambda trans: trans[0],
                       transitions)
 
@@ -417,9 +421,10 @@ def simulateTransitions(sequence: List[Any],
         for v in sequence:
             if not qs:
                 return None
+            table = {} if memo is None else memo.table(v)
             qs = {y for q in qs
                   for _x, td, y in groups.get(q, [])
-                  if td.typep(v)}
+                  if td.typep_memo(v, table)}
         return qs
 
     computation = simulate()
@@ -434,7 +439,7 @@ def simulateTransitions(sequence: List[Any],
 def profile(pattern: Rte, depth: int, r: int, view: bool = True, verbose: bool = False):
     dfa_thompson = constructThompsonDfa(pattern, 42).trim()
     min_thompson = dfa_thompson.minimize().trim()
-    dfa_brzozowski = pattern.to_dfa(42).trim()
+    dfa_brzozowski = pattern.to_dfa(42, engine="brzozowski").trim()
     min_brzozowski = dfa_brzozowski.minimize().trim()
     if len(min_brzozowski.states) != len(min_thompson.states):
         if verbose:
@@ -0,0 +1,179 @@
+# Copyright (©) 2022 EPITA Research and Development Laboratory
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Vectorized simulation of a Dfa on sequences of numbers, using NumPy.
+#   The Dfa is compiled (see rte.compiled) into a global alphabet of disjoint
+#   classes and a dense table indexed by (state, class id).  To simulate the Dfa on a sequence, the class
+#   id of every element is first computed in bulk, using
+#     dtype checks for SAtomic,
+#     np.isin for SEql and SMember,
+#     array predicates registered with register_array_predicate for SSatisfies,
+#     and logical operations on masks for SAnd, SOr, and SNot,
+#   and then the table is followed, one lookup per element.
+#
+#   The result is the same as dfa.simulate(list(sequence)), where the elements of
+#   a NumPy array are first converted to Python objects by array.tolist(), e.g.,
+#   the elements of an int64 array are of type int.  Sequences which are neither
+#   homogeneous NumPy arrays of numbers, nor lists of numbers of a single type,
+#   are classified element by element.
+#
+#   NumPy is only needed by this module; it is imported when the module is used.
+
+from typing import Any, Callable, Dict, Optional
+
+# map of a predicate f, as given to SSatisfies(f, ...), to a function which
+#   computes f on every element of a NumPy array, returning an array of bool.
+array_predicates: Dict[Callable[[Any], bool], Callable[['ndarray'], 'ndarray']] = {}
+
+# Python type of the elements of a NumPy array, according to the kind of its dtype,
+#   as converted by array.tolist()
+dtype_kinds = {"b": bool, "i": int, "u": int, "f": float, "c": complex, "U": str}
+
+# array predicates are only applied to arrays of these types
+numeric_types = (bool, int, float)
+
+
+def register_array_predicate(f: Callable[[Any], bool], vf: Callable[['ndarray'], 'ndarray']) -> None:
+    # vf must compute f on every element of an array, e.g.,
+    #   register_array_predicate(positive, lambda a: a > 0)
+    #   vf is only called on arrays of numbers, and must not raise an exception.
+    array_predicates[f] = vf
+
+
+def representable(x: Any, dtype: 'dtype') -> bool:
+    # whether x can be stored in an array of the given dtype without changing its value
+    try:
+        return dtype.type(x) == x
+    except (OverflowError, ValueError):
+        return False
+
+
+def type_mask(td: 'SimpleTypeD', values: 'ndarray', element_type: Optional[type], where: 'ndarray') -> 'ndarray':
+    # compute the array of bool, td.typep(x) for each element x of values for which
+    #   where is True, and False elsewhere.  element_type is the Python type of
+    #   every element of values, or None if values is an array of objects.
+    #   Per element predicates are only called where the mask is True, so
+    #   SAnd(SAtomic(int), SSatisfies(f)) does not call f on non-ints.
+    import numpy as np
+    from genus.s_and import andp
+    from genus.s_or import orp
+    from genus.s_not import notp
+    from genus.s_atomic import atomicp
+    from genus.s_member import memberimplp
+    from genus.s_satisfies import SSatisfies
+    from genus.s_top import topp
+    from genus.s_empty import emptyp
+
+    if topp(td):
+        return where.copy()
+    elif emptyp(td):
+        return np.zeros_like(where)
+    elif andp(td):
+        mask = where.copy()
+        for operand in td.tds:
+            mask &= type_mask(operand, values, element_type, mask)
+        return mask
+    elif orp(td):
+        mask = np.zeros_like(where)
+        rest = where.copy()
+        for operand in td.tds:
+            hit = type_mask(operand, values, element_type, rest)
+            mask |= hit
+            rest &= ~hit
+        return mask
+    elif notp(td):
+        return where & ~type_mask(td.s, values, element_type, where)
+    elif element_type is not None and atomicp(td):
+        return where & issubclass(element_type, td.wrapped_class)
+    elif element_type is not None and memberimplp(td) and not td.unhashables:
+        # a candidate which the dtype cannot represent, e.g., an int too large
+        #   for int64, equals no element of values.
+        candidates = [x for _, x in td.argpairs
+                      if type(x) is element_type and representable(x, values.dtype)]
+        if not candidates:
+            return np.zeros_like(where)
+        return where & np.isin(values, np.array(candidates, dtype=values.dtype))
+    elif element_type in numeric_types and isinstance(td, SSatisfies) and td.f in array_predicates:
+        return where & np.asarray(array_predicates[td.f](values), dtype=bool)
+    else:
+        mask = np.zeros_like(where)
+        objects = values.tolist()
+        for i in np.flatnonzero(where).tolist():
+            mask[i] = bool(td.typep(objects[i]))
+        return mask
+
+
+def as_array(sequence) -> ('ndarray', Optional[type]):
+    # convert the sequence to a NumPy array, and the Python type of its elements,
+    #   or None if the elements must be treated as arbitrary objects.
+    import numpy as np
+    if isinstance(sequence, np.ndarray) and 1 == sequence.ndim and sequence.dtype.kind in dtype_kinds:
+        return sequence, dtype_kinds[sequence.dtype.kind]
+    sequence = list(sequence)
+    types = set(map(type, sequence))
+    if 1 == len(types):
+        [element_type] = types
+        if element_type in dtype_kinds.values():
+            values = np.array(sequence)
+            # e.g., ints too large for int64 give an array of objects
+            if dtype_kinds.get(values.dtype.kind) is element_type:
+                return values, element_type
+    values = np.empty(len(sequence), dtype=object)
+    values[:] = sequence
+    return values, None
+
+
+class VectorizedDfa:
+    def __init__(self, dfa: 'Dfa'):
+        self.compiled = dfa.compile()
+        self.alphabet = self.compiled.alphabet
+        # the table as a list of lists, which is faster to index element by element
+        self.rows = self.compiled.table_array().tolist()
+
+    # return an array of int, the class id of each element of the sequence,
+    #   i.e., the position in self.alphabet of the class containing the element,
+    #   or len(self.alphabet) if the element belongs to no class.
+    def classify(self, sequence) -> 'ndarray':
+        import numpy as np
+        values, element_type = as_array(sequence)
+        classes = np.full(len(values), len(self.alphabet), dtype=np.int32)
+        unclassified = np.ones(len(values), dtype=bool)
+        for k, td in enumerate(self.alphabet):
+            mask = type_mask(td, values, element_type, unclassified)
+            classes[mask] = k
+            unclassified &= ~mask
+        return classes
+
+    def simulate(self, sequence) -> Any:
+        rows = self.rows
+        state_id = 0
+        for k in self.classify(sequence).tolist():
+            state_id = rows[state_id][k]
+            if state_id < 0:
+                return None
+        if state_id in self.compiled.accepting:
+            return self.compiled.exit_map[state_id]
+        else:
+            return None
+
+
+def vectorize(dfa: 'Dfa') -> VectorizedDfa:
+    return VectorizedDfa(dfa)
@@ -32,27 +32,67 @@ Triple = Tuple[Union[int, str],
                Union[int, Tuple[str, Any]]]
 verbose = False
 
+# How thoroughly State and Dfa check their arguments, when the caller does not say.
+#   "off"   -- no check.
+#   "cheap" -- the types of the arguments, linear in the size of the Dfa.
+#   "full"  -- also that the labels of the transitions of each state are
+#              pairwise disjoint.  This is quadratic in the number of
+#              transitions per state, and each disjoint test may canonicalize
+#              the labels, and compute whether they are inhabited.
+#   The builders of this module, e.g., rte_to_dfa, minimize and sxp, whose
+#   transition labels are disjoint by construction, use "cheap".
+#   When python runs with -O, no check is made, whatever the level.
+validation = "full"
+validation_levels = ["off", "cheap", "full"]
+
+# order in which extract_rte eliminates the states of the Dfa.
+#   "index"  -- in increasing order of index.
+#   "degree" -- first the state whose elimination creates the fewest transitions,
+#               i.e., the smallest product of the numbers of incoming and of
+#               outgoing transitions, ignoring loops.
+extract_order = "degree"
+
+# extract_rte canonicalizes the labels it creates only at the end,
+#   unless they have more than this number of nodes.
+extract_canonicalize_size = 64
+
+
+def validation_level(validate: Optional[str]) -> str:
+    level = validation if validate is None else validate
+    if level not in validation_levels:
+        raise ValueError(f"unknown validation level {level}, expecting one of {validation_levels}")
+    elif __debug__:
+        return level
+    else:
+        return "off"
+
 
 class State:
-    def __init__(self, index, initial, accepting, pattern, transitions):
+    __slots__ = ("index", "initial", "accepting", "pattern", "transitions", "ite")
+
+    # validate is the validation level, see validation, None designating the default.
+    def __init__(self, index, initial, accepting, pattern, transitions, validate: Optional[str] = None):
         from genus.utils import generate_lazy_val
-        assert isinstance(index, int)
-        assert index >= 0
-        assert isinstance(initial, bool)
-        assert isinstance(accepting, bool)
-        assert pattern is None or isinstance(pattern, Rte)
-        assert isinstance(transitions,
-                          dict), f"transitions has type {type(transitions)} expecting dict: transitions={transitions}"
-        for tr in transitions:
-            assert isinstance(tr, SimpleTypeD), f"tr={tr} (type={type(tr)}) is not a SimpleTypeD"
-            assert isinstance(transitions[tr], int)
-        tr_list = list(transitions)
-        for i in range(len(tr_list)):
-
-            for j in range(i):
-                tr1 = tr_list[i]
-                tr2 = tr_list[j]
-                assert tr1.disjoint(tr2) is not False, f"expecting disjoint transitions: not {tr1} vs {tr2}"
+        level = validation_level(validate)
+        if level != "off":
+            assert isinstance(index, int)
+            assert index >= 0
+            assert isinstance(initial, bool)
+            assert isinstance(accepting, bool)
+            assert pattern is None or isinstance(pattern, Rte)
+            assert isinstance(transitions,
+                              dict), f"transitions has type {type(transitions)} expecting dict: transitions={transitions}"
+            for tr in transitions:
+                assert isinstance(tr, SimpleTypeD), f"tr={tr} (type={type(tr)}) is not a SimpleTypeD"
+                assert isinstance(transitions[tr], int)
+        if level == "full":
+            tr_list = list(transitions)
+            for i in range(len(tr_list)):
+
+                for j in range(i):
+                    tr1 = tr_list[i]
+                    tr2 = tr_list[j]
+                    assert tr1.disjoint(tr2) is not False, f"expecting disjoint transitions: not {tr1} vs {tr2}"
 
         self.index = index  # int
         self.initial = initial  # bool
@@ -84,27 +124,31 @@ def default_combine_labels(_l1, _l2):
 
 
 class Dfa:
+    __slots__ = ("pattern", "states", "exit_map", "combine_labels")
+
     def __init__(self,
                  pattern: Optional[Rte] = None,
                  states: Optional[List[State]] = None,
                  exit_map: Optional[Dict[int, Any]] = None,
-                 combine_labels: Callable[[SimpleTypeD, SimpleTypeD], SimpleTypeD] = default_combine_labels):
+                 combine_labels: Callable[[SimpleTypeD, SimpleTypeD], SimpleTypeD] = default_combine_labels,
+                 validate: Optional[str] = None):
         if exit_map is None:
             exit_map = dict([])
         if not states:
             states = [createSinkState(0)]
-        assert pattern is None or isinstance(pattern, Rte)
-        assert isinstance(states, list)
-        for st in states:
-            assert isinstance(st, State)
-        assert isinstance(exit_map, dict)
-        for i in exit_map:
-            assert isinstance(i, int)
-            assert i >= 0
-        assert callable(combine_labels)
-        for q in states:
-            if q.accepting:
-                assert q.index in exit_map, f"accepting state {q.index} missing from exit_map {exit_map}"
+        if validation_level(validate) != "off":
+            assert pattern is None or isinstance(pattern, Rte)
+            assert isinstance(states, list)
+            for st in states:
+                assert isinstance(st, State)
+            assert isinstance(exit_map, dict)
+            for i in exit_map:
+                assert isinstance(i, int)
+                assert i >= 0
+            assert callable(combine_labels)
+            for q in states:
+                if q.accepting:
+                    assert q.index in exit_map, f"accepting state {q.index} missing from exit_map {exit_map}"
         self.pattern = pattern  # Rte
         self.states = states  # vector of State objects
         self.exit_map = exit_map  # map index -> return_value
@@ -208,10 +252,16 @@ class Dfa:
     #   and find ourselves in a non-final state, then we return None.
     #   If we are in a final state at that point, we look up
     #   the value to return in the exit_map indexed by the state_id.
-    def simulate(self, sequence: List[Any]) -> Any:
+    #   Each SSatisfies predicate is called at most once per element,
+    #   even if it occurs in several labels.  If a genus.typep_memo.ElementMemo
+    #   is given, the values of the predicates are moreover shared with every
+    #   other sequence simulated with the same memo, which is only correct
+    #   if the elements are immutable.
+    def simulate(self, sequence: List[Any], memo: Optional['ElementMemo'] = None) -> Any:
         state_id = 0
         for element in sequence:
-            state_id = eval_ite(self.states[state_id].ite(), element)
+            table = {} if memo is None else memo.table(element)
+            state_id = eval_ite(self.states[state_id].ite(), element, table)
             if state_id is None:
                 return None
 
@@ -220,6 +270,41 @@ class Dfa:
         else:
             return None
 
+    # return an equivalent CompactDfa, which stores the transitions in arrays
+    #   rather than in State objects, see rte.compact.
+    def compact(self) -> 'CompactDfa':
+        from rte.compact import CompactDfa
+        return CompactDfa(self)
+
+    # compile the Dfa into a dense transition table over a global alphabet,
+    #   see rte.compiled.  The result simulates the same language as self.
+    def compile(self) -> 'CompiledDfa':
+        from rte.compiled import CompiledDfa
+        return CompiledDfa(self)
+
+    # write the compiled Dfa to a binary file, which Dfa.load reads back
+    #   as a MappedDfa, see rte.dfa_file.
+    def save(self, path: str) -> None:
+        self.compile().save(path)
+
+    # read a file written by save.  If mmap is True, the file is mapped into
+    #   memory, so the processes loading the same file share its transition table.
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> 'MappedDfa':
+        from rte.dfa_file import load_dfa
+        return load_dfa(path, mmap)
+
+    # copy the compiled Dfa into a named shared memory block, which other
+    #   processes attach to with Dfa.attach(name), see rte.shared.
+    def publish(self, name: Optional[str] = None) -> 'SharedDfa':
+        from rte.shared import publish_dfa
+        return publish_dfa(self, name)
+
+    @staticmethod
+    def attach(name: str) -> 'SharedDfa':
+        from rte.shared import attach_dfa
+        return attach_dfa(name)
+
     def serialize(self):
         def transitions():
             return [(state.index, tr, state.transitions[tr])
@@ -248,8 +333,8 @@ class Dfa:
     # The result is guaranteed to be complete, but might have
     # vacuous transitions which we cannot prove or inhabited or not inhabited.
     def complete(self) -> 'Dfa':
-        from rte.r_not import Not
-        from rte.r_or import createOr
+        from genus.s_not import SNot
+        from genus.s_or import createSOr
         from genus.s_top import STop
         pattern, transitions, accepting, exit_map, combine_labels = self.serialize()
         sink_states = self.find_sink_states()
@@ -267,8 +352,8 @@ class Dfa:
         #   case we are unfortunately creating a useless transition.
         extra_transitions = [(q.index, td, sink_id)
                              for q in self.states
-                             for tds in [[td for td, _ in q.transitions]]
-                             for td in [Not(createOr(tds)).canonicalize()]
+                             for tds in [list(q.transitions)]
+                             for td in [SNot(createSOr(tds)).canonicalize()]
                              if td.inhabited() is not False
                              ]
 
@@ -277,10 +362,11 @@ class Dfa:
         else:
             return createDfa(pattern=pattern,
                              ini=0,
-                             transition_triples=transitions + extra_transitions + [[sink_id, STop, sink_id]],
+                             transition_triples=transitions + extra_transitions + [(sink_id, STop, sink_id)],
                              accepting_states=accepting,
                              exit_map=exit_map,
-                             combine_labels=combine_labels)
+                             combine_labels=combine_labels,
+                             validate="cheap")
 
     # Create a Dfa which matches the complement language of the given Dfa.
     # this is done by inverting all accepting states to non-accepting
@@ -298,72 +384,46 @@ class Dfa:
                          transition_triples=transitions,
                          accepting_states=[i for i in range(len(self.states)) if i not in accepting],
                          exit_map=exit_map,
-                         combine_labels=combine_labels)
+                         combine_labels=combine_labels,
+                         validate="cheap")
 
     # returns two lists of ints indicating accessible and co-accessible states.
     def find_accessibles(self) -> Tuple[List[int],
                                         List[int]]:
-        # returns a pair of two lists of indices (accessibles, co-accessibles)
-        def reachable(seen, triples):
-            # returns pair (reachables,remaining_triples),
-            # reachables is list of int, triples are remaining triples to consider on future iteration
-            frontier = [(src, label, dst) for src, label, dst in triples if src in seen]
-            remaining = [triple for triple in triples if triple not in frontier]
-            return (seen + [dst for _, _, dst in frontier if dst not in seen],
-                    remaining)
-
-        def expand_reachable(seen, triples):
-            while triples:
-                s = len(seen)
-                seen, triples = reachable(seen, triples)
-                if s == len(seen):
-                    return seen
-            return seen
-
-        _, transitions, accepting_ids, _, _ = self.serialize()
-        accessibles = expand_reachable([0], transitions)
-        # now reverse src and dst and recompute reachable, these are coaccessible.
-        coaccessibles = expand_reachable(accepting_ids, [(dst, label, src) for src, label, dst in transitions])
+        # returns a pair of two lists of indices (accessibles, co-accessibles),
+        #   each in breadth first order from the initial, resp. accepting, states.
+        successors: List[List[int]] = [[] for _ in self.states]
+        predecessors: List[List[int]] = [[] for _ in self.states]
+        for q in self.states:
+            for dst in set(q.transitions.values()):
+                successors[q.index].append(dst)
+                predecessors[dst].append(q.index)
+        accessibles = breadth_first([0], successors)
+        # now follow the transitions backward from the accepting states, these are coaccessible.
+        coaccessibles = breadth_first([q.index for q in self.states if q.accepting], predecessors)
         return accessibles, coaccessibles
 
     # remove states which are not accessible and not co-accessible.
     def trim(self, compact: bool = True) -> 'Dfa':
-        pattern, transitions, accepting_ids, exit_map, combine_labels = self.serialize()
         accessibles, coaccessibles = self.find_accessibles()
         useful_states = set(accessibles).intersection(set(coaccessibles))
-        useful_transitions = [(src, label, dst) for src, label, dst in transitions
-                              if src in useful_states and dst in useful_states]
-        accepting_ids = [q for q in accepting_ids if q in useful_states]
         if compact:
             # after removing useless transitions, thus effectively removing useless states
             # there may now be gaps.  i.e. a Dfa is constructed with an array/list of states
             # where the index in the array is the same as the index of the state.
-            # so we may need to decrease some higher indices to fill the gaps.
-            def rename_index(old, new, idx):
-                if idx == old:
-                    return new
-                else:
-                    return idx
-
-            def rename_state(old, new, xitions, accepting, em):
-                xitions = [(rename_index(old, new, src),
-                            label,
-                            rename_index(old, new, dst))
-                           for src, label, dst in xitions]
-                accepting = [rename_index(old, new, idx) for idx in accepting]
-                em = dict([(rename_index(old, new, idx), label)
-                           for idx in em
-                           for label in [em[idx]]])
-                return xitions, accepting, em
-
-            for new_index, old_index in enumerate(sorted(list(useful_states))):
-                useful_transitions, accepting_ids, exit_map = rename_state(old_index,
-                                                                           new_index,
-                                                                           useful_transitions,
-                                                                           accepting_ids,
-                                                                           exit_map)
-
-        return createDfa(pattern, 0, useful_transitions, accepting_ids, exit_map, combine_labels)
+            # so we renumber the useful states in increasing order to fill the gaps.
+            renumber = dict((old, new) for new, old in enumerate(sorted(useful_states)))
+        else:
+            renumber = dict((q, q) for q in useful_states)
+        useful_transitions = [(renumber[q.index], label, renumber[dst])
+                              for q in self.states
+                              if q.index in useful_states
+                              for label, dst in q.transitions.items()
+                              if dst in useful_states]
+        accepting_ids = [renumber[q.index] for q in self.states if q.accepting and q.index in useful_states]
+        exit_map = dict((renumber[q], value) for q, value in self.exit_map.items() if q in useful_states)
+        return createDfa(self.pattern, 0, useful_transitions, accepting_ids, exit_map, self.combine_labels,
+                         validate="cheap")
 
     def combine_parallel_triples(self,
                                  triples: List[Triple],
@@ -391,109 +451,107 @@ class Dfa:
     # return a Dict indicating for each possible exit value (in exit_map)
     #   what the Rte is for obtaining that exit value.
     def extract_rte(self) -> Dict[Any, Rte]:
-        from functools import reduce
+        from rte.r_emptyset import EmptySet
         from rte.r_epsilon import Epsilon
         from rte.r_singleton import Singleton
-        from rte.r_or import createOr
+        from rte.r_or import createOr, orp
         from rte.r_cat import createCat
         from rte.r_star import Star
         #    1. minimize and trim the given dfa
-        #    2. generate a list of transition triples [from label to]
+        #    2. index the transitions by source and by destination, combining parallel transitions
         #    3. add transitions from extra-state-I to all initial states with :epsilon transition
         #    4. add transitions from all accepting states to extra-state-F (one per exit value) with :epsilon transition
-        #    5. loop on each state
-        #    6.    partition transitions into 4 groups [to-this-state loops-on-state from-state everything-else]
-        #    7.    combine parallel transitions
-        #    8.    n^2 iteration to-this-state x from-this-state
-        #    9.    append new transitions in next iteration of loop 5.
-        #    10. this reduces to one transition per exit value, returns the map of exit-value to label
+        #    5. loop on each state, in the order given by extract_order
+        #    6.    remove the transitions to-this-state, loops-on-state and from-state
+        #    7.    n^2 iteration to-this-state x from-this-state
+        #    8.    add the new transitions, combining them with parallel transitions
+        #    9. this reduces to one transition per exit value, returns the map of exit-value to label
+        #   The labels are only canonicalized at the end, unless they grow larger
+        #   than extract_canonicalize_size.
 
         # step 1
         dfa = self.trim().minimize()
 
-        # it is not really necessary to set self to None, but previous versions of the code
-        # were accessing self rather than accessing dfa.
-        self = None
-
         # step 2
-        _, old_transition_triples, accepting, _, _ = dfa.serialize()
-        old_transitions: List[Triple] = [(src, Singleton(td), dst)
-                                         for src, td, dst in old_transition_triples]
+        #   labels[src][dst] is the label of the transition from src to dst,
+        #   sources[dst] is the set of the sources of the transitions to dst.
+        labels: Dict[Any, Dict[Any, Rte]] = {}
+        sources: Dict[Any, set] = {}
+
+        def shrink(label: Rte) -> Rte:
+            if rte_size(label) > extract_canonicalize_size:
+                return label.canonicalize()
+            else:
+                return label
+
+        def add_transition(src, label: Rte, dst):
+            outgoing = labels.setdefault(src, {})
+            if dst not in outgoing:
+                outgoing[dst] = label
+            elif orp(outgoing[dst]):
+                outgoing[dst] = shrink(createOr(outgoing[dst].operands + [label]))
+            else:
+                outgoing[dst] = shrink(createOr([outgoing[dst], label]))
+            sources.setdefault(dst, set()).add(src)
+
         # step 3  # adding state whose index is NOT integer
-        new_initial_transitions: List[Triple] = [("I", Epsilon, 0)]
+        add_transition("I", Epsilon, 0)
+        for q in dfa.states:
+            for td, dst in q.transitions.items():
+                add_transition(q.index, Singleton(td), dst)
+        accepting = [q.index for q in dfa.states if q.accepting]
         # step 4  # adding state whose index is NOT integer
-        new_final_transitions: List[Triple] = [(qid, Epsilon, ("F", dfa.exit_map[qid]))
-                                               for qid in accepting]
-
-        def combine_parallel_labels(rtes: List[Rte]) -> Rte:
-            return createOr(rtes).canonicalize()
-
-        def extract_labels(triples) -> List[Rte]:
-            return [l for _, l, _ in triples]
-
-        def eliminate_state(triples: List[Triple], qid: int) -> List[Triple]:
-            def f(acc, triple: Triple) -> Tuple[List[Triple],
-                                                List[Triple],
-                                                List[Triple],
-                                                List[Triple]]:
-                x_to_q, q_to_q, q_to_x, others = acc
-                src, _, dst = triple
-                if src == qid and dst == qid:
-                    return x_to_q, q_to_q + [triple], q_to_x, others
-                elif src == qid:
-                    return x_to_q, q_to_q, q_to_x + [triple], others
-                elif dst == qid:
-                    return x_to_q + [triple], q_to_q, q_to_x, others
-                else:
-                    return x_to_q, q_to_q, q_to_x, others + [triple]
+        for qid in accepting:
+            add_transition(qid, Epsilon, ("F", dfa.exit_map[qid]))
 
-            # step 6
-            x_to_q, q_to_q, q_to_x, others = reduce(f, triples, ([], [], [], []))
+        # the number of transitions created by the elimination of the state qid
+        def cost(qid: int) -> int:
+            ins = sources.get(qid, set())
+            outs = labels.get(qid, {})
+            return (len(ins) - (qid in ins)) * (len(outs) - (qid in outs))
 
+        def eliminate_state(qid: int):
+            # step 6
+            q_to_x = labels.pop(qid, {})
+            self_loop_label = q_to_x.pop(qid, None)
+            x_to_q = sources.pop(qid, set())
+            x_to_q.discard(qid)
+            for dst in q_to_x:
+                sources[dst].discard(qid)
             # step 7
-            self_loop_label = combine_parallel_labels(extract_labels(q_to_q))
-            # step 8
-            new_triples = [(src, lab, dst)
-                           for src, pre_label, _ in dfa.combine_parallel_triples(x_to_q, combine_parallel_labels)
-                           for _, post_label, dst in dfa.combine_parallel_triples(q_to_x, combine_parallel_labels)
-                           for lab in [createCat([pre_label,
-                                                  Star(self_loop_label),
-                                                  post_label]
-                                                 ).canonicalize()
-                                       ]
-                           ]
-
-            return others + new_triples  # from eliminate_state
+            for src in x_to_q:
+                pre_label = labels[src].pop(qid)
+                for dst, post_label in q_to_x.items():
+                    operands = [pre_label,
+                                None if self_loop_label is None else Star(self_loop_label),
+                                post_label]
+                    # step 8
+                    add_transition(src,
+                                   shrink(createCat([op for op in operands if op is not None and op != Epsilon])),
+                                   dst)
+
+        # step 5
+        #   we eliminate all states whose id is an integer,
+        #   recall we have added states with id ("F",?) and also with
+        #   id "I".  These will remain.
+        remaining = set(range(len(dfa.states)))
+        while remaining:
+            if extract_order == "index":
+                qid = min(remaining)
+            elif extract_order == "degree":
+                qid = min(remaining, key=lambda q: (cost(q), q))
+            else:
+                raise ValueError(f"unknown extract_order {extract_order}, expecting index or degree")
+            remaining.remove(qid)
+            eliminate_state(qid)
 
-        # step 5 and 9
-        new_transition_triples = reduce(eliminate_state,
-                                        # we eliminate all states whose id is an integer,
-                                        #  recall we have added states with id ("F",?) and also with
-                                        #  id "I".  These will remain.
-                                        range(len(dfa.states)),
-                                        new_initial_transitions + old_transitions + new_final_transitions)
+        # step 9
         exit_values = list(set([dfa.exit_map[qid] for qid in accepting]))
-        for triple in new_transition_triples:
-            assert isinstance(triple, tuple)
-            assert 3 == len(triple)
-            assert "I" == triple[0]
-            assert isinstance(triple[1], Rte)
-            assert isinstance(triple[2], tuple)
-            assert 2 == len(triple[2])
-            assert "F" == triple[2][0]
-            assert triple[2][1] in exit_values
-
-        els = [(exit_value, labels)
-               for exit_value in exit_values  # step 10
-               for labels in [[l for i, l, [f, e] in new_transition_triples
-                               if e == exit_value
-                               if f == "F"
-                               if i == "I"]]]
-
-        d = [(exit_value,
-              combine_parallel_labels(labels).canonicalize())
-             for exit_value, labels in els]
-        return dict(d)
+        for dst in labels.get("I", {}):
+            assert isinstance(dst, tuple) and 2 == len(dst) and "F" == dst[0] and dst[1] in exit_values, \
+                f"unexpected transition from I to {dst}"
+        return dict([(exit_value, labels.get("I", {}).get(("F", exit_value), EmptySet).canonicalize())
+                     for exit_value in exit_values])
 
     # wrapper around extract_rte which assures we don't return
     # an empty Dict in the case that the Rte matches the empty language.
@@ -557,12 +615,54 @@ class Dfa:
         initials = [[self.states[0]]]
         return extend_paths(initials)
 
+    # returns a shortest path, i.e., a list of states starting with self.states[0]
+    #   and ending in an accepting state, or None if there is no such path.
+    #   As for paths_to_accepting, only transitions whose label is definitely
+    #   satisfiable are traversed, unless allow_maybe_satisfiable is True, in which
+    #   case transitions whose label, td, has td.inhabited() None are also traversed.
+    #   This is a breadth first search, visiting each state and each transition
+    #   at most once, rather than enumerating the paths.
+    def accepting_path(self, allow_maybe_satisfiable=False) -> Optional[List[State]]:
+        def acceptable(td: SimpleTypeD) -> bool:
+            inh = td.inhabited()
+            return inh is True or (allow_maybe_satisfiable and inh is None)
+
+        parents: Dict[int, Optional[int]] = {0: None}
+        queue = [0]
+        i = 0
+        while i < len(queue):
+            q = self.states[queue[i]]
+            i += 1
+            if q.accepting:
+                path = [q]
+                while parents[path[-1].index] is not None:
+                    path.append(self.states[parents[path[-1].index]])
+                return path[::-1]
+            for td, dst in q.transitions.items():
+                if dst not in parents and acceptable(td):
+                    parents[dst] = q.index
+                    queue.append(dst)
+        return None
+
+    # returns the list of labels of the transitions of self.accepting_path(...),
+    #   i.e., a sequence whose i'th element is of type witness[i] is accepted,
+    #   or None if there is no such path.
+    def witness(self, allow_maybe_satisfiable=False) -> Optional[List[SimpleTypeD]]:
+        path = self.accepting_path(allow_maybe_satisfiable)
+        if path is None:
+            return None
+        elif len(path) < 2:
+            return []
+        else:
+            return reconstructLabels(path)
+
     # this function returns True, False, or None.
     #   True ==> there is no accepting path from initial state to final state.
     #   False ==> There is an accepting path from initial state to final state.
     #   None ==> There may be an accepting path, but we can neither verify nor falsify,
     #            because every path between initial and final contains at least one
     #            label, td, for which td.inhabited() returns None (i.e., dont-know).
+    #   This is linear in the size of the Dfa, see accepting_path.
     def vacuous(self) -> Optional[bool]:
         if not self.states:
             return True
@@ -571,12 +671,12 @@ class Dfa:
             return True
         # otherwise, if there is not a satisfiable path to an accepting state
         #   then it is vacuous.
-        elif self.paths_to_accepting(allow_maybe_satisfiable=False):
+        elif self.accepting_path(allow_maybe_satisfiable=False) is not None:
             return False  # there is an accepting path, so not vacuous
-        elif self.paths_to_accepting(allow_maybe_satisfiable=True):
+        elif self.accepting_path(allow_maybe_satisfiable=True) is not None:
             return None
         else:
-            return False
+            return True
 
     # this function returns True, False, or None.
     #   False ==> there is no accepting path from initial state to final state.
@@ -669,7 +769,8 @@ class Dfa:
                          merge_parallel(new_transitions),
                          new_fids,
                          new_exit_map,
-                         self.combine_labels)
+                         self.combine_labels,
+                         validate="cheap")
 
     # Compute the synchronized-cross-product ot two Dfas, (self, and the given dfa2).
     # This function realizes the intersection, union, xor etc. of two Dfas,
@@ -677,17 +778,21 @@ class Dfa:
     # of the languages of the respective Dfas.
     # This function is the work-horse used by the functions intersection, union,
     # and xor below.
+    #  The cross states are discovered by trace_graph, so the ambient budget, if any,
+    #  is checked as they are discovered, see genus.budget.
     def sxp(self, dfa2, f_arbitrate_accepting, f_arbitrate_exit_value) -> 'Dfa':
         from genus.s_and import SAnd
+        from genus.utils import trace_graph
         from genus.genus_types import NormalForm
         dfa1 = self  # IDE warns if I name the parameter dfa1 rather than self. :-(
-
-        CrossTransition = Tuple[Tuple[State, State], SimpleTypeD, Tuple[State, State]]
-
-        def compute_cross_transitions(src1, src2) -> List[CrossTransition]:
-            state1 = next(q for q in dfa1.states if src1 == q.index)
-            state2 = next(q for q in dfa2.states if src2 == q.index)
-            return [((src1, src2), label_sxp, (dst1, dst2))
+        states1 = {q.index: q for q in dfa1.states}
+        states2 = {q.index: q for q in dfa2.states}
+
+        def cross_edges(src: Tuple[int, int]) -> List[Tuple[SimpleTypeD, Tuple[int, int]]]:
+            src1, src2 = src
+            state1 = states1[src1]
+            state2 = states2[src2]
+            return [(label_sxp, (dst1, dst2))
                     for label1 in state1.transitions
                     for dst1 in [state1.transitions[label1]]
                     for label2 in state2.transitions
@@ -697,34 +802,19 @@ class Dfa:
                     if label_sxp.inhabited() is not False  # skip if intersection is provably empty
                     ]
 
-        # start with the cross transitions from self.states[0] and df2.states[0]
+        # start with the cross state (0, 0) of self.states[0] and df2.states[0]
         #    and iteratively extend the transitions until they are complete.
         #  We only generate transitions to accessible state, more precisely, we omit
         #    transitions to states which are provably non-accessible.
-        def compute_all_cross_transitions() -> List[CrossTransition]:
-            triples = compute_cross_transitions(0, 0)
-            done_pairs = {(0, 0)}
-            i = 0
-            while i < len(triples):
-                _, label, (dst1, dst2) = triples[i]
-                if (dst1, dst2) not in done_pairs:
-                    triples.extend(compute_cross_transitions(dst1, dst2))
-                    done_pairs.add((dst1, dst2))
-                i = i + 1
-            return triples
-
-        cross_transitions = compute_all_cross_transitions()
-        cross_states = sorted(list(set([i for src, _, dst in cross_transitions
-                                        for i in [src, dst]])))
+        cross_states, cross_transitions = trace_graph((0, 0), cross_edges)
         cross_state_to_new_id = dict([(cross_states[i], i) for i in range(len(cross_states))])
-        transition_triples = [(cross_state_to_new_id[src],
-                               label,
-                               cross_state_to_new_id[dst])
-                              for src, label, dst in cross_transitions]
+        transition_triples = [(src, label, dst)
+                              for src in range(len(cross_states))
+                              for label, dst in cross_transitions[src]]
         accepting_states = [cross_state_to_new_id[(id1, id2)]
-                            for id1, id2 in cross_state_to_new_id
-                            for q1 in [next(q for q in dfa1.states if id1 == q.index)]
-                            for q2 in [next(q for q in dfa2.states if id2 == q.index)]
+                            for id1, id2 in cross_states
+                            for q1 in [states1[id1]]
+                            for q2 in [states2[id2]]
                             if f_arbitrate_accepting(q1.accepting, q2.accepting)]
 
         def compute_exit_value(q1, q2):
@@ -738,17 +828,18 @@ class Dfa:
                 return f_arbitrate_exit_value(q1, q2)
 
         exit_map = [(cross_state_to_new_id[(id1, id2)], compute_exit_value(q1, q2))
-                    for id1, id2 in cross_state_to_new_id
+                    for id1, id2 in cross_states
                     if cross_state_to_new_id[(id1, id2)] in accepting_states
-                    for q1 in [next(q for q in dfa1.states if id1 == q.index)]
-                    for q2 in [next(q for q in dfa2.states if id2 == q.index)]
+                    for q1 in [states1[id1]]
+                    for q2 in [states2[id2]]
                     ]
         return createDfa(pattern=None,
                          ini=0,
                          transition_triples=transition_triples,
                          accepting_states=accepting_states,
                          exit_map=dict(exit_map),
-                         combine_labels=dfa1.combine_labels)
+                         combine_labels=dfa1.combine_labels,
+                         validate="cheap")
 
     # returns True, False, or None
     # True => the Dfas are provably equivalent, i.e., they both accept the
@@ -756,8 +847,33 @@ class Dfa:
     # False => The Dfas are provably not equivalent.
     # None => It cannot be proven whether the Dfas are equivalent.  For example
     #   because it contains a transition which is not known to be inhabited.
+    #   See check_equivalence.
     def equivalent(self, dfa2) -> Optional[bool]:
-        return self.xor(dfa2).vacuous()
+        return self.check_equivalence(dfa2)[0]
+
+    # returns a pair (equivalent, counterexample), equivalent being as for
+    #   equivalent(dfa2), and counterexample, if equivalent is False, the list of
+    #   labels of a sequence of transitions leading to a pair of states
+    #   of which exactly one is accepting, otherwise None.  As pairs are pruned,
+    #   the counterexample is not necessarily a shortest one.
+    #   The pairs of states are explored on the fly, breadth first from the
+    #   initial states, and the search stops at the first such pair.  Pairs which
+    #   are known to be equivalent, by union-find over the pairs already
+    #   explored, are not explored again (Hopcroft and Karp).
+    def check_equivalence(self, dfa2) -> Tuple[Optional[bool], Optional[List[SimpleTypeD]]]:
+        return check_product(self, dfa2, lambda a, b: a != b, True)
+
+    # returns True if the language of dfa2 is included in the language of self,
+    #   False if not, and None if it cannot be proven.  See check_inclusion.
+    def includes(self, dfa2) -> Optional[bool]:
+        return self.check_inclusion(dfa2)[0]
+
+    # returns a pair (includes, counterexample), as check_equivalence, a
+    #   counterexample leading to a state of dfa2 which is accepting and a
+    #   state of self which is not.  No pair is pruned, so the counterexample
+    #   is a shortest one.
+    def check_inclusion(self, dfa2) -> Tuple[Optional[bool], Optional[List[SimpleTypeD]]]:
+        return check_product(self, dfa2, lambda a, b: b and not a, False)
 
     # compute a Dfa recognizing the union of the languages of the given Dfas
     def union(self, dfa2) -> 'Dfa':
@@ -794,10 +910,172 @@ def reconstructLabels(path: List[State]) -> Optional[List[SimpleTypeD]]:
         return [connecting_label(path[i], path[i + 1]) for i in range(len(path) - 1)]
 
 
+# Breadth first search of the pairs of states of dfa1 and dfa2 reachable from
+#   (0, 0), see Dfa.check_equivalence and Dfa.check_inclusion, stopping at the
+#   first pair (q1, q2) such that distinguishing(q1.accepting, q2.accepting).
+#   A transition of the pair is labeled by the intersection of a label of q1 and
+#   a label of q2, and is only followed if this intersection is inhabited, or
+#   also, if allow_maybe, if it is not known to be vacuous.  A missing transition,
+#   e.g., if a Dfa is not complete, leads to a rejecting state, designated by None.
+#   If equivalence is True, a pair is not explored if its states are already known
+#   to be equivalent, by union-find over the pairs explored (Hopcroft and Karp).
+#   Returns a triple (counterexample, maybe_distinguished, maybe_skipped),
+#     counterexample -- the labels of the path to the first distinguishing pair
+#                       whose labels are all inhabited, or None; a shortest
+#                       one unless equivalence, as union-find prunes pairs,
+#     maybe_distinguished -- whether a distinguishing pair was reached by a path
+#                       with a label not known to be inhabited,
+#     maybe_skipped -- whether a transition not known to be vacuous was not followed.
+def product_search(dfa1: 'Dfa',
+                   dfa2: 'Dfa',
+                   distinguishing: Callable[[bool, bool], bool],
+                   equivalence: bool,
+                   allow_maybe: bool) -> Tuple[Optional[List[SimpleTypeD]], bool, bool]:
+    from genus.s_and import SAnd
+    from genus.s_not import SNot
+    from genus.s_or import createSOr
+    from genus.s_top import STop
+    from genus.genus_types import NormalForm
+
+    def transitions(dfa: 'Dfa', cache: Dict[int, list], q: Optional[int]) -> List[Tuple[SimpleTypeD, Optional[int]]]:
+        if q is None:
+            return [(STop, None)]
+        if q not in cache:
+            labels = dfa.states[q].transitions
+            rest = SNot(createSOr(list(labels))).canonicalize()
+            cache[q] = list(labels.items()) + ([] if rest.inhabited() is False else [(rest, None)])
+        return cache[q]
+
+    def accepting(dfa: 'Dfa', q: Optional[int]) -> bool:
+        return q is not None and dfa.states[q].accepting
+
+    parents: Dict[Tuple[int, Optional[int]], Tuple[int, Optional[int]]] = {}
+
+    def find(x):
+        while parents.get(x, x) != x:
+            x = parents[x]
+        return x
+
+    # merge the classes of x and y, returning False if already merged
+    def union(x, y) -> bool:
+        rx, ry = find(x), find(y)
+        if rx == ry:
+            return False
+        parents[rx] = ry
+        return True
+
+    cache1: Dict[int, list] = {}
+    cache2: Dict[int, list] = {}
+    maybe_distinguished = False
+    maybe_skipped = False
+    # each entry is ((q1, q2), position of the previous entry, label, definite)
+    #   definite being whether every label of the path is inhabited.
+    queue = [((0, 0), None, None, True)]
+    seen = {(0, 0)}
+    # the two initial states are assumed equivalent
+    union((1, 0), (2, 0))
+    i = 0
+    while i < len(queue):
+        (q1, q2), _, _, definite = queue[i]
+        if distinguishing(accepting(dfa1, q1), accepting(dfa2, q2)):
+            if definite:
+                labels = []
+                while queue[i][1] is not None:
+                    labels.append(queue[i][2])
+                    i = queue[i][1]
+                return labels[::-1], maybe_distinguished, maybe_skipped
+            maybe_distinguished = True
+        else:
+            for label1, dst1 in transitions(dfa1, cache1, q1):
+                for label2, dst2 in transitions(dfa2, cache2, q2):
+                    if label1.disjoint(label2) is True:
+                        continue
+                    label = SAnd(label1, label2).canonicalize(NormalForm.DNF)
+                    inh = label.inhabited()
+                    if inh is False:
+                        continue
+                    elif inh is None and not allow_maybe:
+                        maybe_skipped = True
+                        continue
+                    if equivalence:
+                        if not union((1, dst1), (2, dst2)):
+                            continue
+                    elif (dst1, dst2) in seen:
+                        continue
+                    else:
+                        seen.add((dst1, dst2))
+                    queue.append(((dst1, dst2), i, label, definite and inh is True))
+        i += 1
+    return None, maybe_distinguished, maybe_skipped
+
+
+# Search for a counterexample, first following only the transitions whose labels
+#   are inhabited, then, only if some transition was not followed and no
+#   counterexample was found, those not known to be vacuous.  Returns a pair
+#   (result, counterexample) as Dfa.check_equivalence.
+#   If a distinguishing pair is only reached through labels not known to be
+#   inhabited, the complete product is computed with sxp, whose canonicalized
+#   labels may nevertheless be proven inhabited, e.g., the union of the parallel
+#   transitions labeled SSatisfies(f) and SNot(SSatisfies(f)).
+def check_product(dfa1: 'Dfa',
+                  dfa2: 'Dfa',
+                  distinguishing: Callable[[bool, bool], bool],
+                  equivalence: bool) -> Tuple[Optional[bool], Optional[List[SimpleTypeD]]]:
+    counterexample, _, maybe_skipped = product_search(dfa1, dfa2, distinguishing, equivalence, False)
+    if counterexample is not None:
+        return False, counterexample
+    elif not maybe_skipped:
+        return True, None
+    counterexample, maybe_distinguished, _ = product_search(dfa1, dfa2, distinguishing, equivalence, True)
+    if counterexample is not None:
+        return False, counterexample
+    elif not maybe_distinguished:
+        return True, None
+    product = dfa1.sxp(dfa2, distinguishing, lambda _q1, _q2: True)
+    vacuous = product.vacuous()
+    if vacuous is False:
+        return False, product.witness()
+    else:
+        return None if vacuous is None else True, None
+
+
+# the number of nodes of an Rte
+def rte_size(rt: Rte) -> int:
+    from rte.engine import rte_children
+    size = 0
+    stack = [rt]
+    while stack:
+        size += 1
+        stack.extend(rte_children(stack.pop()))
+    return size
+
+
+# the list of the vertices reachable from the given roots, in breadth first order,
+#   adjacency[v] being the list of the successors of the vertex v.
+def breadth_first(roots: List[int], adjacency: List[List[int]]) -> List[int]:
+    seen = set()
+    order = []
+    for v in roots:
+        if v not in seen:
+            seen.add(v)
+            order.append(v)
+    i = 0
+    while i < len(order):
+        for w in adjacency[order[i]]:
+            if w not in seen:
+                seen.add(w)
+                order.append(w)
+        i += 1
+    return order
+
+
 # Construct a deterministic symbolic finite automaton, given an Rte and an exit value.
 # The Brzozowski derivative method is used in this construction.
-def rte_to_dfa(rte: Rte, exit_value: Any = True) -> Dfa:
-    rtes, transitions = rte.derivatives()
+def rte_to_dfa(rte: Rte,
+               exit_value: Any = True,
+               budget: Optional['Budget'] = None,
+               processes: Optional[int] = None) -> Dfa:
+    rtes, transitions = rte.derivatives(budget, processes)
     # transitions is a vector of sequences, each sequence contains pairs (SimpleTypeD,int)
     transition_triples = [(src, td, dst)
                           for src in range(len(transitions))
@@ -809,7 +1087,8 @@ def rte_to_dfa(rte: Rte, exit_value: Any = True) -> Dfa:
                      ini=0,
                      transition_triples=transition_triples,
                      accepting_states=accepting_states,
-                     exit_map=dict([(i, exit_value) for i in accepting_states]))
+                     exit_map=dict([(i, exit_value) for i in accepting_states]),
+                     validate="cheap")
 
 
 # default value for the combine_labels parameter of combine_labels
@@ -864,75 +1143,75 @@ def createDfa(pattern: Optional[Rte],
               transition_triples: List[Tuple[int, SimpleTypeD, int]],
               accepting_states: List[int],
               exit_map: Dict[int, Any],
-              combine_labels: Callable[[SimpleTypeD, SimpleTypeD], SimpleTypeD] = createDfa_combine_labels
+              combine_labels: Callable[[SimpleTypeD, SimpleTypeD], SimpleTypeD] = createDfa_combine_labels,
+              validate: Optional[str] = None
               ) -> 'Dfa':
+    # validate is the validation level of the States and of the Dfa, see validation.
+    #   A caller which guarantees that the labels of the transitions of each state
+    #   are disjoint, e.g., because they are the labels of an existing Dfa,
+    #   may pass "cheap" or "off".
     from functools import reduce
+    from genus.s_top import STop
+    level = validation_level(validate)
     assert ini == 0, f"expecting ini=0, got {ini}"
-    assert isinstance(accepting_states, list)
-    for i in accepting_states:
-        assert isinstance(i, int)
-        assert i >= 0
+    if level != "off":
+        assert isinstance(accepting_states, list)
+        for i in accepting_states:
+            assert isinstance(i, int)
+            assert i >= 0
 
     # check against duplicate transitions
-    if len(transition_triples) != len(set(transition_triples)):
+    if level != "off" and len(transition_triples) != len(set(transition_triples)):
         seen = set()
         for trans in transition_triples:
             assert trans not in seen, f"duplicate transition {trans} in {transition_triples}"
             seen.add(trans)
 
-    def f(acc: int, triple: Tuple[int, Any, int]) -> int:
-        src, _, dst = triple
-        return max(acc, src, dst)
-
-    max_index = reduce(f, transition_triples, 0)
-    srcs = [src for src, _, _ in transition_triples]
+    # the labels of the transitions of each state, grouped by destination,
+    #   in the order of transition_triples: src -> dst -> [td, ...]
+    grouped: Dict[int, Dict[int, List[SimpleTypeD]]] = {}
+    max_index = 0
+    for src, td, dst in transition_triples:
+        grouped.setdefault(src, {}).setdefault(dst, []).append(td)
+        max_index = max(max_index, src, dst)
 
     # if we find a dst which is not used as a source, then create a transition from that dst
-    # to a sink state.  Do this with a recursive call.
-    needs_dst = [dst for src, td, dst in transition_triples if dst not in srcs]
+    # to a sink state.
+    needs_sink = set(dst for by_dst in grouped.values() for dst in by_dst if dst not in grouped)
     # in the case that the initial state is a final state,
     #   and it has no outgoing transitions, then the Dfa matches the empty-word.
     #   so make sure we don't accidentally match empty-set instead.
-    if 0 in accepting_states and 0 not in srcs:
-        needs_dst = needs_dst + [0]
-    if needs_dst:
-        from genus.s_top import STop
+    if 0 in accepting_states and 0 not in grouped:
+        needs_sink.add(0)
+    if needs_sink:
         sink_id = max_index + 1
-        return createDfa(pattern=pattern,
-                         ini=0,
-                         transition_triples=transition_triples
-                                            + [(dst, STop, sink_id) for dst in set(needs_dst)]
-                                            + [(sink_id, STop, sink_id)],
-                         accepting_states=accepting_states,
-                         exit_map=exit_map,
-                         combine_labels=combine_labels)
+        for dst in needs_sink:
+            grouped[dst] = {sink_id: [STop]}
+        grouped[sink_id] = {sink_id: [STop]}
+        max_index = sink_id
 
-    def merge_tds(dst1: int, transitions: List[Tuple[SimpleTypeD, int]]) -> SimpleTypeD:
-        assert transitions, "merge_tds expected transitions to be non-empty"
-        tds = [td for td, dst2 in transitions if dst1 == dst2]
-        return reduce(combine_labels, tds)
+    accepting = set(accepting_states)
 
     def make_state(q: int) -> State:
-        transitions_pre = [(td, dst) for src, td, dst in transition_triples if src == q]
+        if q not in grouped:
+            return createSinkState(q)
+        by_dst = grouped[q]
         # error if a td appears more than once.
         #   we would like to error if the tds are not disjoint, but this is already
         #   checked in State initialization
-        tds = [td for td, _ in transitions_pre]
-        assert len(tds) == len(set(tds)), f"transitions from state {q} are ambiguous: {transition_triples}"
-        destinations = list(set([dst for _, dst in transitions_pre]))
-
-        if transitions_pre:
-            transitions = dict([(merge_tds(dst, transitions_pre), dst) for dst in destinations])
-            return State(index=q,
-                         initial=q == 0,
-                         accepting=q in accepting_states,
-                         pattern=None,
-                         transitions=transitions)
-        else:
-            return createSinkState(q)
+        if level != "off":
+            tds = [td for dst in by_dst for td in by_dst[dst]]
+            assert len(tds) == len(set(tds)), f"transitions from state {q} are ambiguous: {transition_triples}"
+        return State(index=q,
+                     initial=q == 0,
+                     accepting=q in accepting,
+                     pattern=None,
+                     transitions=dict([(reduce(combine_labels, by_dst[dst]), dst) for dst in list(set(by_dst))]),
+                     validate=level)
 
     states = [make_state(i) for i in range(1 + max_index)]
     return Dfa(pattern=pattern,
                states=states,
                exit_map=exit_map,
-               combine_labels=combine_labels)
+               combine_labels=combine_labels,
+               validate=level)
@@ -6,5 +6,6 @@ setuptools.setup(name='pyrte',
                  url='https://gitlab.lrde.epita.fr/jnewton/python-rte',
                  author='J.E.Newton & M.Oueslati',
                  install_requires=[],
+                 extras_require={'numpy': ['numpy']},
                  packages=setuptools.find_packages(),
                  zip_safe=False)
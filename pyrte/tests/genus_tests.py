@@ -35,7 +35,7 @@ from genus.s_member import SMember
 from genus.s_not import SNot, notp
 from genus.s_or import SOr, createSOr, orp
 from genus.s_top import STopImpl, STop
-from genus.simple_type_d import TerminalType
+from genus.simple_type_d import SimpleTypeD, TerminalType
 from genus.utils import compare_sequence, cmp_objects
 from genus.utils import find_simplifier, find_first
 from genus.utils import generate_lazy_val, fixed_point
@@ -618,6 +618,53 @@ class GenusCase(unittest.TestCase):
         self.assertEqual(SMember(1, 3, 1, 2, 3, 2).canonicalize(), SMember(1, 2, 3))
         self.assertEqual(SMember(3, 2, 1).canonicalize(), SMember(1, 2, 3))
 
+    def test_member_typep(self):
+        m = SMember(*range(1000), "a", True)
+        self.assertEqual(m.argset, frozenset([(int, i) for i in range(1000)] + [(str, "a"), (bool, True)]))
+        self.assertTrue(m.typep(999))
+        self.assertTrue(m.typep(True))
+        self.assertFalse(m.typep(1000))
+        self.assertFalse(m.typep(1.0))  # 1.0 == 1 but is not an int
+        self.assertFalse(m.typep(False))  # False == 0 but is not an int
+        self.assertFalse(m.typep([1]))
+        self.assertFalse(SEql(1).typep(True))
+        self.assertTrue(SEql(1).typep(1))
+        # unhashable values
+        u = SMember(1, [1, 2], {"a": 1})
+        self.assertEqual(u.unhashables, [[1, 2], {"a": 1}])
+        self.assertTrue(u.typep([1, 2]))
+        self.assertTrue(u.typep({"a": 1}))
+        self.assertFalse(u.typep([1]))
+        self.assertTrue(u.typep(1))
+        self.assertIs(SMember(1, [1, 2]).subtypep_down(u), True)
+        self.assertIs(SMember(2, [1]).disjoint_down(u), True)
+        self.assertIs(SMember(2, [1, 2]).disjoint_down(u), False)
+        self.assertIs(SMember(1, 2).subtypep(m), True)
+        self.assertIs(SMember(1, 2.0).subtypep(m), False)
+        self.assertIs(SMember(1000, 1.0).disjoint(m), True)
+
+    def test_member_algebra(self):
+        from genus.s_member import member_union, member_intersection, member_difference, member_filter
+        a = SMember(1, 2, 3, "a")
+        b = SMember(3, 4, "a", 1.0)
+        self.assertEqual(member_union([a, b]), SMember(1, 2, 3, "a", 4, 1.0))
+        self.assertEqual(member_intersection([a, b]), SMember(3, "a"))
+        self.assertEqual(member_difference(a, b), SMember(1, 2))
+        self.assertEqual(member_difference(a, a), SEmpty)
+        self.assertEqual(member_filter(b, lambda x: isinstance(x, str)), SEql("a"))
+        # large enumerations
+        n = 20000
+        evens = SMember(*range(0, n, 2))
+        threes = SMember(*range(0, n, 3))
+        self.assertEqual(SAnd(evens, threes).canonicalize(), SMember(*range(0, n, 6)))
+        self.assertEqual(SOr(evens, threes).canonicalize(),
+                         SMember(*sorted(set(range(0, n, 2)) | set(range(0, n, 3)))))
+        self.assertEqual(SAnd(evens, SNot(threes)).canonicalize(),
+                         SMember(*[i for i in range(0, n, 2) if i % 3 != 0]))
+        m = SMember(*reversed(range(n)))
+        self.assertEqual(m.canonicalize(), SMember(*range(n)))
+        self.assertIs(m.canonicalize().canonicalize_once(), m.canonicalize())
+
     def test_eql(self):
         self.assertTrue(SEql(1).pair[1] == 1)
         self.assertTrue(SEql(1).argpairs == [(SAtomic(int), 1)],
@@ -1017,6 +1064,27 @@ class GenusCase(unittest.TestCase):
         self.assertTrue(td.canonicalized_hash[NormalForm.CNF] == tdc3)
         self.assertTrue(tdc3.canonicalized_hash[NormalForm.CNF] == tdc3)
 
+    def test_lazy_caches(self):
+        import pickle
+        td = SAnd(SNot(SMember(1, 2, 3)), SAtomic(int))
+        for t in [td, td.tds[0], td.tds[0].s, td.tds[1], STop]:
+            self.assertFalse(hasattr(t, "__dict__"), f"{t} has a __dict__")
+        self.assertTrue(td.subtypep_table is None)
+        self.assertTrue(td.nf_table is None)
+        self.assertTrue(td.inhabited() is True)
+        self.assertTrue(td.subtypep(SAtomic(int)) is True)
+        self.assertTrue(td.subtypep_cache == {SAtomic(int): True})
+        self.assertTrue(hash(td) == hash(SAnd(SNot(SMember(1, 2, 3)), SAtomic(int))))
+        # an SMember of unhashable values is nevertheless hashable
+        self.assertTrue(hash(SMember(1, [2])) == hash(SMember(1, [2])))
+        # as at construction the hash is not computed, a combination of unhashable leaves may be built
+        td3 = SAnd(SNot(SEql([1])), SAtomic(list))
+        self.assertTrue(td3.typep([2]) and not td3.typep([1]))
+        self.assertTrue(td3 == SAnd(SNot(SEql([1])), SAtomic(list)))
+        td2 = pickle.loads(pickle.dumps(td))
+        self.assertTrue(td2 == td and hash(td2) == hash(td))
+        self.assertTrue(td2.subtypep_table is None)
+
     def test_to_dnf2(self):
 
         def termp(td):
@@ -1121,6 +1189,72 @@ class GenusCase(unittest.TestCase):
         self.assertTrue(td.to_nf(NormalForm.DNF) == td)
         self.assertTrue(td.compute_dnf() == td)
 
+    def test_nf_clauses(self):
+        import genus.s_combination as s_combination
+        td = SAnd(SOr(SAtomic(int), SAtomic(str)), SAtomic(object), SOr(SEql(1), SEql("a")))
+        self.assertEqual(td.nf_clause_count(), 4)
+        self.assertEqual(list(td.nf_clauses()),
+                         [SAnd(SAtomic(int), SAtomic(object), SEql(1)),
+                          SAnd(SAtomic(int), SAtomic(object), SEql("a")),
+                          SAnd(SAtomic(str), SAtomic(object), SEql(1)),
+                          SAnd(SAtomic(str), SAtomic(object), SEql("a"))])
+        self.assertIs(SAnd(SOr(SAtomic(int), SAtomic(str)),
+                           SOr(SAtomic(int), SAtomic(float))).clauses_inhabited(), True)
+        self.assertIs(SAnd(SOr(SAtomic(int), SAtomic(str)),
+                           SOr(SAtomic(float), SAtomic(list))).clauses_inhabited(), False)
+        self.assertIs(SAnd(SOr(SAtomic(int), SAtomic(str)),
+                           SOr(SAtomic(float), SAtomic(list))).disjoint(SAtomic(int)), True)
+
+        # the DNF of this type has 2^20 clauses
+        preds = [SSatisfies(lambda a, i=i: a == i, f"eq{i}") for i in range(40)]
+        wide = SAnd(*[SOr(preds[2 * i], preds[2 * i + 1]) for i in range(20)])
+        self.assertGreater(wide.nf_clause_count(), s_combination.nf_clause_limit)
+        # too many clauses to expand, but the first clause examined is inhabited
+        wide2 = SAnd(*[SOr(SAtomic(int), SEql(f"s{i}")) for i in range(20)])
+        self.assertGreater(wide2.nf_clause_count(), s_combination.nf_clause_limit)
+
+        # count the clauses of wide and wide2 which are constructed
+        examined = {}
+        nf_clauses = SAnd.nf_clauses
+
+        def counting_nf_clauses(this):
+            for clause in nf_clauses(this):
+                examined[id(this)] = examined.get(id(this), 0) + 1
+                yield clause
+
+        saved = (s_combination.nf_inhabited_clause_limit, s_combination.nf_disjoint_clause_limit)
+        try:
+            SAnd.nf_clauses = counting_nf_clauses
+            s_combination.nf_inhabited_clause_limit = 8
+            s_combination.nf_disjoint_clause_limit = 4
+            self.assertTrue(andp(wide.canonicalize(NormalForm.DNF)))
+            self.assertIsNone(wide.inhabited())
+            self.assertEqual(examined[id(wide)], 8)
+            self.assertIs(wide2.inhabited(), True)
+            self.assertEqual(examined[id(wide2)], 1)
+            self.assertIs(wide2.disjoint(SAtomic(int)), False)
+            # disjoint from str cannot be decided by the first 4 clauses
+            examined.clear()
+            self.assertIsNone(wide2.disjoint(SAtomic(str)))
+            self.assertEqual(examined[id(wide2)], 4)
+        finally:
+            SAnd.nf_clauses = nf_clauses
+            s_combination.nf_inhabited_clause_limit, s_combination.nf_disjoint_clause_limit = saved
+
+        saved = s_combination.nf_clause_limit
+        try:
+            s_combination.nf_clause_limit = 2
+            self.assertEqual(td.compute_dnf(), td)
+            # only 2 of the 4 clauses are examined
+            self.assertIsNone(td.search_nf_clauses(lambda clause: False, 2))
+            self.assertIs(td.search_nf_clauses(lambda clause: False, 4), False)
+            self.assertIs(td.search_nf_clauses(lambda clause: True, 2), True)
+        finally:
+            s_combination.nf_clause_limit = saved
+        self.assertEqual(td.compute_dnf(),
+                         SOr(SAnd(SAtomic(int), SAtomic(object), SOr(SEql(1), SEql("a"))),
+                             SAnd(SAtomic(str), SAtomic(object), SOr(SEql(1), SEql("a")))))
+
     def test_discovered_cases_867(self):
         class Test1:
             pass
@@ -1211,6 +1345,166 @@ class GenusCase(unittest.TestCase):
                                          f"expecting exactly one partition to contain v={v}" +
                                          f"\n tds={tds}\n mdtd={computed}\n containing={containing}")
 
+    def test_mdtd_canonical(self):
+        import random
+        import genus.mdtd
+        for depth in range(0, 3):
+            for length in range(1, 5):
+                for _ in range(num_random_tests):
+                    tds = [random_type_designator(depth) for _ in range(length)]
+                    computed = mdtd(tds)
+                    shuffled = list(tds)
+                    random.shuffle(shuffled)
+                    genus.mdtd.mdtd_cache.clear()
+                    self.assertEqual(mdtd(shuffled), computed, f"tds={tds}")
+                    for (td, factors, disjoints) in computed:
+                        for v in test_values:
+                            if td.typep(v):
+                                for f in factors:
+                                    self.assertTrue(f.typep(v), f"tds={tds} td={td} factor={f} v={v}")
+                                for d in disjoints:
+                                    self.assertFalse(d.typep(v), f"tds={tds} td={td} disjoint={d} v={v}")
+        # the decomposition of a superset is computed from the decomposition of its prefix
+        genus.mdtd.mdtd_cache.clear()
+        mdtd([SAtomic(int), SAtomic(str)])
+        self.assertIn(frozenset([SAtomic(int)]), genus.mdtd.mdtd_cache)
+        self.assertEqual(len(mdtd([SAtomic(int), SAtomic(str), SMember(1, 2)])), 4)
+        # SMember(1, 2) <= SAtomic(int) which is disjoint from SAtomic(str)
+        self.assertEqual(mdtd([SAtomic(int), SMember(1, 2)]),
+                         [(SAnd(SAtomic(int), SNot(SMember(1, 2))).canonicalize(),
+                           [SAtomic(int)], [SMember(1, 2)]),
+                          (SMember(1, 2), [SAtomic(int), SMember(1, 2)], []),
+                          (SNot(SAtomic(int)), [], [SAtomic(int), SMember(1, 2)])])
+        # the caller may modify the result without modifying the cache
+        computed = mdtd([SAtomic(int), SMember(1, 2)])
+        for _, factors, disjoints in computed:
+            factors.clear()
+            disjoints.append(SAtomic(str))
+        self.assertEqual(mdtd([SAtomic(int), SMember(1, 2)])[1], (SMember(1, 2), [SAtomic(int), SMember(1, 2)], []))
+
+        # defining a class changes the decomposition
+        class A:
+            pass
+
+        class B:
+            pass
+
+        self.assertEqual(len(mdtd([SAtomic(A), SAtomic(B)])), 3)
+
+        class AB(A, B):
+            pass
+
+        self.assertEqual(len(mdtd([SAtomic(A), SAtomic(B)])), 4)
+
+    def test_bdd(self):
+        from genus.bdd import to_bdd, from_bdd, BddTrue, BddFalse, bdd_and, bdd_not, \
+            bdd_type_inhabited, bdd_type_disjoint, bdd_type_subtypep, bdd_type_equivalent
+        self.assertIs(to_bdd(SAnd(SAtomic(int), SNot(SEql(1)))),
+                      to_bdd(SAnd(SNot(SEql(1)), SAtomic(int))))
+        self.assertIs(to_bdd(SOr(SAtomic(int), SNot(SAtomic(int)))), BddTrue)
+        self.assertIs(bdd_and(to_bdd(SAtomic(str)), bdd_not(to_bdd(SAtomic(str)))), BddFalse)
+        self.assertIs(to_bdd(SMember(1, 2)), to_bdd(SOr(SEql(2), SEql(1))))
+        # decided modulo the theory of the leaves
+        self.assertIs(bdd_type_inhabited(SAnd(SEql(1), SAtomic(str))), False)
+        self.assertIs(bdd_type_subtypep(SMember(1, 2), SAtomic(int)), True)
+        self.assertIs(bdd_type_disjoint(SMember(1, 2), SAtomic(str)), True)
+        self.assertIs(bdd_type_equivalent(SAnd(SMember(1, 2, "a"), SAtomic(int)), SMember(1, 2)), True)
+        # a partial predicate is only called on a value once its guard holds,
+        #   and is unknown if it raises; a truthy result is satisfied.
+        odd = SSatisfies(lambda x: x % 2 == 1, "odd")
+        self.assertIsNone(SOr(SEql("abc"), SAnd(SAtomic(int), odd)).typeEquivalent(SOr(SEql("abc"), SAtomic(int))))
+        self.assertIs(SOr(SEql(3), SAnd(SAtomic(int), odd)).typeEquivalent(SAnd(SAtomic(int), odd)), True)
+        truthy = SSatisfies(lambda x: "yes" if x == 2 else "", "truthy")
+        self.assertIs(bdd_type_inhabited(SAnd(SEql(2), truthy)), True)
+        self.assertIs(bdd_type_inhabited(SAnd(SEql(3), truthy)), False)
+        for depth in range(0, 4):
+            for _ in range(num_random_tests):
+                td1 = random_type_designator(depth)
+                td2 = random_type_designator(depth)
+                self.assertIs(to_bdd(td1), to_bdd(from_bdd(to_bdd(td1))), f"td1={td1}")
+                for v in test_values:
+                    self.assertEqual(td1.typep(v), from_bdd(to_bdd(td1)).typep(v), f"td1={td1} v={v}")
+                for f, g in [(SimpleTypeD.disjoint, bdd_type_disjoint),
+                             (SimpleTypeD.subtypep, bdd_type_subtypep)]:
+                    expected = f(td1, td2)
+                    computed = g(td1, td2)
+                    if expected is not None and computed is not None:
+                        self.assertIs(computed, expected, f"{g.__name__} td1={td1} td2={td2}")
+                self.assertIsNot(bdd_type_equivalent(td1, td1.canonicalize()), False, f"td1={td1}")
+
+    def test_bdd_limits(self):
+        import genus.bdd as bdd
+        # unhashable leaves have no Bdd
+        self.assertIs(SEql([1]).typeEquivalent(SEql([1])), True)
+        self.assertIsNone(bdd.bdd_type_equivalent(SEql([1]), SAtomic(list)))
+        # a path containing a positive SEql is decided by typep of its value
+        wide = SOr(*[SAnd(SEql(i), SNot(SEql(i + 1)), SAtomic(int)) for i in range(40)])
+        self.assertIs(bdd.bdd_type_subtypep(wide, SAtomic(int)), True)
+        path_limit, table_limit = bdd.bdd_path_limit, bdd.bdd_table_limit
+        try:
+            bdd.bdd_path_limit = 0
+            self.assertIsNone(bdd.bdd_type_inhabited(SAtomic(int)))
+            bdd.bdd_path_limit = path_limit
+            bdd.bdd_table_limit = 10
+            for i in range(100):
+                self.assertIs(bdd.bdd_type_disjoint(SEql(i), SNot(SAtomic(int))), True)
+                self.assertTrue(bdd.bdd_type_same(SMember(i, i + 1), SOr(SEql(i + 1), SEql(i))))
+            self.assertLess(len(bdd.bdd_nodes) + len(bdd.bdd_cache) + len(bdd.bdd_path_cache), 100)
+        finally:
+            bdd.bdd_path_limit, bdd.bdd_table_limit = path_limit, table_limit
+
+    def test_class_index(self):
+        from abc import ABC
+        from genus.utils import class_subclasses, have_common_subclass, is_subclass, class_index_frozen
+
+        class A:
+            pass
+
+        class B:
+            pass
+
+        class A1(A):
+            pass
+
+        self.assertEqual(class_subclasses(A), {A, A1})
+        self.assertTrue(is_subclass(A1, A))
+        self.assertFalse(is_subclass(A, A1))
+        self.assertFalse(have_common_subclass(A, B))
+        self.assertIs(SAtomic(A).disjoint(SAtomic(B)), True)
+
+        # defining a new subclass invalidates the index
+        class A1B(A1, B):
+            pass
+
+        self.assertEqual(class_subclasses(A), {A, A1, A1B})
+        self.assertTrue(have_common_subclass(A, B))
+        self.assertIs(SAtomic(A).disjoint(SAtomic(B)), False)
+        self.assertIs(SAtomic(A1B).subtypep(SAtomic(B)), True)
+
+        # within a frozen scope, the subclasses are verified once, and the
+        #   scope which follows takes the classes defined meanwhile into account
+        with class_index_frozen():
+            self.assertIs(class_subclasses(B), class_subclasses(B))
+
+            class B1(B):
+                pass
+
+            self.assertNotIn(B1, class_subclasses(B))
+        with class_index_frozen():
+            self.assertIn(B1, class_subclasses(B))
+
+        # virtual subclasses of abstract classes
+        class C(ABC):
+            pass
+
+        class D:
+            pass
+
+        self.assertIs(SAtomic(D).subtypep(SAtomic(C)), False)
+        C.register(D)
+        self.assertIs(SAtomic(D).subtypep(SAtomic(C)), True)
+        self.assertTrue(have_common_subclass(D, C))
+
     def test_trace_graph(self):
         def edges(i):  # V => List[(L,V)]
             if i == 0:
@@ -1225,6 +1519,28 @@ class GenusCase(unittest.TestCase):
                                       [("a", 2)],
                                       [("b", 2), ("a", 0)]]))
 
+    def test_trace_graph_hooks(self):
+        def edges(i):  # V => List[(L,V)]
+            return [("a", (i + 1) % 50), ("b", (2 * i) % 50), ("c", i)]
+
+        expected = trace_graph(0, edges)
+        self.assertEqual(len(expected[0]), 50)
+        self.assertEqual(expected[0][0:3], [0, 1, 2])
+        frontiers = []
+
+        def map_edges(f, vs):
+            frontiers.append(len(vs))
+            return [f(v) for v in vs]
+
+        self.assertEqual(trace_graph(0, edges, map_edges=map_edges), expected)
+        self.assertEqual(sum(frontiers), 50)
+        self.assertLess(len(frontiers), 50)
+        reports = []
+        trace_graph(0, edges, progress=lambda expanded, discovered, transitions:
+                    reports.append((expanded, discovered, transitions)))
+        self.assertEqual(len(reports), 50)
+        self.assertEqual(reports[-1], (50, 50, 150))
+
     def test_discovered_case_1018(self):
         from genus.depthgenerator import Test2
         odd = SSatisfies(lambda a: isinstance(a, int) and a % 2 == 1, "odd")
@@ -1254,6 +1570,55 @@ class GenusCase(unittest.TestCase):
         self.assertTrue((2, 11) in partition)
         self.assertTrue((3, 12) in partition)
 
+    def test_typep_order(self):
+        import genus.typep_order as typep_order
+        calls = []
+
+        def expensive(a):
+            calls.append(a)
+            return True
+
+        td = SAnd(SSatisfies(expensive, "expensive", cost=100), SAtomic(int))
+        self.assertEqual(td.typep_order().ordered, [SAtomic(int), td.tds[0]])
+        self.assertIs(td.typep("hello"), False)
+        self.assertEqual(calls, [])
+        self.assertIs(td.typep(3), True)
+        self.assertEqual(calls, [3])
+        self.assertIs(SOr(td.tds[0], SAtomic(int)).typep(3), True)
+        self.assertEqual(calls, [3])
+
+        # unmeasured predicates are assumed more expensive than isinstance
+        self.assertGreater(SSatisfies(lambda a: True, "true").typep_cost(), SAtomic(int).typep_cost())
+        self.assertEqual(STop.typep_cost(), 0.0)
+        self.assertEqual(SNot(SMember(1, 2, [3])).typep_cost(), 2.0)
+
+        # by default, the order does not depend on the calls
+        td = SOr(SAtomic(int), SAtomic(str))
+        self.assertEqual(td.typep_order().ordered, [SAtomic(int), SAtomic(str)])
+        for _ in range(typep_order.typep_reorder_interval):
+            self.assertIs(td.typep("hello"), True)
+        self.assertEqual(td.typep_order().ordered, [SAtomic(int), SAtomic(str)])
+
+        # if adaptive, the operand which most often decides is evaluated first
+        saved = typep_order.typep_adaptive
+        try:
+            typep_order.typep_adaptive = True
+            td = SOr(SAtomic(int), SAtomic(str))
+            self.assertEqual(td.typep_order().ordered, [SAtomic(int), SAtomic(str)])
+            for _ in range(typep_order.typep_reorder_interval):
+                self.assertIs(td.typep("hello"), True)
+            self.assertEqual(td.typep_order().ordered, [SAtomic(str), SAtomic(int)])
+            self.assertIs(td.typep(1), True)
+            self.assertIs(td.typep(1.0), False)
+        finally:
+            typep_order.typep_adaptive = saved
+
+        # a predicate is never evaluated before the operands which guard it
+        quadruple = SSatisfies(lambda x: x % 4 == 0, "quadruple", cost=0.5)
+        td = SAnd(SAtomic(int), quadruple, SAtomic(object))
+        self.assertEqual(td.typep_order().ordered, [SAtomic(int), quadruple, SAtomic(object)])
+        self.assertIs(td.typep("hello"), False)
+
     def test_transition_to_ite(self):
         from genus.ite import transitions_to_ite
         self.assertEqual(transitions_to_ite([], default=None), (None,))
@@ -1352,6 +1717,64 @@ class GenusCase(unittest.TestCase):
 
                     self.assertIs(eval_ite(ite, v), expected)
 
+    def test_ite_dag(self):
+        from genus.ite import transitions_to_ite, eval_ite, ite_statistics
+        e = SSatisfies(lambda a: isinstance(a, int) and a > 0, "positive", cost=10)
+        ite = transitions_to_ite([(SAnd(e, SOr(SAtomic(int), SAtomic(str))), 1),
+                                  (SAnd(SNot(e), SOr(SAtomic(int), SAtomic(str))), 2),
+                                  (SAtomic(float), 3)], 0)
+        # the sub-problem of testing e is shared by the int and str branches
+        self.assertEqual(ite, (SAtomic(int), (e, (1,), (2,)),
+                               (SAtomic(str), (e, (1,), (2,)),
+                                (SAtomic(float), (3,), (0,)))))
+        self.assertIs(ite[1], ite[2][1])
+        stats = ite_statistics(ite)
+        self.assertEqual(stats["depth"], 3)
+        self.assertEqual(stats["nodes"], 4)
+        self.assertEqual(stats["tree_nodes"], 5)
+        self.assertEqual(ite_statistics(ite, [1, -1, "a", 1.0, None])["expected_tests"], 13 / 5)
+
+        # the balanced pivot notices that the first label and the default
+        #   have the same exit value, so only float needs to be tested.
+        pairs = [(SOr(SAtomic(bool), SAtomic(str)), 0), (SAtomic(float), 1)]
+        first = transitions_to_ite(pairs, 0, "first")
+        balanced = transitions_to_ite(pairs, 0, "balanced")
+        self.assertEqual(balanced, (SAtomic(float), (1,), (0,)))
+        elements = [1, True, "a", 1.0, None]
+        self.assertLess(ite_statistics(balanced, elements)["expected_tests"],
+                        ite_statistics(first, elements)["expected_tests"])
+        for v in elements:
+            self.assertEqual(eval_ite(first, v), eval_ite(balanced, v))
+        with self.assertRaises(ValueError):
+            transitions_to_ite(pairs, 0, "no-such-pivot")
+
+        # equal leaves are the same object, so tests which cannot change the
+        #   exit value disappear; but 1 and True are different exit values.
+        self.assertEqual(transitions_to_ite([(SAtomic(int), 1), (SAtomic(str), 1)], 1), (1,))
+        ite = transitions_to_ite([(SAtomic(int), 1)], True)
+        self.assertEqual(ite, (SAtomic(int), (1,), (True,)))
+        self.assertIs(type(ite[2][0]), bool)
+        # unhashable exit values are not shared, but still work
+        ite = transitions_to_ite([(SAtomic(int), [1]), (SAtomic(str), [2])], [0])
+        self.assertEqual([eval_ite(ite, v) for v in [1, "a", None]], [[1], [2], [0]])
+
+    def test_ite_balanced(self):
+        from genus.ite import transitions_to_ite, eval_ite
+        for depth in range(0, 4):
+            for _ in range(num_random_tests):
+                td1 = random_type_designator(depth)
+                td2 = SAnd(random_type_designator(depth), SNot(td1))
+                ite = transitions_to_ite([(td2, 2),
+                                          (td1, 1)], 3, "balanced")
+                for v in test_values:
+                    if td1.typep(v):
+                        expected = 1
+                    elif td2.typep(v):
+                        expected = 2
+                    else:
+                        expected = 3
+                    self.assertIs(eval_ite(ite, v), expected)
+
     def test_typeEquivalent_random(self):
         import random
         for i in range(0, 1000):
@@ -759,6 +759,100 @@ class RteCase(unittest.TestCase):
         self.assertIs(None, Star(Or(Singleton(SOr(SAtomic(str),
                                                   SAtomic(int))))).simulate(42, [1, "b", 3.4]))
 
+    def test_rte_features(self):
+        from rte.engine import rte_features
+        features = rte_features(Star(Cat(Singleton(SAtomic(int)), Star(Singleton(SAtomic(str))))))
+        self.assertEqual(features["size"], 5)
+        self.assertEqual(features["star_height"], 2)
+        self.assertEqual(features["and_count"], 0)
+        self.assertEqual(features["not_count"], 0)
+        self.assertEqual(features["first_types"], 1)
+        self.assertEqual(rte_features(And(Sigma, Not(Epsilon)))["not_count"], 1)
+
+    def test_select_engine(self):
+        from rte.engine import rte_features, select_engine
+        self.assertEqual(select_engine(rte_features(And(Sigma, Not(Epsilon)))), "brzozowski")
+        self.assertEqual(select_engine(rte_features(Singleton(SAtomic(int)))), "brzozowski")
+        self.assertEqual(select_engine(rte_features(Star(Star(Star(Singleton(SAtomic(int))))))), "thompson")
+        # the Thompson construction is sequential
+        self.assertEqual(select_engine(rte_features(Star(Star(Star(Singleton(SAtomic(int)))))), 2), "brzozowski")
+
+    def test_to_dfa_engine(self):
+        from rte.engine import build_times
+        for depth in range(4):
+            for r in range(num_random_tests):
+                rt = random_rte(depth)
+                dfa_b = rt.to_dfa(True, engine="brzozowski")
+                dfa_t = rt.to_dfa(True, engine="thompson")
+                self.assertIsNot(dfa_b.equivalent(dfa_t), False, f"rt={rt}")
+                self.assertTrue(rt.to_dfa(True, engine="auto"))
+        self.assertTrue(build_times["brzozowski"])
+        self.assertTrue(build_times["thompson"])
+        with self.assertRaises(ValueError):
+            Sigma.to_dfa(True, engine="no-such-engine")
+        with self.assertRaises(ValueError):
+            Sigma.to_dfa(True, engine="thompson", processes=2)
+        # auto is opt-in
+        build_times["thompson"].clear()
+        Star(Star(Star(Singleton(SAtomic(int))))).to_dfa(True)
+        self.assertFalse(build_times["thompson"])
+
+    def test_budget(self):
+        from genus.budget import Budget, BudgetExceeded, current_budget
+        from genus.s_atomic import SAtomic
+        rt = Not(And(Star(Cat(Singleton(SAtomic(int)), Sigma, Singleton(SAtomic(str)))),
+                     Not(Star(Or(Singleton(SAtomic(int)), Cat(Sigma, Sigma, Sigma))))))
+        self.assertGreater(len(rt.derivatives()[0]), 2)
+        with self.assertRaises(BudgetExceeded) as cm:
+            rt.derivatives(Budget(max_states=2))
+        self.assertEqual(cm.exception.limit, "max_states")
+        self.assertGreater(cm.exception.states, 2)
+        with self.assertRaises(BudgetExceeded) as cm:
+            rt.derivatives(Budget(max_transitions=2))
+        self.assertEqual(cm.exception.limit, "max_transitions")
+        for engine in ["brzozowski", "thompson"]:
+            budget = Budget()
+            budget.cancel()
+            with self.assertRaises(BudgetExceeded) as cm:
+                rt.to_dfa(True, engine=engine, budget=budget)
+            self.assertEqual(cm.exception.limit, "cancelled")
+        with self.assertRaises(BudgetExceeded) as cm:
+            rt.to_dfa(True, budget=Budget(timeout=-1.0))
+        self.assertEqual(cm.exception.limit, "timeout")
+        outer = Budget(max_states=1000)
+        with outer:
+            self.assertIs(current_budget(), outer)
+            with self.assertRaises(BudgetExceeded):
+                with Budget(max_states=2):
+                    rt.to_dfa(True, engine="brzozowski")
+            self.assertIs(current_budget(), outer)
+            self.assertTrue(rt.to_dfa(True))
+        self.assertIsNone(current_budget())
+
+    def test_derivatives_processes(self):
+        import pickle
+        import rte.r_rte
+        from genus.s_satisfies import SSatisfies
+        saved = rte.r_rte.parallel_min_frontier
+        try:
+            rte.r_rte.parallel_min_frontier = 1
+            rt = Cat(Star(Or(Singleton(SAtomic(int)), Singleton(SMember(1, 2, "a")))),
+                     Not(Cat(Sigma, Singleton(SAtomic(str)), Star(Sigma))))
+            self.assertEqual(pickle.loads(pickle.dumps(rt)), rt)
+            self.assertIs(pickle.loads(pickle.dumps(SAtomic(int))), SAtomic(int))
+            self.assertIs(pickle.loads(pickle.dumps(Sigma)), Sigma)
+            self.assertEqual(rt.derivatives(processes=2), rt.derivatives())
+            self.assertIs(rt.to_dfa(True, processes=2).equivalent(rt.to_dfa(True)), True)
+            # cannot be pickled, computed sequentially
+            odd = Singleton(SSatisfies(lambda a: isinstance(a, int) and a % 2 == 1, "odd"))
+            self.assertEqual(Star(odd).derivatives(processes=2), Star(odd).derivatives())
+            for depth in range(3):
+                for r in range(num_random_tests // 10):
+                    rt = random_rte(depth)
+                    self.assertEqual(rt.derivatives(processes=2), rt.derivatives(), f"rt={rt}")
+        finally:
+            rte.r_rte.parallel_min_frontier = saved
+
     def test_serialize(self):
         for depth in range(4):
             for r in range(num_random_tests):
@@ -776,6 +870,20 @@ class RteCase(unittest.TestCase):
                 else:
                     self.assertEqual(i, not v)
 
+    def test_slots(self):
+        import pickle
+        from rte.r_rte import picklablep
+        for depth in range(4):
+            for r in range(num_random_tests):
+                rt = random_rte(depth)
+                self.assertFalse(hasattr(rt, "__dict__"), f"{rt} has a __dict__")
+                if not picklablep(rt):
+                    # e.g., an SSatisfies of a lambda
+                    continue
+                rt2 = pickle.loads(pickle.dumps(rt))
+                self.assertEqual(rt, rt2)
+                self.assertEqual(hash(rt), hash(rt2))
+
     def test_discovered_682(self):
         so = Singleton(SEql(1))
         i = 0
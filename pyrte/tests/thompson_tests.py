@@ -142,7 +142,7 @@ class ThompsonCase(unittest.TestCase):
 
     def check(self, depth, pattern):
         dfa_thompson = constructThompsonDfa(pattern, 42)
-        dfa_brzozowski = pattern.to_dfa(42)
+        dfa_brzozowski = pattern.to_dfa(42, engine="brzozowski")
         dfa_xor = dfa_thompson.xor(dfa_brzozowski)
         # equivalent might return None or True, but need to fail if returns False
         if dfa_brzozowski.equivalent(dfa_thompson) is False:
@@ -240,6 +240,44 @@ class ThompsonCase(unittest.TestCase):
         self.assertEqual(simulateTransitions([1, 2, 3, 4], 42,
                                              ini, outs, transitions), 42)
 
+    def test_simulate_memo(self):
+        from genus.typep_memo import ElementMemo
+        calls = []
+
+        def f(a):
+            calls.append(a)
+            return a > 0
+
+        positive = SSatisfies(f, "positive")
+        transitions = [(0, SAnd(SAtomic(int), positive), 1),
+                       (0, SOr(SAtomic(str), positive), 2),
+                       (0, SNot(positive), 3),
+                       (1, positive, 1)]
+        self.assertEqual(simulateTransitions([1, 2], 42, 0, [1], transitions), 42)
+        # each element is tested once, however many labels contain positive
+        self.assertEqual(calls, [1, 2])
+        calls.clear()
+        self.assertIsNone(simulateTransitions([1, -2], 42, 0, [1], transitions))
+        self.assertEqual(calls, [1, -2])
+
+        # with an ElementMemo, identical elements of other sequences are not retested
+        def g(a):
+            calls.append(a)
+            return sum(a) > 0
+
+        memo = ElementMemo()
+        x, y = (1, 2), (3, 4)
+        calls.clear()
+        transitions = [(0, SAnd(SAtomic(tuple), SSatisfies(g, "positive_sum")), 0)]
+        self.assertEqual(simulateTransitions([x, y, x], 42, 0, [0], transitions, memo), 42)
+        self.assertEqual(simulateTransitions([y, x], 42, 0, [0], transitions, memo), 42)
+        self.assertEqual(calls, [x, y])
+
+        dfa = Star(Singleton(SOr(SAtomic(str), SSatisfies(g, "positive_sum")))).to_dfa(42)
+        calls.clear()
+        self.assertEqual(dfa.simulate([x, "a", x, y], memo), 42)
+        self.assertEqual(calls, [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -19,6 +19,7 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import importlib.util
 import unittest
 from rte.r_sigma import Sigma
 from rte.r_epsilon import Epsilon
@@ -37,6 +38,8 @@ from genus.s_atomic import SAtomic
 from genus.s_or import SOr
 from genus.s_not import SNot
 
+numpy_available = importlib.util.find_spec("numpy") is not None
+
 # default value of num_random_tests is 1000, but you can temporarily edit this file
 #   and set it to a smaller number for a quicker run of the tests.
 num_random_tests = 1000
@@ -106,6 +109,166 @@ class XymbolycoCase(unittest.TestCase):
         else:
             pass
 
+    def test_createDfa_linear(self):
+        from rte.xymbolyco import createDfa
+        # a chain of n states, each but the last with two transitions
+        n = 1000
+        triples = [(q, td, q + 1) for q in range(n) for td in [SAtomic(int), SAtomic(str)]]
+        dfa = createDfa(pattern=None,
+                        ini=0,
+                        transition_triples=triples,
+                        accepting_states=[n],
+                        exit_map={n: True},
+                        validate="cheap")
+        # state n has no transitions, so a sink is added
+        self.assertEqual(len(dfa.states), n + 2)
+        self.assertEqual(dfa.states[n].transitions, {STop: n + 1})
+        self.assertEqual(dfa.states[0].transitions, {SOr(SAtomic(int), SAtomic(str)): 1})
+        self.assertIs(dfa.simulate([1, "a"] * (n // 2)), True)
+        self.assertIsNone(dfa.simulate([1, "a"]))
+
+        # an accepting initial state without transitions matches the empty sequence
+        dfa = createDfa(pattern=None, ini=0, transition_triples=[], accepting_states=[0], exit_map={0: 42})
+        self.assertEqual(dfa.simulate([]), 42)
+        self.assertIsNone(dfa.simulate([1]))
+
+        # validate="cheap" skips the check that the labels are disjoint
+        overlapping = [(0, SOr(SAtomic(int), SAtomic(float)), 1), (0, SAtomic(int), 2)]
+        with self.assertRaises(AssertionError):
+            createDfa(pattern=None, ini=0, transition_triples=overlapping, accepting_states=[1], exit_map={1: True})
+        self.assertTrue(createDfa(pattern=None, ini=0, transition_triples=overlapping, accepting_states=[1],
+                                  exit_map={1: True}, validate="cheap"))
+
+    def test_validation(self):
+        import rte.xymbolyco
+        from rte.xymbolyco import createDfa
+        overlapping = [(0, SOr(SAtomic(int), SAtomic(float)), 1), (0, SAtomic(int), 2)]
+        with self.assertRaises(ValueError):
+            createDfa(pattern=None, ini=0, transition_triples=[], accepting_states=[0], exit_map={0: True},
+                      validate="some")
+        saved = rte.xymbolyco.validation
+        try:
+            rte.xymbolyco.validation = "off"
+            self.assertTrue(createDfa(pattern=None, ini=0, transition_triples=overlapping, accepting_states=[1],
+                                      exit_map={1: True}))
+            # a per-call level overrides the global one
+            with self.assertRaises(AssertionError):
+                createDfa(pattern=None, ini=0, transition_triples=overlapping, accepting_states=[1],
+                          exit_map={1: True}, validate="full")
+        finally:
+            rte.xymbolyco.validation = saved
+
+    def test_trim(self):
+        from rte.xymbolyco import createDfa
+        # 0 -int-> 1 -int-> 3 (accepting), 0 -str-> 2 (dead end), 4 is not accessible
+        dfa = createDfa(pattern=None,
+                        ini=0,
+                        transition_triples=[(0, SAtomic(int), 1), (0, SAtomic(str), 2), (1, SAtomic(int), 3),
+                                            (2, SAtomic(int), 2), (4, SAtomic(int), 3)],
+                        accepting_states=[3],
+                        exit_map={3: 42})
+        accessibles, coaccessibles = dfa.find_accessibles()
+        self.assertEqual(set(accessibles), {0, 1, 2, 3, 5})
+        self.assertEqual(set(coaccessibles), {0, 1, 3, 4})
+        trimmed = dfa.trim()
+        self.assertEqual(len(trimmed.states), 4)
+        self.assertEqual(trimmed.exit_map, {2: 42})
+        self.assertEqual(trimmed.simulate([1, 2]), 42)
+        self.assertIsNone(trimmed.simulate(["a", 2]))
+        self.assertEqual(dfa.trim(compact=False).exit_map, {3: 42})
+
+        # a chain of n states, each with a dead end
+        n = 2000
+        triples = [(q, SAtomic(int), q + 1) for q in range(n)] + [(q, SAtomic(str), n + 1) for q in range(n)]
+        dfa = createDfa(pattern=None, ini=0, transition_triples=triples, accepting_states=[n], exit_map={n: True})
+        trimmed = dfa.trim()
+        self.assertEqual(len(trimmed.states), n + 2)
+        self.assertIs(trimmed.simulate([1] * n), True)
+        self.assertIsNone(trimmed.simulate([1, "a"]))
+
+        for depth in range(4):
+            for r in range(num_random_tests):
+                dfa = random_rte(depth).to_dfa(True)
+                trimmed = dfa.trim()
+                for seq in [[], [1], ["a", 1], [1.0, 2, "b"]]:
+                    self.assertEqual(trimmed.simulate(seq), dfa.simulate(seq))
+
+    def test_vacuous(self):
+        from rte.xymbolyco import createDfa
+        from genus.s_satisfies import SSatisfies
+
+        def f(x):
+            return x == 1
+
+        # the accepting state 2 is not accessible
+        dfa = createDfa(pattern=None, ini=0, transition_triples=[(0, SAtomic(int), 1), (2, SAtomic(int), 2)],
+                        accepting_states=[2], exit_map={2: True})
+        self.assertIs(dfa.vacuous(), True)
+        self.assertIsNone(dfa.witness())
+        # the only accepting path has a label which may be vacuous
+        dfa = createDfa(pattern=None, ini=0, transition_triples=[(0, SSatisfies(f, "f"), 1)],
+                        accepting_states=[1], exit_map={1: True})
+        self.assertIsNone(dfa.vacuous())
+        self.assertIsNone(dfa.witness())
+        self.assertEqual(dfa.witness(allow_maybe_satisfiable=True), [SSatisfies(f, "f")])
+        self.assertEqual(Epsilon.to_dfa(True).witness(), [])
+
+        # a chain of n diamonds has 2 ** n paths to its accepting state
+        n = 40
+        triples = [triple
+                   for k in range(n)
+                   for q in [3 * k]
+                   for triple in [(q, SAtomic(int), q + 1), (q, SAtomic(str), q + 2),
+                                  (q + 1, SAtomic(int), q + 3), (q + 2, SAtomic(int), q + 3)]]
+        dfa = createDfa(pattern=None, ini=0, transition_triples=triples, accepting_states=[3 * n],
+                        exit_map={3 * n: True})
+        self.assertIs(dfa.vacuous(), False)
+        self.assertIs(dfa.inhabited(), True)
+        witness = dfa.witness()
+        self.assertEqual(len(witness), 2 * n)
+        self.assertIs(dfa.simulate([td.wrapped_class() for td in witness]), True)
+
+    def test_check_equivalence(self):
+        ints = Star(Singleton(SAtomic(int)))
+        pairs = Cat(Singleton(SAtomic(int)), Singleton(SAtomic(int)))
+        self.assertIs(ints.subsumes(pairs), True)
+        self.assertIs(pairs.subsumes(ints), False)
+        self.assertEqual(pairs.to_dfa(True).check_inclusion(ints.to_dfa(True)), (False, []))
+        self.assertEqual(ints.to_dfa(True).check_equivalence(Cat(ints, ints).to_dfa(True)), (True, None))
+        equivalent, counterexample = ints.to_dfa(True).check_equivalence(Cat(pairs, ints).to_dfa(True))
+        self.assertIs(equivalent, False)
+        self.assertEqual(counterexample, [])
+        even = Cat(pairs, Star(pairs)).to_dfa(True)
+        equivalent, counterexample = even.check_equivalence(Cat(pairs, ints).to_dfa(True))
+        self.assertIs(equivalent, False)
+        self.assertEqual(counterexample, [SAtomic(int)] * 3)
+
+        for depth in range(4):
+            for r in range(num_random_tests):
+                dfa1 = random_rte(depth).to_dfa(True)
+                dfa2 = random_rte(depth).to_dfa(True)
+                xor = dfa1.xor(dfa2)
+                equivalent, counterexample = dfa1.check_equivalence(dfa2)
+                self.assertIs(equivalent, xor.vacuous())
+                if equivalent is False:
+                    # pruning may miss a shortest counterexample
+                    self.assertGreaterEqual(len(counterexample), len(xor.witness()))
+                    # but inclusion does not prune
+                    for d1, d2 in [(dfa1, dfa2), (dfa2, dfa1)]:
+                        includes, counterexample = d1.check_inclusion(d2)
+                        if includes is False:
+                            difference = d1.sxp(d2, lambda a, b: b and not a, lambda _q1, _q2: True)
+                            self.assertEqual(len(counterexample), len(difference.witness()))
+                self.assertIs(dfa1.includes(dfa2) is True and dfa2.includes(dfa1) is True, equivalent is True)
+
+    def test_complement(self):
+        for depth in range(4):
+            for r in range(num_random_tests):
+                dfa = random_rte(depth).to_dfa(True)
+                complement = dfa.complement(dict((q.index, True) for q in dfa.states))
+                for seq in [[], [1], ["a", 1], [1.0, 2, "b"]]:
+                    self.assertEqual(complement.simulate(seq), None if dfa.simulate(seq) else True)
+
     def test_extract_discovered_case_57(self):
         from genus.depthgenerator import Test2
         so = Singleton(SEql(1))
@@ -155,6 +318,40 @@ class XymbolycoCase(unittest.TestCase):
             for r in range(num_random_tests):
                 self.check_extraction_cycle(random_rte(depth))
 
+    def test_extract_order(self):
+        import rte.xymbolyco as xymbolyco
+        order, size = xymbolyco.extract_order, xymbolyco.extract_canonicalize_size
+        a = Singleton(SEql(1))
+        b = Singleton(SAtomic(str))
+        try:
+            for xymbolyco.extract_order, xymbolyco.extract_canonicalize_size in [("index", 64),
+                                                                                 ("degree", 64),
+                                                                                 ("degree", 0)]:
+                for rt in [Cat(Star(Or(a, b)), a, Star(Sigma), b),
+                           Star(Cat(a, Star(b), a)),
+                           And(Star(Cat(Sigma, Sigma)), Not(Cat(Star(Sigma), a, Star(Sigma))))]:
+                    self.check_extraction_cycle(rt)
+                for depth in range(3, 4):
+                    for r in range(num_random_tests // 10 + 1):
+                        self.check_extraction_cycle(random_rte(depth))
+                # one Rte per exit value
+                dfa = Or(Cat(a, Star(b)), Cat(b, Star(a))).to_dfa(True) \
+                    .sxp(Cat(Star(Sigma), b).to_dfa(False),
+                         lambda a1, a2: a1 or a2,
+                         lambda _q1, _q2: True)
+                extracted = dfa.to_rte()
+                self.assertEqual(set(extracted), {True, False})
+                for exit_value, rt in extracted.items():
+                    for seq in [[1], ["x"], [1, "x"], ["x", 1, 1], [1, "x", "y"], [2, "x"]]:
+                        self.assertEqual(rt.to_dfa(exit_value).simulate(seq) == exit_value,
+                                         dfa.simulate(seq) == exit_value,
+                                         f"exit_value={exit_value} seq={seq} rt={rt}")
+            with self.assertRaises(ValueError):
+                xymbolyco.extract_order = "random"
+                Star(a).to_dfa(True).to_rte()
+        finally:
+            xymbolyco.extract_order, xymbolyco.extract_canonicalize_size = order, size
+
     def test_canonicalize(self):
         for depth in range(4):
             for _rep in range(num_random_tests):
@@ -309,5 +506,207 @@ class XymbolycoCase(unittest.TestCase):
                                 "xor of Dfas does not correspond to dfa of xor")
 
 
+    def test_compact(self):
+        import random
+        from rte.compact import CompactDfa
+        pool = [0, 1, 2, -1, 1.0, 2.5, True, "a", "b", None, [], (1,)]
+        for depth in range(4):
+            for _ in range(num_random_tests):
+                dfa = random_rte(depth).to_dfa(depth)
+                compact = dfa.compact()
+                self.assertIsInstance(compact, CompactDfa)
+                self.assertEqual(len(compact.states), len(dfa.states))
+                self.assertEqual(compact.serialize()[1:4], dfa.serialize()[1:4])
+                self.assertEqual(compact.expand().serialize()[1:4], dfa.serialize()[1:4])
+                self.assertEqual(compact.to_dot("compact"), dfa.to_dot("compact"))
+                trimmed = compact.trim()
+                minimized = compact.minimize()
+                for _ in range(5):
+                    seq = [random.choice(pool) for _ in range(random.randint(0, 4))]
+                    expected = dfa.simulate(seq)
+                    self.assertEqual(compact.simulate(seq), expected, f"seq={seq}")
+                    self.assertEqual(trimmed.simulate(seq), expected, f"seq={seq}")
+                    self.assertEqual(minimized.simulate(seq), expected, f"seq={seq}")
+        dfa = Star(Cat(Singleton(SAtomic(int)), Singleton(SAtomic(str)))).to_dfa(42)
+        compact = dfa.compact()
+        self.assertIs(compact.states[0].accepting, True)
+        self.assertEqual(compact.states[0], compact.states[0])
+        self.assertEqual(compact.states[-1].index, len(dfa.states) - 1)
+        self.assertEqual(compact.states[0].transitions, dfa.states[0].transitions)
+        # each label is stored once
+        self.assertEqual(len(compact.labels), len(set(compact.labels)))
+        self.assertEqual(len(compact.targets), sum(len(q.transitions) for q in dfa.states))
+
+    def test_compile(self):
+        import random
+        from genus.s_satisfies import SSatisfies
+        rt = Star(Or(Singleton(SAtomic(int)), Cat(Singleton(SEql("a")), Singleton(SAtomic(float)))))
+        dfa = rt.to_dfa(42)
+        compiled = dfa.compile()
+        self.assertEqual(len(compiled.table), len(dfa.states) * compiled.width)
+        self.assertEqual(compiled.delta(0, compiled.classify(1)), dfa.delta(dfa.states[0], SAtomic(int)).index)
+        self.assertEqual(compiled.simulate([1, "a", 2.0, 3]), 42)
+        self.assertIsNone(compiled.simulate([1, "a", 3]))
+        self.assertIsNone(compiled.simulate(["b"]))
+
+        pool = [0, 1, 2, -1, 1.0, 2.5, True, "a", "b", None, [], (1,)]
+        for depth in range(4):
+            for _ in range(num_random_tests):
+                dfa = random_rte(depth).to_dfa(depth)
+                compiled = dfa.compile()
+                for _ in range(5):
+                    seq = [random.choice(pool) for _ in range(random.randint(0, 4))]
+                    self.assertEqual(compiled.simulate(seq), dfa.simulate(seq), f"seq={seq}")
+
+    def test_save_load(self):
+        import os
+        import random
+        import tempfile
+        from genus.ite import leaf_tds
+        from genus.s_satisfies import SSatisfies
+        from rte.dfa_file import register_predicate, predicates, predicate_names, DfaFileError, decode_nodes
+        from rte.xymbolyco import Dfa
+        saved = dict(predicates), dict(predicate_names)
+
+        def even(x):
+            return isinstance(x, int) and x % 2 == 0
+
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "dfa")
+                rt = Cat(Star(Singleton(SSatisfies(even, "even"))), Singleton(SMember("a", 2.5)))
+                dfa = rt.to_dfa(42)
+                with self.assertRaises(DfaFileError):
+                    dfa.save(path)
+                register_predicate("even", even)
+                dfa.save(path)
+                for mmap in [True, False]:
+                    loaded = Dfa.load(path, mmap)
+                    self.assertEqual(loaded.simulate([2, 4, "a"]), 42)
+                    self.assertIsNone(loaded.simulate([2, 3, "a"]))
+                    self.assertEqual(loaded.expand().equivalent(dfa), True)
+                    loaded.close()
+                del predicates["even"]
+                with self.assertRaises(DfaFileError):
+                    Dfa.load(path)
+                with open(path, "wb") as stream:
+                    stream.write(b"not a Dfa")
+                with self.assertRaises(DfaFileError):
+                    Dfa.load(path)
+
+                # the labels and the exit values are written without pickle
+                exit_value = (1, 2.5, -3j, b"x", "s", None, True, [frozenset([1])], {"k": 2 ** 70})
+                dfa = Star(Singleton(SOr(SMember(1, "a", (SAtomic(tuple), (2,))), SNot(SAtomic(str))))).to_dfa(exit_value)
+                dfa.save(path)
+                loaded = Dfa.load(path)
+                self.assertEqual(loaded.exit_map, dfa.compile().exit_map)
+                self.assertEqual(loaded.expand().equivalent(dfa), True)
+                loaded.close()
+                for nodes in [[["class", "os", "system"]],
+                              [["class", "module_which_is_not_imported", "C"]],
+                              [["ite", 1, 2, 3]],
+                              [["reduce", "os.system", "ls"]]]:
+                    with self.assertRaises(DfaFileError):
+                        decode_nodes(nodes)
+
+                pool = [0, 1, 2, -1, 1.0, 2.5, True, "a", "b", None, [], (1,)]
+                for depth in range(4):
+                    for r in range(num_random_tests):
+                        dfa = random_rte(depth).to_dfa(depth)
+                        for q in dfa.states:
+                            for label in q.transitions:
+                                for td in leaf_tds(label):
+                                    if isinstance(td, SSatisfies):
+                                        register_predicate(f"{td.printable}-{id(td.f)}", td.f)
+                        dfa.save(path)
+                        loaded = Dfa.load(path)
+                        for _ in range(5):
+                            seq = [random.choice(pool) for _ in range(random.randint(0, 4))]
+                            self.assertEqual(loaded.simulate(seq), dfa.simulate(seq), f"seq={seq}")
+                        loaded.close()
+        finally:
+            predicates.clear()
+            predicates.update(saved[0])
+            predicate_names.clear()
+            predicate_names.update(saved[1])
+
+    def test_shared(self):
+        import os
+        import pickle
+        import subprocess
+        import sys
+        from concurrent.futures import ProcessPoolExecutor
+        from rte.xymbolyco import Dfa
+        rt = Star(Or(Singleton(SAtomic(int)), Cat(Singleton(SEql("a")), Singleton(SAtomic(float)))))
+        dfa = rt.to_dfa(42)
+        shared = dfa.publish()
+        try:
+            self.assertIs(Dfa.attach(shared.name), shared)
+            self.assertIs(pickle.loads(pickle.dumps(shared)), shared)
+            sequences = [[1, "a", 2.0, 3], [1, "a", 3], ["b"], []]
+            self.assertEqual([shared.simulate(seq) for seq in sequences],
+                             [dfa.simulate(seq) for seq in sequences])
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                # the workers attach to the shared memory block by name
+                self.assertEqual(list(executor.map(shared.simulate, sequences)),
+                                 [dfa.simulate(seq) for seq in sequences])
+            # a process which is not a worker of this process attaches and exits,
+            #   the block must survive it, and no leak is reported.
+            code = f"from rte.shared import attach_dfa; assert attach_dfa({shared.name!r}).simulate([1]) == 42"
+            result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertNotIn("leaked", result.stderr)
+            if os.path.isdir("/dev/shm"):
+                self.assertTrue(os.path.exists(os.path.join("/dev/shm", shared.name.lstrip("/"))))
+        finally:
+            shared.close()
+            shared.unlink()
+
+    @unittest.skipUnless(numpy_available, "numpy is not installed")
+    def test_vectorized(self):
+        import numpy as np
+        import random
+        from genus.s_satisfies import SSatisfies
+        from genus.s_and import SAnd
+        from rte.vectorized import vectorize, register_array_predicate, array_predicates
+
+        def positive(x):
+            return x > 0
+
+        register_array_predicate(positive, lambda a: a > 0)
+        try:
+            rt = Star(Cat(Singleton(SAnd(SAtomic(int), SSatisfies(positive, "positive"))),
+                          Singleton(SMember(-1, -2, 0))))
+            dfa = rt.to_dfa(42)
+            v = vectorize(dfa)
+            for seq in [[1, -1, 5, 0], [1, -1, 5], [1, -1.0], [1, "a"], [], [2 ** 70, 0], [True, 0]]:
+                self.assertEqual(v.simulate(seq), dfa.simulate(seq), f"seq={seq}")
+                self.assertEqual(v.simulate(np.array(seq)), dfa.simulate(np.array(seq).tolist()), f"seq={seq}")
+            self.assertEqual(v.simulate(np.tile(np.array([3, -1]), 1000)), 42)
+            self.assertIsNone(v.simulate(np.tile(np.array([3.0, -1.0]), 1000)))
+            self.assertEqual(v.classify(np.array([1, 7, 0, 9])).tolist(),
+                             v.classify([1, 7, 0, 9]).tolist())
+        finally:
+            del array_predicates[positive]
+
+        pool = [0, 1, 2, -1, 1.0, 2.5, True, "a", "b", None]
+        for depth in range(4):
+            for _ in range(num_random_tests):
+                dfa = random_rte(depth).to_dfa(depth)
+                v = vectorize(dfa)
+                for _ in range(5):
+                    elements = random.choice([pool, [0, 1, 2, -1], [1.0, 2.5, -1.5]])
+                    seq = [random.choice(elements) for _ in range(random.randint(0, 4))]
+                    self.assertEqual(v.simulate(seq), dfa.simulate(seq), f"seq={seq}")
+
+        # members which the dtype of the array cannot represent
+        for td in [SMember(1, 2 ** 70), SMember(2 ** 70), SMember(1.5, 2 ** 70)]:
+            dfa = Star(Singleton(td)).to_dfa(True)
+            v = vectorize(dfa)
+            for seq in [np.array([1, 1]), np.array([1, 2]), np.array([1.5, 1.5]), np.array([], dtype=int)]:
+                self.assertEqual(v.simulate(seq), dfa.simulate(seq.tolist()), f"td={td} seq={seq}")
+
+
 if __name__ == '__main__':
     unittest.main()